@@ -0,0 +1,616 @@
+# backend/battle_engine.py
+"""
+진행 중인 배틀을 메모리에 두고 턴을 처리하는 엔진 + write-behind 저장.
+
+예전에는 턴마다 HTTP 요청이 MySQL 에서 모든 것을 다시 읽었고, Battle 에는 HP 가 없었다.
+- BattleState / _Fighter : __slots__ 레코드 (HP, 슬롯별 PP, 차례, 상태)
+- play_turn()            : 이벤트 루프 스레드에서 메모리만으로 턴을 처리 (DB 왕복 없음)
+- flush 루프             : flush_interval_ms 마다 쌓인 턴 로그(BattleTurn)를 한 트랜잭션으로 insert,
+                           snapshot_every 턴마다 / 배틀 종료 시 Battle(HP, turn) + BattleMove(PP) 스냅샷 갱신
+- 복구                   : 캐시에 없는 배틀은 마지막 스냅샷을 읽고 그 이후 BattleTurn 을 다시 적용한다
+                           (워커가 죽어도 flush 된 턴까지는 복구된다)
+- 실패 격리              : 배틀마다 SAVEPOINT 로 나눠 저장해 한 배틀의 제약 위반이 다른 배틀을 막지 않는다.
+                           제약 위반이거나 max_retries 번 연속 실패한 배틀은 대기 턴을 버리고(turns_dropped)
+                           캐시에서 내린다. 이미 성공으로 응답한 턴이므로 그 배틀의 다음 요청(턴/상태 조회)은
+                           한 번 409 로 "턴 N개가 취소됨"을 알리고, 그 다음 요청부터 DB 기준으로 다시 읽는다.
+- 진행 경로              : 한 배틀은 엔진(/turn) 또는 /damage 중 먼저 공격한 경로로만 진행한다 (Battle.mode).
+                           엔진은 첫 턴 전에 mode 를 engine 으로 잡고, 이미 damage 인 배틀은 409 로 거절한다.
+                           (/damage 쪽은 routers/battle.py 의 _claim_turn 이 반대로 막는다)
+- 버전 검사              : Battle 은 turn = snapshot_turn 일 때만 갱신한다 (/damage 의 _claim_turn 과 같은 CAS).
+                           다른 워커의 엔진이 같은 배틀을 진행해 먼저 턴을 올렸으면 이 배틀의 턴/스냅샷을 버린다
+                           (snapshot_conflicts). BattleMove PP 도 CAS 가 통과했을 때만 쓴다.
+
+상태 변경은 전부 이벤트 루프 스레드에서만 일어나므로 락이 필요 없다.
+DB 읽기/쓰기만 asyncio.to_thread 로 내보낸다.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models, type_chart
+
+LEVEL = 50
+ENGINE_MODE = "engine"  # Battle.mode: 이 엔진이 진행하는 배틀
+DAMAGE_MODE = "damage"  # Battle.mode: POST /damage 로 진행하는 배틀
+NO_PP_LIMIT = -1  # current_pp 가 NULL 인 기술
+
+
+class BattleError(Exception):
+    """라우터에서 HTTPException 으로 바꿔 돌려줄 검증 실패."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class MoveInfo(NamedTuple):
+    battle_move_id: int
+    move_id: int
+    name: str
+    power: Optional[int]
+    damage_class: str
+    type: str
+
+
+class TurnResult(NamedTuple):
+    battle_id: int
+    turn: int
+    attacker_user_pokemon_id: int
+    defender_user_pokemon_id: int
+    move_id: int
+    damage: int
+    defender_hp: int
+    pp_left: Optional[int]
+    status: str
+    winner_user_pokemon_id: Optional[int]
+
+
+class _Fighter:
+    __slots__ = (
+        "user_pokemon_id", "hp", "max_hp", "speed",
+        "attack", "defense", "sp_attack", "sp_defense",
+        "type1", "type2", "moves", "pp",
+    )
+
+    def __init__(self, user_pokemon_id: int, poke: models.Pokemon, moves: List[MoveInfo], pp: List[int]):
+        self.user_pokemon_id = user_pokemon_id
+        self.max_hp = (2 * (getattr(poke, "base_hp", None) or 50) * LEVEL) // 100 + LEVEL + 10
+        self.hp = self.max_hp
+        self.speed = getattr(poke, "base_speed", None) or 0
+        self.attack = poke.base_attack or 1
+        self.defense = poke.base_defense or 1
+        self.sp_attack = poke.base_sp_attack or 1
+        self.sp_defense = poke.base_sp_defense or 1
+        self.type1 = poke.type1
+        self.type2 = poke.type2
+        self.moves = moves
+        self.pp = array("i", pp)
+
+    def slot_of(self, battle_move_id: int) -> Optional[int]:
+        for i, mv in enumerate(self.moves):
+            if mv.battle_move_id == battle_move_id:
+                return i
+        return None
+
+
+class BattleState:
+    __slots__ = (
+        "battle_id", "fighters", "turn", "actor", "status", "winner",
+        "snapshot_turn", "last_seen", "pending", "failures", "mode",
+    )
+
+    def __init__(self, battle_id: int, fighters: List[_Fighter], actor: int, now: float):
+        self.battle_id = battle_id
+        self.fighters = fighters      # [player_a, player_b]
+        self.turn = 0
+        self.actor = actor            # 다음에 공격할 fighters 인덱스
+        self.status = "ongoing"
+        self.winner: Optional[int] = None
+        self.snapshot_turn = 0        # DB 스냅샷에 반영된 마지막 턴
+        self.last_seen = now
+        self.pending: List[dict] = []  # 아직 저장 안 된 턴 로그
+        self.failures = 0             # 연속 저장 실패 횟수
+        self.mode: Optional[str] = None  # Battle.mode (None 이면 아직 어느 경로도 공격하지 않음)
+
+    def index_of(self, user_pokemon_id: int) -> Optional[int]:
+        for i, f in enumerate(self.fighters):
+            if f.user_pokemon_id == user_pokemon_id:
+                return i
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            "battle_id": self.battle_id,
+            "turn": self.turn,
+            "status": self.status,
+            "next_user_pokemon_id": self.fighters[self.actor].user_pokemon_id if self.status == "ongoing" else None,
+            "winner_user_pokemon_id": self.winner,
+            "fighters": [
+                {
+                    "user_pokemon_id": f.user_pokemon_id,
+                    "hp": f.hp,
+                    "max_hp": f.max_hp,
+                    "pp": [None if pp == NO_PP_LIMIT else pp for pp in f.pp],
+                }
+                for f in self.fighters
+            ],
+        }
+
+
+def _damage(attacker: _Fighter, defender: _Fighter, move: MoveInfo, type_mult: float, rng: random.Random) -> int:
+    # routers/battle.py 의 _calc_damage 와 같은 공식 (레벨 50 고정)
+    if not move.power:
+        return 0
+    if move.damage_class == "physical":
+        atk_stat, def_stat = attacker.attack, defender.defense
+    elif move.damage_class == "special":
+        atk_stat, def_stat = attacker.sp_attack, defender.sp_defense
+    else:
+        return 0
+    base = (((2 * LEVEL / 5 + 2) * move.power * atk_stat / def_stat) / 50) + 2
+    stab = 1.5 if move.type in (attacker.type1, attacker.type2) else 1.0
+    return max(1, int(base * stab * type_mult * rng.uniform(0.85, 1.0)))
+
+
+def load_state(db: Session, battle_id: int, now: float) -> BattleState:
+    """마지막 스냅샷(Battle + BattleMove)을 읽고, 그 이후 턴 로그를 다시 적용한다."""
+    battle = db.query(models.Battle).filter(models.Battle.id == battle_id).first()
+    if battle is None:
+        raise BattleError(404, "해당 배틀을 찾을 수 없습니다.")
+    order = [battle.player_a_user_pokemon_id, battle.player_b_user_pokemon_id]
+
+    pokes = dict(
+        db.query(models.UserPokemon.id, models.Pokemon)
+        .join(models.Pokemon, models.Pokemon.poke_id == models.UserPokemon.poke_id)
+        .filter(models.UserPokemon.id.in_(order))
+        .all()
+    )
+    if len(pokes) != 2:
+        raise BattleError(404, "포켓몬 기본 정보가 없습니다.")
+
+    moves: Dict[int, List[MoveInfo]] = {up_id: [] for up_id in order}
+    pps: Dict[int, List[int]] = {up_id: [] for up_id in order}
+    rows = (
+        db.query(models.BattleMove, models.Move)
+        .join(models.Move, models.Move.id == models.BattleMove.move_id)
+        .filter(models.BattleMove.battle_id == battle_id)
+        .order_by(models.BattleMove.user_pokemon_id.asc(), models.BattleMove.slot.asc())
+        .all()
+    )
+    for bm, mv in rows:
+        moves[bm.user_pokemon_id].append(MoveInfo(bm.id, mv.id, mv.name, mv.power, mv.damage_class, mv.type))
+        pps[bm.user_pokemon_id].append(NO_PP_LIMIT if bm.current_pp is None else bm.current_pp)
+
+    fighters = [_Fighter(up_id, pokes[up_id], moves[up_id], pps[up_id]) for up_id in order]
+    if battle.next_user_pokemon_id in order:
+        actor = order.index(battle.next_user_pokemon_id)
+    else:
+        actor = 1 if fighters[1].speed > fighters[0].speed else 0
+
+    state = BattleState(battle_id, fighters, actor, now)
+    state.turn = state.snapshot_turn = battle.turn or 0
+    state.status = battle.status or "ongoing"
+    state.winner = battle.winner_user_pokemon_id
+    state.mode = battle.mode
+    if battle.player_a_hp is not None:
+        fighters[0].hp = battle.player_a_hp
+    if battle.player_b_hp is not None:
+        fighters[1].hp = battle.player_b_hp
+
+    # 스냅샷 이후에 flush 된 턴 로그 재적용
+    replay = (
+        db.query(models.BattleTurn)
+        .filter(models.BattleTurn.battle_id == battle_id, models.BattleTurn.turn > state.turn)
+        .order_by(models.BattleTurn.turn.asc())
+        .all()
+    )
+    for t in replay:
+        atk = state.index_of(t.attacker_user_pokemon_id)
+        if atk is None:
+            continue
+        attacker, defender = fighters[atk], fighters[1 - atk]
+        slot = attacker.slot_of(t.battle_move_id)
+        if slot is not None and attacker.pp[slot] > 0:
+            attacker.pp[slot] -= 1
+        defender.hp = t.defender_hp
+        state.turn = t.turn
+        state.actor = 1 - atk
+        if defender.hp <= 0:
+            state.status = "finished"
+            state.winner = attacker.user_pokemon_id
+    return state
+
+
+class BattleEngine:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_interval_ms: float = 200.0,
+        snapshot_every: int = 10,
+        idle_ttl: float = 900.0,
+        max_battles: int = 10000,
+        max_retries: int = 3,
+        rng: Optional[random.Random] = None,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = max(0.01, flush_interval_ms / 1000.0)
+        self.snapshot_every = max(1, snapshot_every)
+        self.idle_ttl = idle_ttl
+        self.max_battles = max(1, max_battles)
+        self.max_retries = max(1, max_retries)
+        self.rng = rng or random.Random()
+
+        self._battles: "OrderedDict[int, BattleState]" = OrderedDict()
+        self._loading: Dict[int, asyncio.Future] = {}
+        # 저장하지 못하고 버린 턴이 있는 배틀 -> 다음 요청에 돌려줄 안내 (max_battles 개까지)
+        self._lost: "OrderedDict[int, str]" = OrderedDict()
+        self._chart: Optional[type_chart.TypeChart] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+        # 메트릭
+        self.turns = 0
+        self.loads = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.rows_written = 0
+        self.turns_dropped = 0
+        self.snapshot_conflicts = 0
+        self._resolve_us = 0.0
+
+    # ---------- 라이프사이클 ----------
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # 남은 턴과 스냅샷을 모두 저장하고 종료
+        await self.flush(force=True)
+
+    # ---------- 배틀 ----------
+    async def get(self, battle_id: int) -> BattleState:
+        notice = self._lost.pop(battle_id, None)
+        if notice is not None:
+            raise BattleError(409, notice)
+        state = self._battles.get(battle_id)
+        if state is not None:
+            self._battles.move_to_end(battle_id)
+            return state
+
+        # 같은 배틀을 동시에 여러 번 읽지 않도록 로딩 중인 future 를 공유한다
+        pending = self._loading.get(battle_id)
+        if pending is None:
+            pending = asyncio.get_running_loop().create_future()
+            self._loading[battle_id] = pending
+            try:
+                state, chart = await asyncio.to_thread(self._load, battle_id)
+            except BaseException as e:
+                pending.set_exception(e)
+                pending.exception()  # 기다리는 쪽이 없어도 경고가 남지 않게
+                raise
+            finally:
+                self._loading.pop(battle_id, None)
+            self._chart = chart
+            if state.mode != DAMAGE_MODE:
+                # /damage 로 진행 중인 배틀은 엔진이 들고 있지 않는다 (상태 조회 때마다 DB 에서 읽음)
+                self._battles[battle_id] = state
+            self.loads += 1
+            pending.set_result(state)
+            self._evict()
+            return state
+        return await asyncio.shield(pending)
+
+    def _load(self, battle_id: int):
+        db = self.session_factory()
+        try:
+            return load_state(db, battle_id, time.monotonic()), type_chart.get(db)
+        finally:
+            db.close()
+
+    async def play_turn(
+        self,
+        battle_id: int,
+        attacker_user_pokemon_id: int,
+        slot: int,
+        expected_turn: Optional[int] = None,
+    ) -> TurnResult:
+        state = await self.get(battle_id)
+        if state.mode != ENGINE_MODE:
+            if not await asyncio.to_thread(self._claim, battle_id):
+                if self._battles.get(battle_id) is state:
+                    del self._battles[battle_id]
+                raise BattleError(409, "POST /damage 로 진행 중인 배틀입니다. 같은 경로로 이어서 공격하세요.")
+            state.mode = ENGINE_MODE
+            # 잠금을 잡는 동안 캐시가 바뀌었을 수 있다 (flush 에서 내려간 경우 등)
+            state = await self.get(battle_id)
+            state.mode = ENGINE_MODE
+        return self.resolve(state, attacker_user_pokemon_id, slot, expected_turn)
+
+    def _claim(self, battle_id: int) -> bool:
+        """Battle.mode 가 비어 있거나 이미 engine 일 때만 engine 으로 잡는다."""
+        db = self.session_factory()
+        try:
+            battle = models.Battle
+            # MySQL 방언은 CLIENT_FOUND_ROWS 로 접속하므로 값이 그대로여도(이미 engine) 매칭된 행 수가 나온다
+            matched = db.execute(
+                update(battle)
+                .where(battle.id == battle_id, or_(battle.mode.is_(None), battle.mode == ENGINE_MODE))
+                .values(mode=ENGINE_MODE)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            return matched == 1
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def resolve(
+        self,
+        state: BattleState,
+        attacker_user_pokemon_id: int,
+        slot: int,
+        expected_turn: Optional[int] = None,
+    ) -> TurnResult:
+        started = time.perf_counter()
+        if state.status != "ongoing":
+            raise BattleError(400, "이미 끝난 배틀입니다.")
+        if expected_turn is not None and expected_turn != state.turn:
+            raise BattleError(409, f"배틀이 이미 {state.turn}턴입니다. 상태를 다시 읽고 재시도하세요.")
+        atk = state.index_of(attacker_user_pokemon_id)
+        if atk is None:
+            raise BattleError(400, "해당 배틀의 참가 포켓몬이 아닙니다.")
+        if atk != state.actor:
+            raise BattleError(409, "상대 포켓몬의 차례입니다.")
+        attacker, defender = state.fighters[atk], state.fighters[1 - atk]
+        if not 1 <= slot <= len(attacker.moves):
+            raise BattleError(400, "해당 배틀에 등록되지 않은 기술입니다.")
+        i = slot - 1
+        if attacker.pp[i] == 0:
+            raise BattleError(400, "기술의 PP가 부족합니다.")
+
+        move = attacker.moves[i]
+        type_mult = self._chart.multiplier(move.type, defender.type1, defender.type2) if self._chart else 1.0
+        damage = _damage(attacker, defender, move, type_mult, self.rng)
+
+        if attacker.pp[i] > 0:
+            attacker.pp[i] -= 1
+        defender.hp = max(0, defender.hp - damage)
+        state.turn += 1
+        state.actor = 1 - atk
+        state.last_seen = time.monotonic()
+        if defender.hp == 0:
+            state.status = "finished"
+            state.winner = attacker.user_pokemon_id
+
+        state.pending.append(
+            {
+                "battle_id": state.battle_id,
+                "turn": state.turn,
+                "attacker_user_pokemon_id": attacker.user_pokemon_id,
+                "battle_move_id": move.battle_move_id,
+                "damage": damage,
+                "defender_hp": defender.hp,
+            }
+        )
+        self.turns += 1
+        self._resolve_us += (time.perf_counter() - started) * 1e6
+        return TurnResult(
+            battle_id=state.battle_id,
+            turn=state.turn,
+            attacker_user_pokemon_id=attacker.user_pokemon_id,
+            defender_user_pokemon_id=defender.user_pokemon_id,
+            move_id=move.move_id,
+            damage=damage,
+            defender_hp=defender.hp,
+            pp_left=None if attacker.pp[i] == NO_PP_LIMIT else attacker.pp[i],
+            status=state.status,
+            winner_user_pokemon_id=state.winner,
+        )
+
+    # ---------- write-behind ----------
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[battle-engine] flush 실패: {type(e).__name__}: {e}")
+
+    async def flush(self, force: bool = False) -> None:
+        async with self._flush_lock:
+            batch = []
+            # idle 이거나 캐시가 넘친 배틀도 스냅샷을 남겨야 _evict() 가 내릴 수 있다
+            deadline = time.monotonic() - self.idle_ttl
+            crowded = len(self._battles) > self.max_battles
+            for state in self._battles.values():
+                behind = state.turn - state.snapshot_turn
+                snapshot = None
+                if behind and (
+                    force
+                    or behind >= self.snapshot_every
+                    or state.status != "ongoing"
+                    or crowded
+                    or state.last_seen < deadline
+                ):
+                    snapshot = self._snapshot_rows(state)
+                if state.pending or snapshot is not None:
+                    turns, state.pending = state.pending, []
+                    batch.append((state, state.snapshot_turn, state.turn, turns, snapshot))
+            if not batch:
+                self._evict()
+                return
+            try:
+                failed, conflicts = await asyncio.to_thread(
+                    self._persist,
+                    [(state.battle_id, base, turns, snapshot) for state, base, _, turns, snapshot in batch],
+                )
+            except Exception as e:
+                # 연결 끊김 등 배치 전체 실패: 다음 flush 에서 다시 시도 (그 사이 쌓인 턴보다 앞에 둔다)
+                self.flush_errors += 1
+                for state, _, _, turns, _ in batch:
+                    state.failures += 1
+                    if state.failures >= self.max_retries:
+                        self._drop(state, turns, f"{self.max_retries}회 연속 실패 ({type(e).__name__})")
+                    else:
+                        state.pending[:0] = turns
+                self._evict()
+                raise
+            for state, _, turn, turns, snapshot in batch:
+                if state.battle_id in conflicts:
+                    # 캐시 상태가 DB 보다 뒤처졌다: 덮어쓰지 않고 DB 기준으로 다시 읽게 한다
+                    self.snapshot_conflicts += 1
+                    self._drop(state, turns, "다른 경로에서 Battle.turn 이 바뀜")
+                    continue
+                error = failed.get(state.battle_id)
+                if error is not None:
+                    # 제약 위반은 다시 넣어도 또 실패한다
+                    self._drop(state, turns, error)
+                    continue
+                state.failures = 0
+                if snapshot is not None:
+                    state.snapshot_turn = turn
+                self.rows_written += len(turns) + (1 + len(snapshot[1]) if snapshot is not None else 0)
+            self.flushes += 1
+            self._evict()
+
+    def _drop(self, state: BattleState, turns: List[dict], reason: str) -> None:
+        """
+        저장하지 못한 턴을 버리고 캐시에서 내린다. 클라이언트에는 이미 성공으로 응답했으므로
+        다음 요청에 409 로 알리고, 그 뒤로는 DB 에 남은 상태를 다시 읽는다.
+        """
+        dropped = len(turns) + len(state.pending)
+        state.pending = []
+        self.turns_dropped += dropped
+        if self._battles.get(state.battle_id) is state:
+            del self._battles[state.battle_id]
+        if dropped:
+            self._lost[state.battle_id] = (
+                f"저장하지 못한 턴 {dropped}개가 취소되었습니다. 상태를 다시 읽고 이어서 진행하세요."
+            )
+            self._lost.move_to_end(state.battle_id)
+            while len(self._lost) > self.max_battles:
+                self._lost.popitem(last=False)
+        print(f"[battle-engine] battle_id={state.battle_id} 턴 {dropped}개 버림: {reason}")
+
+    @staticmethod
+    def _snapshot_rows(state: BattleState):
+        a, b = state.fighters
+        battle_row = {
+            "id": state.battle_id,
+            "player_a_hp": a.hp,
+            "player_b_hp": b.hp,
+            "turn": state.turn,
+            "status": state.status,
+            "next_user_pokemon_id": state.fighters[state.actor].user_pokemon_id,
+            "winner_user_pokemon_id": state.winner,
+        }
+        pp_rows = [
+            {"id": mv.battle_move_id, "current_pp": None if pp == NO_PP_LIMIT else pp}
+            for f in state.fighters
+            for mv, pp in zip(f.moves, f.pp)
+        ]
+        return battle_row, pp_rows
+
+    def _persist(self, batch: List[tuple]) -> Tuple[Dict[int, str], Set[int]]:
+        """
+        batch = [(battle_id, DB 에 있어야 할 turn, turns, snapshot | None)].
+        한 트랜잭션 안에서 배틀마다 SAVEPOINT 를 두고, 그 배틀만 되돌린다.
+        - Battle.turn 이 예상과 다름 (/damage 나 다른 워커가 먼저 씀)  -> conflicts
+        - 제약 위반 (uq_battle_turn 중복, 지워진 배틀의 FK 등)          -> failed[battle_id] = 사유
+        """
+        db = self.session_factory()
+        failed: Dict[int, str] = {}
+        conflicts: Set[int] = set()
+        try:
+            for battle_id, base_turn, turns, snapshot in batch:
+                savepoint = db.begin_nested()
+                try:
+                    if snapshot is not None:
+                        battle_row, pp_rows = snapshot
+                        values = {k: v for k, v in battle_row.items() if k != "id"}
+                        matched = db.execute(
+                            update(models.Battle)
+                            .where(models.Battle.id == battle_id, models.Battle.turn == base_turn)
+                            .values(**values)
+                        ).rowcount
+                    else:
+                        # 스냅샷 없이 턴 로그만 쓸 때도 버전을 확인하고, 커밋까지 /damage 의 CAS 를 막아 둔다
+                        current = (
+                            db.query(models.Battle.turn)
+                            .filter(models.Battle.id == battle_id)
+                            .with_for_update()
+                            .scalar()
+                        )
+                        matched = int(current == base_turn)
+                    if not matched:
+                        savepoint.rollback()
+                        conflicts.add(battle_id)
+                        continue
+                    if turns:
+                        db.bulk_insert_mappings(models.BattleTurn, turns)
+                    if snapshot is not None:
+                        db.bulk_update_mappings(models.BattleMove, pp_rows)
+                    savepoint.commit()
+                except IntegrityError as e:
+                    savepoint.rollback()
+                    failed[battle_id] = f"IntegrityError: {e.orig}"
+            db.commit()
+            return failed, conflicts
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _evict(self) -> None:
+        """
+        스냅샷까지 저장된 배틀만 내린다: 끝난 배틀, idle_ttl 이 지난 배틀, max_battles 초과분(LRU).
+        저장에 실패한 배틀은 flush 에서 _drop() 으로 바로 내리므로 여기서 계속 남아 있지 않는다.
+        """
+        now = time.monotonic()
+        deadline = now - self.idle_ttl
+        over = len(self._battles) - self.max_battles
+        for battle_id in list(self._battles):
+            state = self._battles[battle_id]
+            if state.turn != state.snapshot_turn:
+                continue
+            if state.status != "ongoing" or state.last_seen < deadline or over > 0:
+                del self._battles[battle_id]
+                over -= 1
+
+    def stats(self) -> dict:
+        return {
+            "active_battles": len(self._battles),
+            "turns": self.turns,
+            "avg_resolve_us": (self._resolve_us / self.turns) if self.turns else 0.0,
+            "pending_turns": sum(len(state.pending) for state in self._battles.values()),
+            "loads": self.loads,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "rows_written": self.rows_written,
+            "turns_dropped": self.turns_dropped,
+            "lost_notices": len(self._lost),
+            "snapshot_conflicts": self.snapshot_conflicts,
+        }
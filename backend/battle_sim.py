@@ -0,0 +1,277 @@
+# backend/battle_sim.py
+"""
+오프라인 배틀 시뮬레이터 (NumPy 벡터화).
+
+routers/battle.py 의 _calc_damage 는 공격 한 번씩 계산하는 스칼라 함수라 밸런스 조정용으로
+수백만 판을 돌리기엔 느리다. 여기서는 Pokemon 기본 능력치 / 기술 풀 / 타입 상성표를 배열로
+올려두고 한 번에 수백만 판을 시뮬레이션한다.
+
+- SimData.load(db)      : 종족값 / 기술 / 상성표 배열 (DB 는 이때만 읽음)
+- SimData.from_rows()   : 이미 읽어 둔 행(또는 같은 속성을 가진 객체)으로 만든다 (오프라인 확인용)
+- damage()              : _calc_damage 와 같은 공식의 배열 버전 (같은 난수를 주면 결과가 같다)
+- hit_damage()          : 종족/기술 인덱스로 능력치·STAB·상성을 골라 damage() 호출
+- choose_moves()        : _choose_moves_for_battle 규칙(강/약/물리/특수 + power 순 채우기)의 배열 버전
+- simulate()            : 판별 HP 를 배열로 들고 턴을 진행, 승자 / KO 턴 / 공격당 데미지를 돌려준다
+- pair_summary()        : 종족 쌍별 승률 / 평균 KO 턴
+
+가정: 레벨 50 고정, 매 턴 4개 기술 중 무작위 1개 사용, PP 소진은 무시(보통 KO 가 먼저 난다),
+선공은 스피드가 높은 쪽(같으면 A). battle_engine 의 규칙과 같다.
+"""
+from __future__ import annotations
+
+from typing import Dict, NamedTuple, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from . import models, move_pool, type_chart
+from .battle_engine import LEVEL
+
+PHYSICAL, SPECIAL = 0, 1
+
+
+class SimData(NamedTuple):
+    # 종족 (N,)
+    poke_ids: np.ndarray
+    hp: np.ndarray
+    attack: np.ndarray
+    defense: np.ndarray
+    sp_attack: np.ndarray
+    sp_defense: np.ndarray
+    speed: np.ndarray
+    type1: np.ndarray        # 타입 인덱스, 없으면 type_chart.NO_TYPE
+    type2: np.ndarray
+    # 기술 (M,)
+    move_ids: np.ndarray
+    power: np.ndarray
+    move_class: np.ndarray   # PHYSICAL / SPECIAL
+    move_type: np.ndarray
+    # 기술 버킷 (기술 배열 인덱스)
+    strong: np.ndarray
+    weak: np.ndarray
+    physical: np.ndarray
+    special: np.ndarray
+    by_power: np.ndarray
+    # 상성표
+    chart: np.ndarray        # (18, 18, 19) type_chart.TypeChart.dual
+    # STAB 비교용 타입 코드. _calc_damage 는 타입 문자열을 그대로 비교하므로 상성표에 없는 타입도
+    # 문자열마다 다른 코드를 준다 (None 은 -1 이라 None 끼리는 같다고 본다: 스칼라 in 비교와 동일)
+    stab_type1: np.ndarray
+    stab_type2: np.ndarray
+    stab_move_type: np.ndarray
+
+    @classmethod
+    def load(cls, db: Session) -> "SimData":
+        chart = type_chart.get(db)
+        pool = move_pool.get(db)
+        pokes = db.query(models.Pokemon).order_by(models.Pokemon.poke_id.asc()).all()
+        return cls.from_rows(chart, pokes, list(pool.moves.values()), pool)
+
+    @classmethod
+    def from_rows(
+        cls,
+        chart: type_chart.TypeChart,
+        pokes: Sequence,
+        moves: Sequence,
+        pool: Optional[move_pool.MovePool] = None,
+    ) -> "SimData":
+        """pokes 는 poke_id 순 Pokemon, moves 는 MoveRow. pool 이 없으면 기술 버킷은 비워 둔다."""
+
+        def type_idx(name: Optional[str]) -> int:
+            return chart.index.get(name, type_chart.NO_TYPE) if name else type_chart.NO_TYPE
+
+        codes: Dict[str, int] = dict(chart.index)
+
+        def stab_code(name: Optional[str]) -> int:
+            if name is None:
+                return -1
+            return codes.setdefault(name, type_chart.NO_TYPE + 1 + len(codes) - len(chart.index))
+
+        stat = lambda attr, default: np.array([getattr(p, attr, None) or default for p in pokes], dtype=np.float64)
+        max_hp = (2 * stat("base_hp", 50) * LEVEL) // 100 + LEVEL + 10
+
+        position = {mv.id: i for i, mv in enumerate(moves)}
+        bucket = lambda ids: np.array([position[i] for i in ids], dtype=np.int64)
+        empty = ()
+
+        type1 = np.array([type_idx(p.type1) for p in pokes], dtype=np.int64)
+        type2 = np.array([type_idx(p.type2) for p in pokes], dtype=np.int64)
+        # type1 이 없고 type2 만 있는 경우 TypeChart.multiplier 처럼 앞으로 당긴다
+        swap = type1 == type_chart.NO_TYPE
+        type1[swap], type2[swap] = type2[swap], type_chart.NO_TYPE
+
+        return cls(
+            poke_ids=np.array([p.poke_id for p in pokes], dtype=np.int64),
+            hp=max_hp,
+            attack=stat("base_attack", 1),
+            defense=stat("base_defense", 1),
+            sp_attack=stat("base_sp_attack", 1),
+            sp_defense=stat("base_sp_defense", 1),
+            speed=stat("base_speed", 0),
+            type1=type1,
+            type2=type2,
+            move_ids=np.array([mv.id for mv in moves], dtype=np.int64),
+            power=np.array([mv.power for mv in moves], dtype=np.float64),
+            move_class=np.array([PHYSICAL if mv.damage_class == "physical" else SPECIAL for mv in moves], dtype=np.int8),
+            move_type=np.array([type_idx(mv.type) for mv in moves], dtype=np.int64),
+            strong=bucket(pool.strong if pool else empty),
+            weak=bucket(pool.weak if pool else empty),
+            physical=bucket(pool.physical if pool else empty),
+            special=bucket(pool.special if pool else empty),
+            by_power=bucket(pool.by_power if pool else empty),
+            chart=chart.dual.astype(np.float64),
+            stab_type1=np.array([stab_code(p.type1) for p in pokes], dtype=np.int64),
+            stab_type2=np.array([stab_code(p.type2) for p in pokes], dtype=np.int64),
+            stab_move_type=np.array([stab_code(mv.type) for mv in moves], dtype=np.int64),
+        )
+
+
+def damage(
+    power: np.ndarray,
+    atk_stat: np.ndarray,
+    def_stat: np.ndarray,
+    stab: np.ndarray,
+    type_mult: np.ndarray,
+    rand: np.ndarray,
+) -> np.ndarray:
+    """_calc_damage 의 배열 버전. 연산 순서를 맞춰 같은 입력이면 정수 결과가 같다."""
+    base = (((2 * LEVEL / 5 + 2) * power * atk_stat / def_stat) / 50) + 2
+    dmg = np.floor(base * stab * type_mult * rand).astype(np.int64)
+    return np.where(power > 0, np.maximum(1, dmg), 0)
+
+
+def _pick(bucket: np.ndarray, n: int, rng: np.random.Generator) -> np.ndarray:
+    if bucket.size == 0:
+        return np.full(n, -1, dtype=np.int64)
+    return bucket[rng.integers(0, bucket.size, size=n)]
+
+
+def choose_moves(data: SimData, n: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    (n, 4) 기술 인덱스. 버킷별로 하나씩 뽑고, 앞에서 뽑은 것과 겹치면 다시 뽑는다(최대 8번).
+    그래도 겹치거나 버킷이 비면 power 순으로 채운다 (MovePool.choose 와 같은 규칙).
+    """
+    chosen = np.full((n, 4), -1, dtype=np.int64)
+    for col, bucket in enumerate((data.strong, data.weak, data.physical, data.special)):
+        pick = _pick(bucket, n, rng)
+        for _ in range(8):
+            dup = (pick >= 0) & (chosen[:, :col] == pick[:, None]).any(axis=1)
+            if not dup.any():
+                break
+            pick[dup] = _pick(bucket, int(dup.sum()), rng)
+        dup = (pick >= 0) & (chosen[:, :col] == pick[:, None]).any(axis=1)
+        pick[dup] = -1
+        chosen[:, col] = pick
+
+    # 빈 칸은 power 높은 순으로, 이미 고른 기술은 건너뛰며 채운다
+    for row in np.flatnonzero((chosen < 0).any(axis=1)):
+        picked = [m for m in chosen[row] if m >= 0]
+        for m in data.by_power:
+            if len(picked) >= 4:
+                break
+            if m not in picked:
+                picked.append(m)
+        chosen[row, : len(picked)] = picked
+    return chosen
+
+
+def hit_damage(
+    data: SimData,
+    atk_species: np.ndarray,
+    def_species: np.ndarray,
+    mv: np.ndarray,
+    rand: np.ndarray,
+) -> np.ndarray:
+    """공격 한 번씩의 데미지 (물리/특수 능력치 선택, STAB, 타입 상성 포함)."""
+    physical = data.move_class[mv] == PHYSICAL
+    atk_stat = np.where(physical, data.attack[atk_species], data.sp_attack[atk_species])
+    def_stat = np.where(physical, data.defense[def_species], data.sp_defense[def_species])
+    # STAB 은 상성표와 상관없이 타입 문자열이 같으면 적용 (_calc_damage 의 move.type in (type1, type2))
+    scode = data.stab_move_type[mv]
+    stab = np.where((scode == data.stab_type1[atk_species]) | (scode == data.stab_type2[atk_species]), 1.5, 1.0)
+    # TypeChart.multiplier 와 같이 모르는 공격/방어 타입은 1.0
+    mtype = data.move_type[mv]
+    known = mtype < type_chart.NO_TYPE
+    type_mult = np.ones(mv.shape)
+    d1 = data.type1[def_species]
+    has_type = known & (d1 < type_chart.NO_TYPE)
+    type_mult[has_type] = data.chart[mtype[has_type], d1[has_type], data.type2[def_species][has_type]]
+    return damage(data.power[mv], atk_stat, def_stat, stab, type_mult, rand)
+
+
+class SimResult(NamedTuple):
+    a: np.ndarray             # (B,) 종족 인덱스
+    b: np.ndarray
+    winner_a: np.ndarray      # (B,) bool, 시간 초과면 남은 HP 비율이 높은 쪽
+    ko_turn: np.ndarray       # (B,) KO 가 난 턴 (시간 초과면 max_turns)
+    hits: np.ndarray          # 전체 공격의 데미지 (분포용)
+
+
+def simulate(
+    data: SimData,
+    a: np.ndarray,
+    b: np.ndarray,
+    rng: Optional[np.random.Generator] = None,
+    max_turns: int = 100,
+) -> SimResult:
+    """a[i] vs b[i] 를 한 판씩, 전체를 배열로 동시에 진행한다."""
+    rng = rng or np.random.default_rng()
+    n = a.size
+    moves = np.stack([choose_moves(data, n, rng), choose_moves(data, n, rng)])  # (2, B, 4)
+    side = np.stack([a, b])                                                     # (2, B)
+    hp = data.hp[side].copy()
+    max_hp = hp.copy()
+
+    # 스피드가 높은 쪽이 먼저 (같으면 A)
+    actor = (data.speed[b] > data.speed[a]).astype(np.int64)
+    alive = np.ones(n, dtype=bool)
+    ko_turn = np.full(n, max_turns, dtype=np.int64)
+    winner_a = np.zeros(n, dtype=bool)
+    hits = []
+    idx = np.arange(n)
+
+    for turn in range(1, max_turns + 1):
+        live = idx[alive]
+        if live.size == 0:
+            break
+        atk_side = actor[live]
+        def_side = 1 - atk_side
+        atk_species = side[atk_side, live]
+        def_species = side[def_side, live]
+
+        slot = rng.integers(0, 4, size=live.size)
+        mv = moves[atk_side, live, slot]
+        dmg = hit_damage(data, atk_species, def_species, mv, rng.uniform(0.85, 1.0, size=live.size))
+        hits.append(dmg)
+        hp[def_side, live] = np.maximum(0, hp[def_side, live] - dmg)
+
+        ko = hp[def_side, live] <= 0
+        ko_turn[live[ko]] = turn
+        winner_a[live[ko]] = atk_side[ko] == 0
+        alive[live[ko]] = False
+        actor[live] = def_side
+
+    # 시간 초과: 남은 HP 비율로 판정
+    timeout = alive
+    winner_a[timeout] = (hp[0, timeout] / max_hp[0, timeout]) >= (hp[1, timeout] / max_hp[1, timeout])
+    return SimResult(a, b, winner_a, ko_turn, np.concatenate(hits) if hits else np.zeros(0, dtype=np.int64))
+
+
+def all_pairs(n_species: int, battles_per_pair: int) -> tuple:
+    """모든 (a, b) 종족 쌍을 battles_per_pair 번씩 반복한 인덱스 배열."""
+    a, b = np.meshgrid(np.arange(n_species), np.arange(n_species), indexing="ij")
+    a = np.repeat(a.ravel(), battles_per_pair)
+    b = np.repeat(b.ravel(), battles_per_pair)
+    return a, b
+
+
+def pair_summary(result: SimResult, n_species: int) -> tuple:
+    """(n_species, n_species) 승률(A 기준) / 평균 KO 턴 행렬. 판이 없는 쌍은 NaN."""
+    flat = result.a * n_species + result.b
+    count = np.bincount(flat, minlength=n_species * n_species).astype(np.float64)
+    wins = np.bincount(flat, weights=result.winner_a, minlength=n_species * n_species)
+    turns = np.bincount(flat, weights=result.ko_turn, minlength=n_species * n_species)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        win_rate = (wins / count).reshape(n_species, n_species)
+        ko_turns = (turns / count).reshape(n_species, n_species)
+    return win_rate, ko_turns
@@ -0,0 +1,38 @@
+# backend/cache_stamp.py
+"""
+프로세스 간 캐시 무효화용 stamp 파일.
+
+타입 상성표/기술 풀처럼 프로세스 안에 한 번 만들어 두는 캐시는, 원본 테이블을 채우는
+스크립트(scripts/fill_types.py, scripts/fetch_moves.py)가 별도 프로세스에서 돌기 때문에
+직접 무효화할 수 없다. 스크립트가 끝나면 touch(name) 으로 stamp 를 갱신하고,
+서버 쪽 캐시는 version(name) 이 바뀌었을 때 다시 만든다 (os.stat 한 번, DB 왕복 없음).
+
+CACHE_STAMP_DIR 환경변수로 위치를 바꿀 수 있다 (여러 워커/컨테이너가 같은 볼륨을 보게).
+"""
+from __future__ import annotations
+
+import os
+import time
+
+STAMP_DIR = os.getenv("CACHE_STAMP_DIR", os.path.join(os.path.dirname(__file__), ".cache"))
+
+
+def _path(name: str) -> str:
+    return os.path.join(STAMP_DIR, f"{name}.stamp")
+
+
+def touch(name: str) -> None:
+    os.makedirs(STAMP_DIR, exist_ok=True)
+    path = _path(name)
+    with open(path, "w") as f:
+        f.write(f"{time.time():.6f}\n")
+    # 같은 mtime 해상도 안에서 두 번 갱신돼도 버전이 바뀌도록 명시적으로 현재 시각을 찍는다
+    os.utime(path, ns=(time.time_ns(), time.time_ns()))
+
+
+def version(name: str) -> int:
+    """stamp 의 mtime(ns). 아직 한 번도 touch 되지 않았으면 0."""
+    try:
+        return os.stat(_path(name)).st_mtime_ns
+    except FileNotFoundError:
+        return 0
@@ -0,0 +1,163 @@
+# backend/debug_capture.py
+"""
+졸음 감지 디버그 이미지(원본 프레임 / 얼굴 crop) 샘플링 + 비동기 저장.
+
+예전에는 매 프레임마다 os.makedirs + os.listdir 로 저장된 장수를 세어
+처음 10장만 저장했다. 이제는
+- DebugSampler : 메모리 카운터로 저장 여부만 결정 (파일시스템 접근 없음)
+- DebugWriter  : 크기 제한이 있는 큐 + 백그라운드 스레드에서 cv2.imwrite
+로 나눠서, 운영 모드(DROWSY_DEBUG_CAPTURE=off)에서는 프레임당 I/O 비용이 0 이다.
+
+모드 (DROWSY_DEBUG_CAPTURE)
+- off   : 저장하지 않음 (기본값)
+- first : 프로세스 시작 후 처음 DROWSY_DEBUG_LIMIT 장만 저장
+- rate  : DROWSY_DEBUG_RATE 확률로 샘플링
+- user  : DROWSY_DEBUG_USERS (콤마 구분) 에 포함된 사용자 프레임만 저장
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime
+from typing import Optional
+
+# backend.detector 로거의 레벨/핸들러를 그대로 따른다
+logger = logging.getLogger("backend.detector.debug_capture")
+
+MODES = ("off", "first", "rate", "user")
+
+DEBUG_BASE_DIR = os.getenv("DROWSY_DEBUG_DIR", "backend")
+DIRS = {
+    "original": os.path.join(DEBUG_BASE_DIR, "debug_original"),
+    "face": os.path.join(DEBUG_BASE_DIR, "debug_faces"),
+}
+
+
+class DebugSampler:
+    """프레임을 디버그 저장할지 결정한다. 카운터는 메모리에만 둔다."""
+
+    def __init__(
+        self,
+        mode: str = "off",
+        limit: int = 10,
+        rate: float = 0.01,
+        users: Optional[set] = None,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"지원하지 않는 debug capture 모드입니다: {mode}")
+        self.mode = mode
+        self.limit = limit
+        self.rate = rate
+        self.users = users or set()
+        self._lock = threading.Lock()
+        self.sampled = 0
+
+    @classmethod
+    def from_env(cls) -> "DebugSampler":
+        users = {u.strip() for u in os.getenv("DROWSY_DEBUG_USERS", "").split(",") if u.strip()}
+        return cls(
+            mode=os.getenv("DROWSY_DEBUG_CAPTURE", "off"),
+            limit=int(os.getenv("DROWSY_DEBUG_LIMIT", "10")),
+            rate=float(os.getenv("DROWSY_DEBUG_RATE", "0.01")),
+            users=users,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def should_capture(self, user_id: Optional[str] = None) -> bool:
+        if self.mode == "off":
+            return False
+        if self.mode == "rate":
+            hit = random.random() < self.rate
+        elif self.mode == "user":
+            hit = user_id is not None and user_id in self.users
+        else:  # first
+            hit = self.sampled < self.limit
+        if not hit:
+            return False
+        with self._lock:
+            if self.mode == "first" and self.sampled >= self.limit:
+                return False
+            self.sampled += 1
+        return True
+
+    def stats(self) -> dict:
+        return {"mode": self.mode, "sampled": self.sampled}
+
+
+class DebugWriter:
+    """크기 제한 큐에 이미지를 넣으면 백그라운드 스레드가 디스크에 쓴다. 큐가 차면 버린다."""
+
+    def __init__(self, max_queue: int = 32):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._dirs_ready = False
+        self.written = 0
+        self.dropped = 0
+
+    def submit(self, kind: str, image_bgr) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((kind, image_bgr))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("debug_capture.dropped kind=%s dropped=%d", kind, self.dropped)
+            return False
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="debug-capture-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        import cv2
+
+        while True:
+            kind, image_bgr = self._queue.get()
+            try:
+                if not self._dirs_ready:
+                    for d in DIRS.values():
+                        os.makedirs(d, exist_ok=True)
+                    self._dirs_ready = True
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+                path = os.path.join(DIRS[kind], f"{kind}_{timestamp}.jpg")
+                cv2.imwrite(path, image_bgr)
+                self.written += 1
+                logger.info("debug_capture.saved kind=%s path=%s", kind, path)
+            except Exception as e:
+                logger.error("debug_capture.failed kind=%s error=%s: %s", kind, type(e).__name__, e)
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+# 프로세스당 하나 (process executor 를 쓰면 워커마다 따로 생긴다)
+_writer: Optional[DebugWriter] = None
+_writer_lock = threading.Lock()
+
+
+def writer() -> DebugWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = DebugWriter(max_queue=int(os.getenv("DROWSY_DEBUG_QUEUE", "32")))
+    return _writer
@@ -1,134 +1,239 @@
 import torch
-from torchvision import transforms
-from PIL import Image
-import io
 import cv2
 import numpy as np
 import mediapipe as mp
+import logging
 import os
-from datetime import datetime
-from collections import deque
+import threading
+from typing import Optional
+
+from backend import debug_capture, inference_backends
+from backend.preprocess import FACE_SIZE, decode_frame, normalize_into, resize_face
+from backend.face_tracker import (
+    FaceCrop,
+    TrackHint,
+    box_to_pixels,
+    expand_box,
+    thumb_diff,
+    thumbnail,
+)
 
 MODEL_PATH = "backend/best_model_Yawn_fold4.pth"
 
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+# 프레임마다 찍던 print 대신 레벨로 끌 수 있는 로거 사용 (DROWSY_LOG_LEVEL=DEBUG 로 상세 출력)
+logger = logging.getLogger("backend.detector")
+logger.setLevel(os.getenv("DROWSY_LOG_LEVEL", "WARNING").upper())
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.propagate = False
+
+# 추론 백엔드 (eager | torchscript | compile | int8_dynamic | int8_static)
+INFERENCE_BACKEND = os.getenv("DROWSY_BACKEND", "eager")
+CALIB_DIR = os.getenv("DROWSY_CALIB_DIR", inference_backends.DEFAULT_CALIB_DIR)
+
+if INFERENCE_BACKEND in inference_backends.CPU_ONLY_BACKENDS:
+    device = torch.device("cpu")
+else:
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# DROWSY_ENSEMBLE=fold4,fold5 처럼 주면 여러 fold 를 한 번의 forward 로 앙상블 (eager 백엔드 기준)
+ENSEMBLE = [n.strip() for n in os.getenv("DROWSY_ENSEMBLE", "").split(",") if n.strip()]
+
+# .pth 로드는 load_model() 을 처음 부를 때. DETECTOR_EXECUTOR=process 면 부모 프로세스는
+# 이 모듈의 함수 참조만 쓰고 forward 는 워커에서 하므로 부모에서는 모델을 올리지 않는다.
+model = None
+_model_lock = threading.Lock()
+
+
+def load_model():
+    global model
+    if model is None:
+        with _model_lock:
+            if model is None:
+                if ENSEMBLE:
+                    model = inference_backends.build_ensemble(ENSEMBLE, device)
+                else:
+                    model = inference_backends.build(INFERENCE_BACKEND, MODEL_PATH, device, calib_dir=CALIB_DIR)
+    return model
 
-# 모델 import
-from backend.best_model import YawnCNN
-
-model = YawnCNN(num_classes=3)
-model.load_state_dict(torch.load(MODEL_PATH, map_location=device))
-model.to(device)
-model.eval()
-
-# 전처리 (학습 시와 동일하게 Normalization 추가)
-transform = transforms.Compose([
-    transforms.Resize((64, 64)),
-    transforms.ToTensor(),
-    transforms.Normalize(mean=[0.5, 0.5, 0.5],
-                         std=[0.5, 0.5, 0.5])
-])
 
 # Mediapipe face detection (테스트 코드와 동일하게 0.4로 설정)
+# FaceDetection 그래프는 스레드 안전하지 않아서 executor 스레드마다 하나씩 만든다.
 mp_face = mp.solutions.face_detection
-face_detector = mp_face.FaceDetection(model_selection=0, min_detection_confidence=0.4)
+_local = threading.local()
+
+
+def _face_detector():
+    det = getattr(_local, "face_detector", None)
+    if det is None:
+        det = mp_face.FaceDetection(model_selection=0, min_detection_confidence=0.4)
+        _local.face_detector = det
+    return det
+
+CLASS_MAP = {0: "Normal", 1: "Sleepy", 2: "Yawn"}
+CLASS_INDEX = {name: idx for idx, name in CLASS_MAP.items()}
 
-# 🎯 다수결 투표 버퍼 (테스트 코드와 동일)
-prediction_buffer = deque(maxlen=10)
 
 # ---------------------------
-# 얼굴 + 졸음 탐지 함수
+# 1단계: 얼굴 검출 + 전처리
 # ---------------------------
-def predict_drowsiness(image_bytes: bytes):
-    # 바이트 → OpenCV 이미지
-    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    img_cv = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-
-    # 🔍 디버깅: 원본 이미지 저장 (처음 10장만)
-    debug_original_dir = "backend/debug_original"
-    os.makedirs(debug_original_dir, exist_ok=True)
-    existing_original = len([f for f in os.listdir(debug_original_dir) if f.endswith('.jpg')])
-    if existing_original < 10:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        cv2.imwrite(f"{debug_original_dir}/original_{timestamp}.jpg", img_cv)
-        print(f"💾 Saved original image: {existing_original + 1}/10")
-
-    # Mediapipe 얼굴 검출
-    results = face_detector.process(cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB))
+def _crop_tracked(img: np.ndarray, hint: TrackHint):
+    """힌트 박스(margin 확장)로 crop 하고, 썸네일이 검출 당시와 비슷하면 (crop, thumb) 반환."""
+    h, w, _ = img.shape
+    x1, y1, x2, y2 = box_to_pixels(expand_box(hint.box, hint.margin), w, h)
+    region = img[y1:y2, x1:x2]
+    if region.size == 0:
+        return None
+    thumb = thumbnail(region)
+    if thumb_diff(thumb, hint.thumb) > hint.max_diff:
+        return None
+    return region, thumb
+
+
+def extract_face(
+    image_bytes: bytes,
+    capture: bool = False,
+    hint: Optional[TrackHint] = None,
+    track_margin: Optional[float] = None,
+) -> Optional[FaceCrop]:
+    """
+    프레임 바이트에서 첫 번째 얼굴을 잘라 64x64 uint8 RGB 배열(FaceCrop.face)로 만든다. 얼굴이 없으면 None.
+    정규화는 classify_faces 에서 배치 버퍼에 바로 쓴다.
+    - capture=True 이면 원본/얼굴 이미지를 디버그 writer 에 넘긴다 (저장은 백그라운드).
+    - hint 가 있으면 Mediapipe 대신 이전 박스를 재사용하고, 썸네일이 많이 달라졌을 때만 다시 검출한다.
+    - track_margin 이 있으면 다음 프레임 힌트용 썸네일을 같이 돌려준다.
+    """
+    img = decode_frame(image_bytes)
+
+    # 🔍 디버깅: 원본 이미지 저장 (샘플링은 debug_capture.DebugSampler 가 결정)
+    if capture:
+        debug_capture.writer().submit("original", cv2.cvtColor(img, cv2.COLOR_RGB2BGR))
+
+    # 추적 모드: 이전 박스 재사용
+    if hint is not None:
+        tracked = _crop_tracked(img, hint)
+        if tracked is not None:
+            face, thumb = tracked
+            if capture:
+                debug_capture.writer().submit("face", cv2.cvtColor(face, cv2.COLOR_RGB2BGR))
+            return FaceCrop(resize_face(face), hint.box, thumb, False)
+        track_margin = hint.margin
+
+    # Mediapipe 얼굴 검출 (RGB 입력)
+    results = _face_detector().process(img)
 
     if not results.detections:
-        return "No Face"
+        return None
 
     # 첫 번째 얼굴만 사용
     det = results.detections[0]
-    h, w, _ = img_cv.shape
+    h, w, _ = img.shape
 
     bbox = det.location_data.relative_bounding_box
-    x1 = int(bbox.xmin * w)
-    y1 = int(bbox.ymin * h)
-    x2 = int((bbox.xmin + bbox.width) * w)
-    y2 = int((bbox.ymin + bbox.height) * h)
+    box = (bbox.xmin, bbox.ymin, bbox.xmin + bbox.width, bbox.ymin + bbox.height)
+    x1, y1, x2, y2 = box_to_pixels(box, w, h)
 
-    # 얼굴 crop
-    face = img_cv[max(0, y1):y2, max(0, x1):x2]
+    # 얼굴 crop (복사 없는 뷰)
+    face = img[y1:y2, x1:x2]
 
     if face.size == 0:
-        return "No Face"
+        return None
+
+    # 🔍 디버깅: crop된 얼굴 저장
+    if capture:
+        debug_capture.writer().submit("face", cv2.cvtColor(face, cv2.COLOR_RGB2BGR))
+
+    thumb = None
+    if track_margin is not None:
+        ex1, ey1, ex2, ey2 = box_to_pixels(expand_box(box, track_margin), w, h)
+        thumb = thumbnail(img[ey1:ey2, ex1:ex2])
 
-    face_pil = Image.fromarray(cv2.cvtColor(face, cv2.COLOR_BGR2RGB))
+    return FaceCrop(resize_face(face), box, thumb, True)
 
-    # 🔍 디버깅: crop된 얼굴 저장 (처음 10장만)
-    debug_dir = "backend/debug_faces"
-    os.makedirs(debug_dir, exist_ok=True)
-    existing_files = len([f for f in os.listdir(debug_dir) if f.endswith('.jpg')])
-    if existing_files < 10:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        face_pil.save(f"{debug_dir}/face_{timestamp}.jpg")
-        print(f"💾 Saved cropped face: {existing_files + 1}/10")
 
-    # 전처리
-    img_tensor = transform(face_pil).unsqueeze(0).to(device)
+def prepare_face(image_bytes: bytes) -> FaceCrop:
+    """클라이언트가 이미 얼굴만 잘라 보낸 썸네일을 64x64 로 맞춘다 (Mediapipe 검출 생략)."""
+    face = decode_frame(image_bytes)
+    return FaceCrop(resize_face(face), (0.0, 0.0, 1.0, 1.0), None, False)
 
-    # 예측
+
+# ---------------------------
+# 2단계: 배치 분류
+# ---------------------------
+def _batch_buffer(n: int) -> np.ndarray:
+    """executor 스레드마다 재사용하는 (N, 3, 64, 64) float32 입력 버퍼."""
+    buf = getattr(_local, "batch_buffer", None)
+    if buf is None or buf.shape[0] < n:
+        buf = np.empty((max(n, 16), 3, FACE_SIZE, FACE_SIZE), dtype=np.float32)
+        _local.batch_buffer = buf
+    return buf[:n]
+
+
+def classify_faces(faces):
+    """64x64 얼굴 배열 리스트를 한 번의 forward pass로 분류하고, 얼굴별 softmax 확률을 돌려준다."""
+    buf = _batch_buffer(len(faces))
+    for i, face in enumerate(faces):
+        normalize_into(face, buf[i])
+
+    batch = torch.from_numpy(buf).to(device)
     with torch.no_grad():
-        output = model(img_tensor)
-        probabilities = torch.softmax(output, dim=1)[0]
-        
-        # 🔬 디버깅: raw logits 출력
-        print(f"🔬 Raw logits: {output[0].cpu().numpy()}")
-        
-        # ⚖️ 클래스 가중치 조정
-        # Sleepy는 부스트 (8배 증가), Normal/Yawn은 페널티 (60% 감소)
-        adjusted_probs = probabilities.clone()
-        adjusted_probs[0] *= 1  # Normal 감소
-        adjusted_probs[1] *= 1.2  # Sleepy 대폭 증가
-        adjusted_probs[2] *= 1 # Yawn 감소
-        
-        # 조정된 확률로 재정규화
-        adjusted_probs = adjusted_probs / adjusted_probs.sum()
-        
-        # 임계값 기반 예측: Yawn은 조정 후에도 0.7 이상이어야 함
-        predicted = torch.argmax(adjusted_probs).item()
-        if predicted == 2 and adjusted_probs[2] < 0.7:
-            # Yawn 확률이 충분히 높지 않으면 Normal 또는 Sleepy 선택
-            predicted = 0 if adjusted_probs[0] > adjusted_probs[1] else 1
-        
-        confidence = adjusted_probs[predicted].item()
-
-    class_map = {0: "Normal", 1: "Sleepy", 2: "Yawn"}
-    current_prediction = class_map[predicted]
-    
-    # 🎯 실시간 예측 (다수결 투표 비활성화)
-    # 버퍼는 유지하지만 최종 결과는 현재 프레임만 사용
-    prediction_buffer.append(current_prediction)
-    final_result = current_prediction  # 실시간 반영
-    
+        output = load_model()(batch)
+        probabilities = torch.softmax(output, dim=1).cpu()
+
+    # 🔬 디버깅: raw logits 출력 (텐서 포맷팅 비용이 있어 DEBUG 일 때만)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("drowsiness.logits batch=%d logits=%s", len(faces), output.cpu().numpy().tolist())
+
+    return list(probabilities)
+
+
+# ---------------------------
+# 3단계: 클래스 가중치 + 임계값 판정
+# ---------------------------
+def decide(probabilities):
+    """softmax 확률 한 줄을 받아 (최종 라벨, 조정 후 confidence) 를 돌려준다."""
+    # ⚖️ 클래스 가중치 조정
+    # Sleepy는 부스트 (8배 증가), Normal/Yawn은 페널티 (60% 감소)
+    adjusted_probs = probabilities.clone()
+    adjusted_probs[0] *= 1  # Normal 감소
+    adjusted_probs[1] *= 1.2  # Sleepy 대폭 증가
+    adjusted_probs[2] *= 1 # Yawn 감소
+
+    # 조정된 확률로 재정규화
+    adjusted_probs = adjusted_probs / adjusted_probs.sum()
+
+    # 임계값 기반 예측: Yawn은 조정 후에도 0.7 이상이어야 함
+    predicted = torch.argmax(adjusted_probs).item()
+    if predicted == 2 and adjusted_probs[2] < 0.7:
+        # Yawn 확률이 충분히 높지 않으면 Normal 또는 Sleepy 선택
+        predicted = 0 if adjusted_probs[0] > adjusted_probs[1] else 1
+
+    confidence = adjusted_probs[predicted].item()
+    current_prediction = CLASS_MAP[predicted]
+
     # 디버깅용: 확률 출력
-    print(f"🔍 Current: {current_prediction} (confidence: {confidence:.3f})")
-    print(f"   Original: Normal={probabilities[0]:.3f}, Sleepy={probabilities[1]:.3f}, Yawn={probabilities[2]:.3f}")
-    print(f"   Adjusted: Normal={adjusted_probs[0]:.3f}, Sleepy={adjusted_probs[1]:.3f}, Yawn={adjusted_probs[2]:.3f}")
-    print(f"   ⚡ Real-time mode (no buffering)")
-    
-    return final_result
+    if logger.isEnabledFor(logging.DEBUG):
+        p = probabilities.tolist()
+        a = adjusted_probs.tolist()
+        logger.debug(
+            "drowsiness.decision label=%s confidence=%.3f "
+            "orig=[%.3f, %.3f, %.3f] adjusted=[%.3f, %.3f, %.3f]",
+            current_prediction, confidence, *p, *a,
+        )
+
+    # 세션별 안정화는 backend/smoothing.py 에서 처리한다
+    return current_prediction, confidence
 
 
+# ---------------------------
+# 얼굴 + 졸음 탐지 함수 (단건)
+# ---------------------------
+def predict_drowsiness(image_bytes: bytes):
+    crop = extract_face(image_bytes)
+    if crop is None:
+        return "No Face"
+    probabilities = classify_faces([crop.face])[0]
+    label, _ = decide(probabilities)
+    return label
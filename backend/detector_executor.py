@@ -0,0 +1,109 @@
+# backend/detector_executor.py
+"""
+졸음 감지(디코딩, Mediapipe, YawnCNN, 디버그 저장)처럼 CPU 를 오래 쓰는 작업을
+이벤트 루프 밖에서 돌리기 위한 실행기.
+
+- kind="thread"  : 스레드풀. torch / cv2 / mediapipe 는 대부분 GIL 을 풀고 돈다.
+- kind="process" : 프로세스풀. 워커마다 backend.detector 를 한 번만 import 해서
+                   모델을 워커당 1회 로드한다.
+
+대기 중인 작업 수가 max_pending 을 넘으면 DetectorBusy 를 던진다.
+라우트에서는 이를 503 + Retry-After 로 바꿔, 졸음 감지가 밀려도
+채팅/방/배틀 같은 다른 API 가 같이 멈추지 않게 한다.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class DetectorBusy(Exception):
+    """대기열이 가득 찼을 때 발생. retry_after 는 초 단위 권장 재시도 간격."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"detector queue is full (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+def _init_process_worker() -> None:
+    # 워커 프로세스 시작 시 모델 / Mediapipe 를 한 번만 로드
+    import backend.detector
+
+    backend.detector.load_model()
+
+
+class DetectorExecutor:
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 2,
+        max_pending: int = 32,
+        retry_after: int = 2,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"지원하지 않는 executor 종류입니다: {kind}")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.retry_after = retry_after
+
+        self._pool: Optional[Executor] = None
+        self._pending = 0
+
+        # 통계
+        self.completed = 0
+        self.rejected = 0
+
+    # ---------- 라이프사이클 ----------
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        if self.kind == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process_worker,
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="detector",
+            )
+
+    def shutdown(self) -> None:
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+
+    # ---------- 실행 ----------
+    async def run(self, fn: Callable, *args) -> Any:
+        """대기열 한도를 검사한 뒤 실행한다. 가득 차 있으면 DetectorBusy."""
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise DetectorBusy(self.retry_after)
+        return await self.call(fn, *args)
+
+    async def call(self, fn: Callable, *args) -> Any:
+        """대기열 한도 없이 실행한다 (이미 승인된 요청의 후속 단계용)."""
+        if self._pool is None:
+            raise RuntimeError("DetectorExecutor.start()가 먼저 호출되어야 합니다.")
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, fn, *args)
+        finally:
+            self._pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,179 @@
+# backend/face_tracker.py
+"""
+세션별 얼굴 추적: 매 프레임마다 전체 프레임 Mediapipe 검출을 하지 않기 위한 상태.
+
+웹캠 프레임은 2초 간격이라 얼굴 위치가 거의 그대로다. 마지막 검출 박스를 margin 만큼
+넓혀 재사용하고, 아래 조건 중 하나라도 걸리면 다시 전체 검출을 한다.
+- 마지막 검출 이후 max_reuse 프레임이 지났을 때
+- 직전 분류 confidence 가 min_confidence 미만일 때
+- 박스 영역의 16x16 흑백 썸네일이 검출 당시와 max_diff 이상 달라졌을 때 (워커에서 판단)
+
+상태(FaceTracker)는 메인 프로세스에만 두고, 워커(detector.extract_face)에는
+TrackHint 만 넘긴다. 그래서 process executor 에서도 세션 상태가 워커에 흩어지지 않는다.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+THUMB_SIZE = 16
+
+Box = Tuple[float, float, float, float]  # 상대 좌표 (x1, y1, x2, y2), 0~1
+
+
+class TrackHint(NamedTuple):
+    box: Box
+    thumb: np.ndarray
+    max_diff: float
+    margin: float
+
+
+class FaceCrop(NamedTuple):
+    face: np.ndarray     # 64x64 uint8 RGB
+    box: Box             # 검출 박스 (추적 프레임이면 힌트 박스 그대로)
+    thumb: np.ndarray    # margin 을 넓힌 박스 영역의 썸네일
+    detected: bool       # 이번 프레임에서 Mediapipe 검출을 돌렸는지
+
+
+def expand_box(box: Box, margin: float) -> Box:
+    x1, y1, x2, y2 = box
+    mx = (x2 - x1) * margin
+    my = (y2 - y1) * margin
+    return max(0.0, x1 - mx), max(0.0, y1 - my), min(1.0, x2 + mx), min(1.0, y2 + my)
+
+
+def box_to_pixels(box: Box, w: int, h: int) -> Tuple[int, int, int, int]:
+    x1, y1, x2, y2 = box
+    return max(0, int(x1 * w)), max(0, int(y1 * h)), int(x2 * w), int(y2 * h)
+
+
+# cv2 는 워커(detector.extract_face)에서만 쓰는 함수 안에서 import 한다 (메인 프로세스 시작 시간 단축)
+def thumbnail(region_rgb: np.ndarray) -> np.ndarray:
+    import cv2
+
+    small = cv2.resize(region_rgb, (THUMB_SIZE, THUMB_SIZE), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+
+
+def thumb_diff(a: np.ndarray, b: np.ndarray) -> float:
+    import cv2
+
+    return float(cv2.absdiff(a, b).mean())
+
+
+class _Track:
+    __slots__ = ("box", "thumb", "since_detect", "confidence", "last_seen")
+
+    def __init__(self, box: Box, thumb: np.ndarray, now: float):
+        self.box = box
+        self.thumb = thumb
+        self.since_detect = 0
+        self.confidence = 1.0
+        self.last_seen = now
+
+
+class FaceTracker:
+    def __init__(
+        self,
+        max_reuse: int = 5,
+        margin: float = 0.15,
+        min_confidence: float = 0.6,
+        max_diff: float = 12.0,
+        idle_ttl: float = 120.0,
+        max_sessions: int = 10000,
+    ):
+        self.max_reuse = max_reuse
+        self.margin = margin
+        self.min_confidence = min_confidence
+        self.max_diff = max_diff
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max(1, max_sessions)
+        self._tracks: "OrderedDict[Hashable, _Track]" = OrderedDict()
+
+        # 메트릭
+        self.frames = 0
+        self.detector_calls = 0
+        self.tracked_frames = 0
+        self.fallbacks = 0           # 힌트를 줬지만 썸네일 차이로 다시 검출한 횟수
+        self._detect_ms = 0.0
+        self._tracked_ms = 0.0
+
+    def hint(self, key: Hashable, now: Optional[float] = None) -> Optional[TrackHint]:
+        now = time.monotonic() if now is None else now
+        self._evict_idle(now)
+        track = self._tracks.get(key)
+        if track is None:
+            return None
+        if track.since_detect >= self.max_reuse or track.confidence < self.min_confidence:
+            return None
+        return TrackHint(track.box, track.thumb, self.max_diff, self.margin)
+
+    def update(
+        self,
+        key: Hashable,
+        crop: Optional[FaceCrop],
+        hinted: bool,
+        elapsed_ms: float,
+        now: Optional[float] = None,
+    ) -> None:
+        """extract_face 결과를 반영한다. crop 이 None 이면(얼굴 없음) 추적을 끊는다."""
+        now = time.monotonic() if now is None else now
+        self.frames += 1
+        detected = crop is None or crop.detected
+        if detected:
+            self.detector_calls += 1
+            self._detect_ms += elapsed_ms
+            if hinted:
+                self.fallbacks += 1
+        else:
+            self.tracked_frames += 1
+            self._tracked_ms += elapsed_ms
+
+        if crop is None:
+            self._tracks.pop(key, None)
+            return
+
+        track = self._tracks.get(key)
+        if crop.detected or track is None:
+            track = _Track(crop.box, crop.thumb, now)
+            self._tracks[key] = track
+            while len(self._tracks) > self.max_sessions:
+                self._tracks.popitem(last=False)
+        else:
+            track.since_detect += 1
+            track.last_seen = now
+        self._tracks.move_to_end(key)
+
+    def reset(self, key: Hashable) -> None:
+        self._tracks.pop(key, None)
+
+    def report_confidence(self, key: Hashable, confidence: float) -> None:
+        track = self._tracks.get(key)
+        if track is not None:
+            track.confidence = confidence
+
+    def stats(self) -> dict:
+        detect_avg = self._detect_ms / self.detector_calls if self.detector_calls else 0.0
+        tracked_avg = self._tracked_ms / self.tracked_frames if self.tracked_frames else 0.0
+        return {
+            "sessions": len(self._tracks),
+            "frames": self.frames,
+            "detector_calls": self.detector_calls,
+            "detector_calls_per_frame": (self.detector_calls / self.frames) if self.frames else 0.0,
+            "tracked_frames": self.tracked_frames,
+            "fallbacks": self.fallbacks,
+            "avg_detect_ms": detect_avg,
+            "avg_tracked_ms": tracked_avg,
+            "avg_latency_gain_ms": (detect_avg - tracked_avg) if self.tracked_frames else 0.0,
+        }
+
+    def _evict_idle(self, now: float) -> None:
+        deadline = now - self.idle_ttl
+        while self._tracks:
+            oldest = next(iter(self._tracks.values()))
+            if oldest.last_seen >= deadline:
+                break
+            self._tracks.popitem(last=False)
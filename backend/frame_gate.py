@@ -0,0 +1,160 @@
+# backend/frame_gate.py
+"""
+세션별 프레임 중복 제거 + 적응형 샘플링 간격.
+
+조용히 책을 읽는 학생처럼 연속 프레임이 거의 같으면 검출/분류를 다시 할 필요가 없다.
+- signature()  : JPEG 를 1/8 흑백으로 바로 디코딩(IMREAD_REDUCED_GRAYSCALE_8)해 32x24 로 줄인 지문
+- FrameGate    : 직전 지문과의 평균 차이가 threshold 미만이면 직전 결과를 재사용.
+                 max_skip 프레임 연속으로 재사용했으면 한 번은 강제로 다시 분석한다.
+- 다음 샘플 간격(next_interval_ms): 상태가 안정적이면 backoff 배로 늘리고(max 까지),
+  상태가 바뀌거나 안정화 중(raw != result)이면 min 으로 줄인다.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import numpy as np
+
+SIGNATURE_SIZE = (32, 24)
+NO_FACE = "No Face"
+
+
+def signature(image_bytes: bytes) -> np.ndarray:
+    # executor 에서만 호출되므로 cv2 는 여기서 import (메인 프로세스 시작 시간 단축)
+    import cv2
+
+    buf = np.frombuffer(memoryview(image_bytes), dtype=np.uint8)
+    small = cv2.imdecode(buf, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if small is None:
+        raise ValueError("이미지를 디코딩할 수 없습니다.")
+    return cv2.resize(small, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def _mean_abs_diff(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.abs(a.astype(np.int16) - b.astype(np.int16)).mean())
+
+
+class _GateState:
+    __slots__ = ("signature", "pending", "payload", "skipped_in_row", "interval_ms", "last_seen")
+
+    def __init__(self, interval_ms: float, now: float):
+        self.signature: Optional[np.ndarray] = None
+        # 분석 중인 프레임의 지문. 분석이 성공해 record() 가 불릴 때만 signature 로 올린다
+        # (실패한 프레임의 지문이 이전 payload 와 짝지어지면 엉뚱한 결과를 재사용하게 된다)
+        self.pending: Optional[np.ndarray] = None
+        self.payload: Optional[dict] = None
+        self.skipped_in_row = 0
+        self.interval_ms = interval_ms
+        self.last_seen = now
+
+
+class FrameGate:
+    def __init__(
+        self,
+        threshold: float = 3.0,
+        max_skip: int = 5,
+        base_interval_ms: float = 2000.0,
+        min_interval_ms: float = 1000.0,
+        max_interval_ms: float = 8000.0,
+        backoff: float = 1.5,
+        idle_ttl: float = 300.0,
+        max_sessions: int = 10000,
+    ):
+        self.threshold = threshold
+        self.max_skip = max_skip
+        self.base_interval_ms = base_interval_ms
+        self.min_interval_ms = min_interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.backoff = backoff
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max(1, max_sessions)
+        self._states: "OrderedDict[Hashable, _GateState]" = OrderedDict()
+
+        # 메트릭
+        self.frames = 0
+        self.skipped = 0
+        self._full_ms_avg = 0.0    # 전체 분석 1회 평균 비용 (EMA)
+        self._gate_ms_total = 0.0  # 지문 계산에 쓴 시간 합
+
+    def check(self, key: Hashable, sig: np.ndarray, gate_ms: float, now: Optional[float] = None) -> Optional[dict]:
+        """지문이 직전과 충분히 비슷하면 재사용할 응답을, 아니면 None 을 돌려준다."""
+        now = time.monotonic() if now is None else now
+        self._evict_idle(now)
+        self.frames += 1
+        self._gate_ms_total += gate_ms
+
+        state = self._states.get(key)
+        if state is None:
+            state = _GateState(self.base_interval_ms, now)
+            self._states[key] = state
+            while len(self._states) > self.max_sessions:
+                self._states.popitem(last=False)
+        self._states.move_to_end(key)
+        state.last_seen = now
+
+        if (
+            state.payload is not None
+            and state.signature is not None
+            and state.skipped_in_row < self.max_skip
+            and _mean_abs_diff(sig, state.signature) < self.threshold
+        ):
+            state.skipped_in_row += 1
+            self.skipped += 1
+            state.interval_ms = min(self.max_interval_ms, state.interval_ms * self.backoff)
+            return {**state.payload, "reused": True, "next_interval_ms": int(state.interval_ms)}
+
+        state.pending = sig
+        return None
+
+    def record(self, key: Hashable, payload: dict, full_ms: float) -> dict:
+        """
+        전체 분석 결과를 저장하고 다음 샘플 간격을 붙여서 돌려준다.
+        check() 에서 받아 둔 지문은 여기서 결과와 함께 저장된다 (분석이 예외로 끝나면 버려짐).
+        """
+        self._full_ms_avg = full_ms if self._full_ms_avg == 0.0 else 0.9 * self._full_ms_avg + 0.1 * full_ms
+
+        state = self._states.get(key)
+        if state is None:
+            return {**payload, "reused": False, "next_interval_ms": int(self.base_interval_ms)}
+
+        sig, state.pending = state.pending, None
+        if sig is None or payload.get("status") != "ok" or payload.get("result") == NO_FACE:
+            # 얼굴을 못 찾은 프레임은 재사용 대상으로 남기지 않는다 (signature / payload 는 이전 짝 그대로)
+            state.interval_ms = self.min_interval_ms
+            return {**payload, "reused": False, "next_interval_ms": int(state.interval_ms)}
+
+        prev = state.payload
+        changed = prev is None or prev.get("result") != payload.get("result")
+        settling = payload.get("raw") != payload.get("result")
+        if changed or settling:
+            state.interval_ms = self.min_interval_ms
+        else:
+            state.interval_ms = min(self.max_interval_ms, state.interval_ms * self.backoff)
+        state.signature = sig
+        state.payload = payload
+        state.skipped_in_row = 0
+        return {**payload, "reused": False, "next_interval_ms": int(state.interval_ms)}
+
+    def reset(self, key: Hashable) -> None:
+        self._states.pop(key, None)
+
+    def stats(self) -> dict:
+        saved_ms = self.skipped * self._full_ms_avg - self._gate_ms_total
+        return {
+            "sessions": len(self._states),
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "skip_rate": (self.skipped / self.frames) if self.frames else 0.0,
+            "avg_full_ms": self._full_ms_avg,
+            "saved_ms": max(0.0, saved_ms),
+        }
+
+    def _evict_idle(self, now: float) -> None:
+        deadline = now - self.idle_ttl
+        while self._states:
+            oldest = next(iter(self._states.values()))
+            if oldest.last_seen >= deadline:
+                break
+            self._states.popitem(last=False)
@@ -0,0 +1,178 @@
+# backend/inference_backends.py
+"""
+YawnCNN 추론 백엔드 선택 (DROWSY_BACKEND).
+
+- eager        : 기존 그대로 fp32 eager 모델
+- torchscript  : Conv+BN+ReLU 를 합친 뒤 torch.jit.trace + freeze
+- compile      : Conv+BN+ReLU 를 합친 뒤 torch.compile
+- int8_dynamic : Linear 층 동적 int8 양자화 (CPU 전용)
+- int8_static  : FX 그래프 모드 정적 int8 양자화 (CPU 전용).
+                 DROWSY_CALIB_DIR 의 얼굴 crop 이미지로 calibration 한다.
+
+레이블이 eager 와 같은지는 backend/scripts/export_backends.py 로 확인한다.
+
+앙상블 (DROWSY_ENSEMBLE=fold4,fold5,32_0.4)
+- 여러 fold 체크포인트를 Conv+BN 융합 후 파라미터를 쌓아(torch.func.stack_module_state)
+  vmap 한 번으로 모든 모델을 같은 배치에 돌린다. 모델 수만큼 순차 호출하는 것보다 훨씬 싸다.
+- 출력은 평균 확률의 log 라서 detector 의 softmax → 임계값 로직을 그대로 쓴다.
+"""
+from __future__ import annotations
+
+import copy
+import glob
+import os
+from typing import Dict, List, Sequence
+
+import cv2
+import numpy as np
+import torch
+import torch.nn as nn
+
+from backend.best_model import YawnCNN
+from backend.preprocess import FACE_SIZE, normalize_into, resize_face
+
+BACKENDS = ("eager", "torchscript", "compile", "int8_dynamic", "int8_static")
+CPU_ONLY_BACKENDS = ("int8_dynamic", "int8_static")
+
+DEFAULT_CALIB_DIR = "backend/debug_faces"
+
+CHECKPOINTS: Dict[str, str] = {
+    "fold4": "backend/best_model_Yawn_fold4.pth",
+    "fold5": "backend/best_model_Yawn_fold5.pth",
+    "32_0.4": "backend/best_model_Yawn_32_0.4.pth",
+}
+
+# YawnCNN.conv_layers 안의 (Conv2d, BatchNorm2d, ReLU) 인덱스, fc_layers 의 (Linear, ReLU)
+_FUSE_GROUPS = [
+    ["conv_layers.0", "conv_layers.1", "conv_layers.2"],
+    ["conv_layers.4", "conv_layers.5", "conv_layers.6"],
+    ["conv_layers.8", "conv_layers.9", "conv_layers.10"],
+    ["conv_layers.12", "conv_layers.13", "conv_layers.14"],
+    ["fc_layers.1", "fc_layers.2"],
+]
+
+
+def load_eager(model_path: str, device: torch.device) -> YawnCNN:
+    model = YawnCNN(num_classes=3)
+    model.load_state_dict(torch.load(model_path, map_location=device))
+    model.to(device)
+    model.eval()
+    return model
+
+
+def fuse(model: nn.Module) -> nn.Module:
+    """추론용으로 Conv+BN+ReLU / Linear+ReLU 를 하나의 모듈로 합친다 (eval 모드 전제)."""
+    from torch.ao.quantization import fuse_modules
+
+    return fuse_modules(copy.deepcopy(model).eval(), _FUSE_GROUPS)
+
+
+def load_calibration_faces(calib_dir: str, limit: int = 64) -> List[np.ndarray]:
+    """저장된 얼굴 crop(jpg)들을 64x64 RGB uint8 로 읽는다."""
+    faces = []
+    for path in sorted(glob.glob(os.path.join(calib_dir, "*.jpg")))[:limit]:
+        img = cv2.imread(path, cv2.IMREAD_COLOR)
+        if img is None:
+            continue
+        faces.append(resize_face(cv2.cvtColor(img, cv2.COLOR_BGR2RGB)))
+    return faces
+
+
+def faces_to_batch(faces: List[np.ndarray]) -> torch.Tensor:
+    buf = np.empty((len(faces), 3, FACE_SIZE, FACE_SIZE), dtype=np.float32)
+    for i, face in enumerate(faces):
+        normalize_into(face, buf[i])
+    return torch.from_numpy(buf)
+
+
+def _example_input(device: torch.device) -> torch.Tensor:
+    return torch.zeros(1, 3, FACE_SIZE, FACE_SIZE, device=device)
+
+
+def _quantize_static(eager: nn.Module, calib_dir: str) -> nn.Module:
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    faces = load_calibration_faces(calib_dir)
+    if not faces:
+        raise RuntimeError(f"calibration 이미지가 없습니다: {calib_dir}")
+
+    example = (_example_input(torch.device("cpu")),)
+    prepared = prepare_fx(copy.deepcopy(eager).eval(), get_default_qconfig_mapping("x86"), example)
+    with torch.no_grad():
+        for start in range(0, len(faces), 16):
+            prepared(faces_to_batch(faces[start:start + 16]))
+    return convert_fx(prepared)
+
+
+def build(
+    name: str,
+    model_path: str,
+    device: torch.device,
+    calib_dir: str = DEFAULT_CALIB_DIR,
+) -> nn.Module:
+    """이름에 맞는 추론용 모듈을 만든다. 반환 모듈은 (N, 3, 64, 64) 입력 → logits."""
+    if name not in BACKENDS:
+        raise ValueError(f"지원하지 않는 추론 백엔드입니다: {name} (가능: {', '.join(BACKENDS)})")
+    if name in CPU_ONLY_BACKENDS and device.type != "cpu":
+        raise ValueError(f"{name} 백엔드는 CPU 에서만 동작합니다.")
+
+    eager = load_eager(model_path, device)
+    if name == "eager":
+        return eager
+
+    if name == "torchscript":
+        with torch.no_grad():
+            traced = torch.jit.trace(fuse(eager), _example_input(device))
+        return torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+
+    if name == "compile":
+        return torch.compile(fuse(eager), dynamic=True)
+
+    if name == "int8_dynamic":
+        from torch.ao.quantization import quantize_dynamic
+
+        return quantize_dynamic(eager, {nn.Linear}, dtype=torch.qint8)
+
+    return _quantize_static(eager, calib_dir)
+
+
+# ---------------------------
+# 다중 체크포인트 앙상블
+# ---------------------------
+class StackedEnsemble(nn.Module):
+    """같은 구조의 모델 M 개를 vmap 한 번으로 실행하고, 평균 확률의 log 를 돌려준다."""
+
+    def __init__(self, models: Sequence[nn.Module]):
+        super().__init__()
+        from torch.func import stack_module_state
+
+        if not models:
+            raise ValueError("앙상블할 모델이 없습니다.")
+        fused = [fuse(m) for m in models]
+        params, buffers = stack_module_state(fused)
+        self.num_models = len(fused)
+        # vmap 대상이 되는 파라미터는 학습하지 않으므로 일반 텐서로 보관
+        self._params = {k: v.detach() for k, v in params.items()}
+        self._buffers = buffers
+        # functional_call 용 "껍데기" 모듈 (meta 디바이스, 실제 가중치 없음)
+        self._base = copy.deepcopy(fused[0]).to("meta")
+
+    def _call_one(self, params, buffers, x):
+        from torch.func import functional_call
+
+        return functional_call(self._base, (params, buffers), (x,))
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        from torch.func import vmap
+
+        logits = vmap(self._call_one, in_dims=(0, 0, None))(self._params, self._buffers, x)  # (M, N, C)
+        probs = torch.softmax(logits, dim=-1).mean(dim=0)
+        return torch.log(probs)
+
+
+def build_ensemble(names: Sequence[str], device: torch.device) -> StackedEnsemble:
+    unknown = [n for n in names if n not in CHECKPOINTS]
+    if unknown:
+        raise ValueError(f"알 수 없는 체크포인트입니다: {unknown} (가능: {', '.join(CHECKPOINTS)})")
+    return StackedEnsemble([load_eager(CHECKPOINTS[n], device) for n in names]).eval()
@@ -0,0 +1,133 @@
+# backend/inference_batcher.py
+"""
+동시에 들어온 요청들의 입력을 모아 한 번의 모델 호출로 처리하는 마이크로 배처.
+
+- submit()은 입력 하나를 대기열에 넣고, 자기 결과가 나올 때까지 기다린다.
+- 워커 코루틴은 max_batch_size 개가 모이거나 max_wait_ms 가 지나면
+  infer_fn(items) 를 한 번 호출하고, 결과를 요청별로 돌려준다.
+- infer_fn 은 입력 리스트를 받아 같은 길이의 결과 리스트를 돌려줘야 한다.
+  (모델을 지연 로드하는 경우 None 으로 만들고 첫 submit 전에 설정해도 된다)
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, List, Optional, Tuple
+
+
+Runner = Callable[..., Awaitable[Any]]
+
+
+async def _default_runner(fn: Callable, *args):
+    # forward pass 가 이벤트 루프를 막지 않도록 기본 스레드풀에서 실행
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, fn, *args)
+
+
+class InferenceBatcher:
+    def __init__(
+        self,
+        infer_fn: Optional[Callable[[List[Any]], List[Any]]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        runner: Optional[Runner] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size는 1 이상이어야 합니다.")
+        self.infer_fn = infer_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._runner = runner or _default_runner
+
+        self._pending: Deque[Tuple[Any, asyncio.Future]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # 통계
+        self.batches = 0
+        self.items = 0
+
+    # ---------- 라이프사이클 ----------
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task = asyncio.create_task(self._worker())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # 처리되지 못한 요청은 에러로 돌려준다
+        while self._pending:
+            _, fut = self._pending.popleft()
+            if not fut.done():
+                fut.set_exception(RuntimeError("InferenceBatcher가 종료되었습니다."))
+
+    # ---------- 요청 ----------
+    async def submit(self, item: Any) -> Any:
+        if self._task is None:
+            raise RuntimeError("InferenceBatcher.start()가 먼저 호출되어야 합니다.")
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((item, fut))
+        self._wakeup.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+        return await fut
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": (self.items / self.batches) if self.batches else 0.0,
+            "queued": len(self._pending),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+    # ---------- 워커 ----------
+    async def _worker(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if not self._pending:
+                self._wakeup.clear()
+                continue
+
+            # 배치가 덜 찼으면 max_wait 동안 더 모은다
+            if len(self._pending) < self.max_batch_size and self.max_wait > 0:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            size = min(len(self._pending), self.max_batch_size)
+            batch = [self._pending.popleft() for _ in range(size)]
+            if not self._pending:
+                self._wakeup.clear()
+            # 취소된 요청(클라이언트 끊김)은 모델에 넣지 않는다
+            batch = [(item, fut) for item, fut in batch if not fut.done()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                results = await self._runner(self.infer_fn, items)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
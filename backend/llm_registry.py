@@ -0,0 +1,202 @@
+# backend/llm_registry.py
+"""
+프로세스 전역 LangChain 체인 / HTTP 클라이언트 레지스트리.
+
+예전 get_chain() 은 요청마다 ChatOpenAI 를 새로 만들었고, 그때마다 openai SDK 가 새 httpx 클라이언트
+(= 새 커넥션 풀)를 만들어 매 요청이 TCP/TLS 핸드셰이크부터 다시 했다. 체인(prompt | llm | parser)도 매번 조립했다.
+- 설정(ChainConfig: 모델, temperature, timeout, base_url, API 키, 가짜 모델 여부)별로 한 번만 만든다
+- sync / async 호출용 httpx 클라이언트를 keep-alive 풀과 함께 만들어 ChatOpenAI 에 넘긴다
+- 같은 (모델, temperature) 의 설정이 바뀌면(키 교체 등) 새로 만들고, 이전 것은 진행 중인 요청이
+  있을 수 있으므로 바로 닫지 않고 retire_grace_s 가 지난 뒤 다음 get() 에서 닫는다
+  (get() 은 보통 스레드풀에서 불리므로 async 클라이언트는 start() 에서 잡아 둔 앱 루프로 넘겨 닫는다)
+- start()  : startup 훅에서 앱 이벤트 루프를 잡아 둔다
+- aclose() : shutdown 훅에서 모든 커넥션 풀을 닫는다
+
+LLM_MAX_CONNECTIONS / LLM_MAX_KEEPALIVE / LLM_KEEPALIVE_S 로 풀 크기를 조절한다.
+LLM_RETIRE_GRACE_S 는 교체된 체인을 닫기 전까지 기다리는 시간이다.
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from . import llm_stream
+
+
+class ChainConfig(NamedTuple):
+    model: str
+    temperature: float
+    timeout: float
+    base_url: Optional[str]
+    api_key: Optional[str]
+    fake: bool = False
+    fake_token_ms: float = 20.0
+
+    def describe(self) -> dict:
+        # stats 에 API 키가 그대로 나가지 않도록 앞부분 해시만
+        key = hashlib.sha256(self.api_key.encode()).hexdigest()[:8] if self.api_key else None
+        return {
+            "model": self.model,
+            "temperature": self.temperature,
+            "timeout": self.timeout,
+            "base_url": self.base_url,
+            "api_key": key,
+            "fake": self.fake,
+        }
+
+
+class _Entry:
+    __slots__ = ("config", "chain", "http_client", "http_async_client", "uses", "retired_at")
+
+    def __init__(self, config: ChainConfig, chain: Any, http_client: Any, http_async_client: Any):
+        self.config = config
+        self.chain = chain
+        self.http_client = http_client
+        self.http_async_client = http_async_client
+        self.uses = 0
+        self.retired_at = 0.0
+
+
+class ChainRegistry:
+    def __init__(
+        self,
+        loader: Callable[[], Tuple[Any, Any, Any]],
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        keepalive_s: float = 60.0,
+        retire_grace_s: float = 300.0,
+    ):
+        """loader() -> (ChatOpenAI, prompt, StrOutputParser). main.py 의 llm 구성요소를 그대로 쓴다."""
+        self.loader = loader
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_s = keepalive_s
+        self.retire_grace_s = retire_grace_s
+
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, float], _Entry] = {}
+        self._retired: List[_Entry] = []
+        self._closing: Set[Any] = set()  # 닫는 중인 async 클라이언트 (asyncio.Task / concurrent Future)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 메트릭
+        self.builds = 0
+        self.hits = 0
+        self.retired_closed = 0
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+    def get(self, config: ChainConfig) -> Any:
+        if self._retired and time.monotonic() - self._retired[0].retired_at >= self.retire_grace_s:
+            self._close_retired()
+        slot = (config.model, config.temperature)
+        entry = self._entries.get(slot)
+        if entry is not None and entry.config == config:
+            entry.uses += 1
+            self.hits += 1
+            return entry.chain
+        with self._lock:
+            entry = self._entries.get(slot)
+            if entry is None or entry.config != config:
+                if entry is not None:
+                    entry.retired_at = time.monotonic()
+                    self._retired.append(entry)
+                entry = self._build(config)
+                self._entries[slot] = entry
+                self.builds += 1
+            entry.uses += 1
+            return entry.chain
+
+    def _close_retired(self) -> None:
+        """retire_grace_s 가 지난 이전 체인의 커넥션 풀을 닫는다 (그 안에 시작한 요청은 끝났다고 본다)."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None  # 스레드풀에서 불림
+        loop = self._loop if self._loop is not None and not self._loop.is_closed() else None
+        deadline = time.monotonic() - self.retire_grace_s
+        with self._lock:
+            expired = [e for e in self._retired if e.retired_at <= deadline]
+            if not expired:
+                return
+            # 닫을 루프가 없으면 async 클라이언트는 aclose() 때까지 남겨 둔다 (sync 클라이언트만 닫는다)
+            keep = [] if running or loop else [e for e in expired if e.http_async_client is not None]
+            self._retired = [e for e in self._retired if e not in expired or e in keep]
+        for entry in expired:
+            if entry.http_client is not None:
+                entry.http_client.close()
+                entry.http_client = None
+            if entry in keep:
+                continue
+            if entry.http_async_client is not None:
+                if running is not None:
+                    future = running.create_task(entry.http_async_client.aclose())
+                else:
+                    future = asyncio.run_coroutine_threadsafe(entry.http_async_client.aclose(), loop)
+                with self._lock:
+                    self._closing.add(future)
+                future.add_done_callback(self._closed)
+                entry.http_async_client = None
+            self.retired_closed += 1
+
+    def _closed(self, future: Any) -> None:
+        with self._lock:
+            self._closing.discard(future)
+
+    def _build(self, config: ChainConfig) -> _Entry:
+        ChatOpenAI, prompt, StrOutputParser = self.loader()
+        if config.fake:
+            llm = llm_stream.fake_llm(token_delay_ms=config.fake_token_ms)
+            return _Entry(config, prompt | llm | StrOutputParser(), None, None)
+
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=self.keepalive_s,
+        )
+        http_client = httpx.Client(limits=limits, timeout=config.timeout)
+        http_async_client = httpx.AsyncClient(limits=limits, timeout=config.timeout)
+        llm = ChatOpenAI(
+            model=config.model,
+            temperature=config.temperature,
+            timeout=config.timeout,
+            api_key=config.api_key,
+            base_url=config.base_url,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        )
+        return _Entry(config, prompt | llm | StrOutputParser(), http_client, http_async_client)
+
+    async def aclose(self) -> None:
+        with self._lock:
+            closing = list(self._closing)
+        if closing:
+            await asyncio.gather(
+                *(asyncio.wrap_future(f) if isinstance(f, concurrent.futures.Future) else f for f in closing),
+                return_exceptions=True,
+            )
+        with self._lock:
+            entries = list(self._entries.values()) + self._retired
+            self._entries.clear()
+            self._retired = []
+        for entry in entries:
+            if entry.http_client is not None:
+                entry.http_client.close()
+            if entry.http_async_client is not None:
+                await entry.http_async_client.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "builds": self.builds,
+            "hits": self.hits,
+            "retired": len(self._retired),
+            "retired_closed": self.retired_closed,
+            "chains": [dict(entry.config.describe(), uses=entry.uses) for entry in self._entries.values()],
+        }
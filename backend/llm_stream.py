@@ -0,0 +1,118 @@
+# backend/llm_stream.py
+"""
+AI 코치 답변 스트리밍 (Server-Sent Events).
+
+예전 /chat 은 sync 라우트에서 chain.invoke 를 불러 답변이 다 만들어질 때까지(최대 60초)
+스레드풀 슬롯을 잡고 있었고, 첫 바이트도 그때서야 나갔다.
+- sse()        : chain.astream 의 조각을 받는 대로 "data: {...}" 이벤트로 흘려보낸다 (완전 async)
+- 클라이언트가 끊기면 스트림 태스크가 취소되고, finally 에서 astream 을 닫아 OpenAI 요청도 끊는다
+  (Starlette 가 취소하지 못하는 경우를 위해 조각마다 request.is_disconnected() 도 확인)
+- StreamStats  : 첫 토큰까지 시간(TTFT) / 전체 시간 / 완료·취소·에러 수
+- fake_llm()   : LLM_FAKE=1 이면 OpenAI 대신 쓰는 가짜 모델 (오프라인 테스트 / 부하 테스트용)
+
+이벤트 형식:
+    data: {"delta": "..."}                                   답변 조각
+    event: done  / data: {"ttft_ms": .., "total_ms": .., "chars": ..}
+    event: error / data: {"error": "..."}
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Optional
+
+from fastapi import Request
+
+
+def sse_event(data: dict, event: Optional[str] = None) -> bytes:
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+def _percentile(values, q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class StreamStats:
+    def __init__(self, window: int = 1000):
+        self.ttft_ms: Deque[float] = deque(maxlen=window)
+        self.total_ms: Deque[float] = deque(maxlen=window)
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.errors = 0
+        self.active = 0
+
+    def stats(self) -> dict:
+        return {
+            "started": self.started,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "errors": self.errors,
+            "active": self.active,
+            "ttft_ms_p50": _percentile(self.ttft_ms, 0.5),
+            "ttft_ms_p95": _percentile(self.ttft_ms, 0.95),
+            "total_ms_p50": _percentile(self.total_ms, 0.5),
+            "total_ms_p95": _percentile(self.total_ms, 0.95),
+        }
+
+
+async def sse(chain: Any, inputs: dict, request: Optional[Request], stats: StreamStats) -> AsyncIterator[bytes]:
+    """StreamingResponse(media_type="text/event-stream") 본문."""
+    started = time.perf_counter()
+    ttft: Optional[float] = None
+    chars = 0
+    stats.started += 1
+    stats.active += 1
+    stream = chain.astream(inputs)
+    finished = False
+    try:
+        async for chunk in stream:
+            if not chunk:
+                continue
+            if ttft is None:
+                ttft = (time.perf_counter() - started) * 1000.0
+                stats.ttft_ms.append(ttft)
+            chars += len(chunk)
+            yield sse_event({"delta": chunk})
+            if request is not None and await request.is_disconnected():
+                return
+        total = (time.perf_counter() - started) * 1000.0
+        stats.total_ms.append(total)
+        stats.completed += 1
+        finished = True
+        yield sse_event({"ttft_ms": ttft, "total_ms": total, "chars": chars}, event="done")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        stats.errors += 1
+        finished = True
+        print(f"[chat-stream] {type(e).__name__}: {e}")
+        yield sse_event({"error": f"{type(e).__name__}: {e}"}, event="error")
+    finally:
+        stats.active -= 1
+        if not finished:
+            stats.cancelled += 1
+        # 중간에 끊겼으면 upstream(OpenAI) 스트림도 닫는다
+        await stream.aclose()
+
+
+FAKE_REPLY = (
+    "좋아요! 오늘 공부할 범위를 25분 단위로 나눠 보세요. "
+    "한 블록이 끝날 때마다 5분 쉬고, 네 블록마다 길게 쉬면 집중이 오래 갑니다."
+)
+
+
+def fake_llm(reply: str = FAKE_REPLY, token_delay_ms: float = 20.0):
+    """
+    OpenAI 대신 쓰는 가짜 채팅 모델. 글자 하나씩 token_delay_ms 간격으로 스트리밍한다.
+    prompt | llm | parser 체인은 그대로라 스트리밍 경로 전체를 오프라인에서 확인할 수 있다.
+    """
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    return FakeListChatModel(responses=[reply], sleep=token_delay_ms / 1000.0)
@@ -3,6 +3,9 @@ from __future__ import annotations
 
 import os
 import json
+import time
+import asyncio
+import importlib
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List
@@ -19,24 +22,25 @@ if not loaded:
         load_dotenv(dotenv_path=alt_env)
 
 # ---------- FastAPI ----------
-from fastapi import FastAPI, Request, HTTPException, Response
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request, HTTPException, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
-# ---------- LangChain / LCEL ----------
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-from langchain_core.output_parsers import StrOutputParser
-
 # ---------- SQLAlchemy (MySQL) ----------
 from sqlalchemy import (
     create_engine, Column, Integer, String, Text, DateTime, ForeignKey,
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker, Session
-from fastapi import UploadFile, File
-from backend.detector import predict_drowsiness
+from fastapi import UploadFile, File, Form
+# 졸음 감지 모델(torch/cv2/mediapipe)과 LangChain 은 backend.startup 으로 지연 로드한다
+from backend import llm_registry, llm_stream, startup
+from backend.inference_batcher import InferenceBatcher
+from backend.detector_executor import DetectorExecutor, DetectorBusy
+from backend.smoothing import SmoothingStore
+from backend.debug_capture import DebugSampler
+from backend.face_tracker import FaceTracker
+from backend import frame_gate
 
 # ============================================================
 # FastAPI + CORS
@@ -65,6 +69,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 프론트는 다른 origin 이라 노출하지 않으면 Retry-After 를 읽지 못해 백오프가 동작하지 않는다
+    expose_headers=["Retry-After"],
 )
 
 # ============================================================
@@ -94,15 +100,20 @@ server_engine = create_engine(
     pool_recycle=3600,
 )
 
-# DB 생성
-try:
-    with server_engine.connect() as conn:
-        conn.exec_driver_sql(
-            f"CREATE DATABASE IF NOT EXISTS `{MYSQL_DB}` "
-            f"CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;"
-        )
-except Exception as e:
-    print(f"[DB:init] CREATE DATABASE 실패: {type(e).__name__}: {e}")
+# DB 생성 (import 시점이 아니라 startup 백그라운드에서 실행)
+def _ensure_database():
+    try:
+        with server_engine.connect() as conn:
+            conn.exec_driver_sql(
+                f"CREATE DATABASE IF NOT EXISTS `{MYSQL_DB}` "
+                f"CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;"
+            )
+    except Exception as e:
+        print(f"[DB:init] CREATE DATABASE 실패: {type(e).__name__}: {e}")
+        raise
+    return True
+
+database_component = startup.register("database", _ensure_database)
 
 # 앱 레벨 엔진
 engine = create_engine(
@@ -122,18 +133,48 @@ Base = declarative_base()
 # ============================================================
 PRIMARY_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 
-prompt = ChatPromptTemplate.from_messages([
-    ("system", "너는 온라인 스터디룸 사용자를 도와주는 학습 코치야."),
-    MessagesPlaceholder(variable_name="history"),
-    ("human", "{input}"),
-])
+def _load_langchain():
+    # langchain_openai import 만으로도 수백 ms 가 걸려서 첫 채팅 요청 때 로드한다
+    from langchain_openai import ChatOpenAI
+    from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+    from langchain_core.output_parsers import StrOutputParser
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "너는 온라인 스터디룸 사용자를 도와주는 학습 코치야."),
+        MessagesPlaceholder(variable_name="history"),
+        ("human", "{input}"),
+    ])
+    return ChatOpenAI, prompt, StrOutputParser
+
+llm_component = startup.register("llm", _load_langchain)
+
+# LLM_FAKE=1 이면 OpenAI 대신 가짜 모델로 답한다 (키 없이 오프라인 테스트 / 부하 테스트)
+LLM_FAKE = os.getenv("LLM_FAKE", "").lower() in ("1", "true", "yes")
+LLM_FAKE_TOKEN_MS = float(os.getenv("LLM_FAKE_TOKEN_MS", "20"))
+
+# 체인 + keep-alive HTTP 클라이언트는 설정별로 한 번만 만든다 (backend/llm_registry.py)
+chain_registry = llm_registry.ChainRegistry(
+    llm_component.get,
+    max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+    max_keepalive=int(os.getenv("LLM_MAX_KEEPALIVE", "20")),
+    keepalive_s=float(os.getenv("LLM_KEEPALIVE_S", "60")),
+    retire_grace_s=float(os.getenv("LLM_RETIRE_GRACE_S", "300")),
+)
 
 def get_chain():
     api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if not api_key and not LLM_FAKE:
         raise HTTPException(status_code=500, detail="OPENAI_API_KEY가 설정되어 있지 않습니다 (.env 확인).")
-    llm = ChatOpenAI(model=PRIMARY_MODEL, temperature=0.2, timeout=60)
-    return prompt | llm | StrOutputParser()
+    # 환경변수는 요청마다 읽어서 키/주소가 바뀌면 새 클라이언트로 갈아탄다
+    return chain_registry.get(llm_registry.ChainConfig(
+        model=PRIMARY_MODEL,
+        temperature=0.2,
+        timeout=60.0,
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        api_key=api_key,
+        fake=LLM_FAKE,
+        fake_token_ms=LLM_FAKE_TOKEN_MS,
+    ))
 
 # ============================================================
 # 스키마
@@ -170,6 +211,7 @@ def _health_payload(request: Request):
             "db": MYSQL_DB,
             "model": PRIMARY_MODEL,
             "openai_key": has_key,
+            "llm_fake": LLM_FAKE,
             "client_origin": request.headers.get("Origin"),
         }
     except Exception as e:
@@ -183,6 +225,22 @@ def health(request: Request):
 def api_health(request: Request):
     return _health_payload(request)
 
+# liveness: 프로세스가 살아 있는지만 본다 (DB/모델 상태와 무관)
+@app.get("/live")
+@app.get("/api/live")
+def live():
+    return {"ok": True}
+
+# readiness: STARTUP_REQUIRED 에 지정한 구성요소가 모두 로드됐을 때만 200
+STARTUP_PRELOAD = startup.parse_names(os.getenv("STARTUP_PRELOAD", "database,detector"))
+STARTUP_REQUIRED = startup.parse_names(os.getenv("STARTUP_REQUIRED", ",".join(STARTUP_PRELOAD)))
+
+@app.get("/ready")
+@app.get("/api/ready")
+def ready():
+    ok, payload = startup.readiness(STARTUP_REQUIRED)
+    return JSONResponse(status_code=200 if ok else 503, content=payload)
+
 # ---- AI 채팅 엔드포인트 ----
 def _chat_core(req: ChatRequest):
     try:
@@ -221,6 +279,26 @@ def chat_api_legacy(req: ChatRequest):
 def chat_api_ask(req: ChatRequest):
     return _chat_core(req)
 
+# ---- AI 채팅 스트리밍 (SSE) ----
+# 답변 조각을 받는 대로 보낸다. 끊기면 OpenAI 요청도 취소 (backend/llm_stream.py)
+chat_stream_stats = llm_stream.StreamStats()
+
+@app.post("/chat/stream")
+@app.post("/api/chat/stream")
+@app.post("/api/ai-chat/stream")
+async def chat_stream(req: ChatRequest, request: Request):
+    # 첫 요청의 LangChain import 가 이벤트 루프를 막지 않게 스레드에서
+    chain = await asyncio.to_thread(get_chain)
+    return StreamingResponse(
+        llm_stream.sse(chain, {"history": [], "input": req.message}, request, chat_stream_stats),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/chat/stream/stats")
+def chat_stream_stats_view():
+    return {"stream": chat_stream_stats.stats(), "chains": chain_registry.stats()}
+
 # ---- 포켓몬 프록시 ----
 from urllib.request import urlopen, Request as URLRequest
 from urllib.error import HTTPError, URLError
@@ -247,22 +325,267 @@ def focus_nop(tail: str):
     return Response(status_code=204)
 
 # ---- 졸음 감지 엔드포인트 ----
+# 디코딩/얼굴 검출/forward 는 전용 executor 에서 돌려 이벤트 루프를 막지 않는다.
+DETECTOR_EXECUTOR = os.getenv("DETECTOR_EXECUTOR", "thread")  # thread | process
+DETECTOR_WORKERS = int(os.getenv("DETECTOR_WORKERS", "2"))
+DETECTOR_MAX_PENDING = int(os.getenv("DETECTOR_MAX_PENDING", "32"))
+DETECTOR_RETRY_AFTER = int(os.getenv("DETECTOR_RETRY_AFTER", "2"))
+
+detector_executor = DetectorExecutor(
+    kind=DETECTOR_EXECUTOR,
+    max_workers=DETECTOR_WORKERS,
+    max_pending=DETECTOR_MAX_PENDING,
+    retry_after=DETECTOR_RETRY_AFTER,
+)
+
+# 동시 요청의 얼굴 crop 을 모아 YawnCNN 을 배치로 한 번만 호출한다.
+DROWSY_BATCH_MAX_SIZE = int(os.getenv("DROWSY_BATCH_MAX_SIZE", "16"))
+DROWSY_BATCH_MAX_WAIT_MS = float(os.getenv("DROWSY_BATCH_MAX_WAIT_MS", "5"))
+
+# backend.detector import 시 torch/mediapipe import + .pth 로드가 일어나므로 지연 로드.
+# 로드가 끝나면 배처의 infer_fn 을 실제 분류 함수로 연결한다.
+def _on_detector_ready(module):
+    drowsiness_batcher.infer_fn = module.classify_faces
+
+def _load_detector():
+    module = importlib.import_module("backend.detector")
+    # process 모드에서는 워커 프로세스가 각자 모델을 올린다 (_init_process_worker). 부모는 함수 참조만 쓴다.
+    if DETECTOR_EXECUTOR != "process":
+        module.load_model()
+    return module
+
+detector_component = startup.register(
+    "detector",
+    _load_detector,
+    on_ready=_on_detector_ready,
+)
+
+drowsiness_batcher = InferenceBatcher(
+    None,
+    max_batch_size=DROWSY_BATCH_MAX_SIZE,
+    max_wait_ms=DROWSY_BATCH_MAX_WAIT_MS,
+    runner=detector_executor.call,
+)
+
+# 사용자/방 세션별 판정 안정화 (majority | ema | hysteresis)
+drowsiness_smoothing = SmoothingStore(
+    mode=os.getenv("DROWSY_SMOOTHING_MODE", "majority"),
+    window=int(os.getenv("DROWSY_SMOOTHING_WINDOW", "5")),
+    ema_alpha=float(os.getenv("DROWSY_SMOOTHING_EMA_ALPHA", "0.4")),
+    idle_ttl=float(os.getenv("DROWSY_SMOOTHING_IDLE_TTL", "300")),
+    max_sessions=int(os.getenv("DROWSY_SMOOTHING_MAX_SESSIONS", "10000")),
+)
+
+# 디버그 이미지 샘플링 (DROWSY_DEBUG_CAPTURE=off 이면 프레임당 I/O 없음)
+debug_sampler = DebugSampler.from_env()
+
+# 세션별 얼굴 추적: 이전 박스를 재사용해 Mediapipe 전체 프레임 검출 횟수를 줄인다
+DROWSY_TRACKING = os.getenv("DROWSY_TRACKING", "1") == "1"
+face_tracker = FaceTracker(
+    max_reuse=int(os.getenv("DROWSY_TRACK_MAX_REUSE", "5")),
+    margin=float(os.getenv("DROWSY_TRACK_MARGIN", "0.15")),
+    min_confidence=float(os.getenv("DROWSY_TRACK_MIN_CONF", "0.6")),
+    max_diff=float(os.getenv("DROWSY_TRACK_MAX_DIFF", "12")),
+)
+
+# 세션별 중복 프레임 재사용 + 클라이언트 샘플링 간격 제안
+DROWSY_GATE = os.getenv("DROWSY_GATE", "1") == "1"
+drowsiness_gate = frame_gate.FrameGate(
+    threshold=float(os.getenv("DROWSY_GATE_THRESHOLD", "3")),
+    max_skip=int(os.getenv("DROWSY_GATE_MAX_SKIP", "5")),
+    base_interval_ms=float(os.getenv("DROWSY_INTERVAL_MS", "2000")),
+    min_interval_ms=float(os.getenv("DROWSY_INTERVAL_MIN_MS", "1000")),
+    max_interval_ms=float(os.getenv("DROWSY_INTERVAL_MAX_MS", "8000")),
+)
+
+def _busy_response(e: DetectorBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"status": "busy", "error": "졸음 감지 요청이 밀려 있습니다. 잠시 후 다시 시도하세요."},
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+def _unavailable_response(e: startup.ComponentUnavailable):
+    # 모델 로드 실패 후 재시도 대기 중: 프레임마다 로드를 다시 하지 않고 바로 돌려보낸다 (/ready 에 원인)
+    return JSONResponse(
+        status_code=503,
+        content={"status": "unavailable", "error": str(e)},
+        headers={"Retry-After": str(max(1, int(e.retry_in)))},
+    )
+
+async def _analyze_frame(
+    contents: bytes,
+    user_id: Optional[str],
+    room_id: Optional[str],
+    session_key=None,
+    face_only: bool = False,
+) -> dict:
+    """
+    프레임 한 장을 검출 → 배치 분류 → 세션 안정화까지 처리한다. 대기열이 차면 DetectorBusy.
+    face_only=True 면 클라이언트가 잘라 보낸 얼굴 썸네일로 보고 검출/추적을 건너뛴다.
+    세션이 있으면 직전 프레임과 거의 같은 프레임은 직전 결과를 재사용하고,
+    응답에 다음 샘플 간격(next_interval_ms)을 붙인다.
+    """
+    detector = await detector_component.aget()
+    if session_key is None and user_id is not None:
+        session_key = (user_id, room_id)
+    gating = DROWSY_GATE and session_key is not None and not face_only
+
+    if gating:
+        gate_started = time.perf_counter()
+        sig = await detector_executor.run(frame_gate.signature, contents)
+        reused = drowsiness_gate.check(session_key, sig, (time.perf_counter() - gate_started) * 1000.0)
+        if reused is not None:
+            return reused
+
+    full_started = time.perf_counter()
+    payload = await _classify_frame(detector, contents, user_id, session_key, face_only)
+    if gating:
+        payload = drowsiness_gate.record(session_key, payload, (time.perf_counter() - full_started) * 1000.0)
+    return payload
+
+async def _classify_frame(detector, contents: bytes, user_id: Optional[str], session_key, face_only: bool) -> dict:
+    tracking = DROWSY_TRACKING and session_key is not None and not face_only
+
+    capture = debug_sampler.should_capture(user_id)
+    hint = face_tracker.hint(session_key) if tracking else None
+    started = time.perf_counter()
+    if face_only:
+        crop = await detector_executor.run(detector.prepare_face, contents)
+    else:
+        crop = await detector_executor.run(
+            detector.extract_face,
+            contents,
+            capture,
+            hint,
+            face_tracker.margin if tracking else None,
+        )
+    if tracking:
+        face_tracker.update(session_key, crop, hint is not None, (time.perf_counter() - started) * 1000.0)
+    if crop is None:
+        return {"status": "ok", "result": "No Face", "raw": "No Face"}
+
+    probabilities = await drowsiness_batcher.submit(crop.face)
+    raw, confidence = detector.decide(probabilities)
+    if tracking:
+        face_tracker.report_confidence(session_key, confidence)
+
+    # user_id 가 없으면 세션을 구분할 수 없으므로 현재 프레임 결과를 그대로 쓴다
+    result = raw
+    if session_key is not None:
+        stable = drowsiness_smoothing.update(
+            session_key,
+            detector.CLASS_INDEX[raw],
+            probabilities.tolist(),
+        )
+        result = detector.CLASS_MAP[stable]
+    return {"status": "ok", "result": result, "raw": raw}
+
 @app.post("/api/drowsiness")
-async def check_drowsiness(file: UploadFile = File(...)):
+async def check_drowsiness(
+    file: UploadFile = File(...),
+    user_id: Optional[str] = Form(None),
+    room_id: Optional[str] = Form(None),
+):
     try:
         contents = await file.read()
-        result = predict_drowsiness(contents)
-        return {"status": "ok", "result": result}
+        return await _analyze_frame(contents, user_id, room_id)
+    except DetectorBusy as e:
+        return _busy_response(e)
+    except startup.ComponentUnavailable as e:
+        return _unavailable_response(e)
     except Exception as e:
         return _json_500(e, "drowsiness-detection-error")
 
-# ============================================================
-# 앱 라이프사이클
-        return _json_500(e, "drowsiness-detection-error")
+# 스트리밍 경로: 연결 하나로 프레임을 계속 받고 같은 소켓으로 결과를 돌려준다.
+#   ws://.../ws/drowsiness?user_id=..&room_id=..&mode=frame|face
+#   - 바이너리 메시지 = JPEG 프레임 (mode=face 면 클라이언트가 잘라 보낸 얼굴 썸네일)
+#   - 추론이 밀리면 가장 최근 프레임 하나만 남기고 이전 프레임은 버린다 (dropped 로 알림)
+@app.websocket("/ws/drowsiness")
+async def drowsiness_stream(
+    websocket: WebSocket,
+    user_id: Optional[str] = None,
+    room_id: Optional[str] = None,
+    mode: str = "frame",
+):
+    await websocket.accept()
+    # user_id 가 없어도 연결 단위로 안정화/추적 상태를 유지한다
+    session_key = (user_id, room_id) if user_id is not None else ("ws", id(websocket))
+    face_only = mode == "face"
+
+    latest: dict = {"frame": None, "dropped": 0}
+    frame_ready = asyncio.Event()
+
+    async def receive_frames():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            data = message.get("bytes")
+            if not data:
+                continue  # 텍스트 메시지는 무시
+            if latest["frame"] is not None:
+                latest["dropped"] += 1
+            latest["frame"] = data
+            frame_ready.set()
+
+    receiver = asyncio.create_task(receive_frames())
+    try:
+        while True:
+            ready = asyncio.create_task(frame_ready.wait())
+            done, _ = await asyncio.wait({ready, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                ready.cancel()
+                break
+            frame_ready.clear()
+            contents, latest["frame"] = latest["frame"], None
+            dropped, latest["dropped"] = latest["dropped"], 0
+            try:
+                payload = await _analyze_frame(contents, user_id, room_id, session_key, face_only)
+            except DetectorBusy as e:
+                payload = {"status": "busy", "retry_after": e.retry_after}
+            except startup.ComponentUnavailable as e:
+                payload = {"status": "unavailable", "error": str(e), "retry_after": max(1, int(e.retry_in))}
+            except Exception as e:
+                print(f"[drowsiness-stream-error] {type(e).__name__}: {e}")
+                payload = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+            payload["dropped"] = dropped
+            await websocket.send_json(payload)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        drowsiness_smoothing.reset(session_key)
+        face_tracker.reset(session_key)
+        drowsiness_gate.reset(session_key)
+
+@app.get("/api/drowsiness/stats")
+def drowsiness_stats():
+    return {
+        "batcher": drowsiness_batcher.stats(),
+        "executor": detector_executor.stats(),
+        "smoothing": drowsiness_smoothing.stats(),
+        "debug_capture": debug_sampler.stats(),
+        "tracking": face_tracker.stats(),
+        "gate": drowsiness_gate.stats(),
+        "detector": detector_component.status(),
+    }
 
 # ============================================================
 # 앱 라이프사이클
 # ============================================================
 @app.on_event("startup")
-def on_startup():
-    print("[startup] Studyroom Backend unified app started")
\ No newline at end of file
+async def on_startup():
+    detector_executor.start()
+    await drowsiness_batcher.start()
+    # 교체된 체인의 async 클라이언트를 스레드풀의 get_chain() 에서도 이 루프로 넘겨 닫을 수 있게
+    await chain_registry.start()
+    # 무거운 구성요소는 요청 처리를 막지 않도록 백그라운드에서 병렬 로드
+    startup.preload(STARTUP_PRELOAD)
+    print("[startup] Studyroom Backend unified app started")
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await drowsiness_batcher.stop()
+    detector_executor.shutdown()
+    await chain_registry.aclose()
@@ -9,6 +9,7 @@ from .room import Room
 from .message import Message
 from .drowsiness_log import DrowsinessLog
 from .report import Report
+from .focus_total import UserFocusTotal
 from .pokemon import Pokemon
 
 # 3️⃣ DB 테이블 생성
@@ -20,5 +21,6 @@ __all__ = [
     "Message",
     "DrowsinessLog",
     "Report",
+    "UserFocusTotal",
     "Pokemon",
 ]
\ No newline at end of file
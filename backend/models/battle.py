@@ -1,5 +1,6 @@
 # backend/models/battle.py
-from sqlalchemy import Column, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.sql import func
 
 from ..database import Base
 
@@ -12,6 +13,16 @@ class Battle(Base):
     player_b_user_pokemon_id = Column(Integer, ForeignKey("UserPokemon.id"), nullable=False)
     status = Column(String(20), nullable=False, default="ongoing", server_default="ongoing")
 
+    # 배틀 엔진(backend/battle_engine.py) 스냅샷: turn 까지 반영된 HP / 차례
+    player_a_hp = Column(Integer, nullable=True)
+    player_b_hp = Column(Integer, nullable=True)
+    turn = Column(Integer, nullable=False, default=0, server_default="0")
+    next_user_pokemon_id = Column(Integer, ForeignKey("UserPokemon.id"), nullable=True)
+    winner_user_pokemon_id = Column(Integer, ForeignKey("UserPokemon.id"), nullable=True)
+    # 진행 경로: "engine" (POST /{battle_id}/turn) / "damage" (POST /damage). 처음 공격한 경로로 정해지고
+    # 다른 경로의 공격은 409 (두 경로가 같은 turn 을 따로 올리지 않도록)
+    mode = Column(String(10), nullable=True)
+
 
 class BattleMove(Base):
     __tablename__ = "BattleMove"
@@ -27,3 +38,21 @@ class BattleMove(Base):
         UniqueConstraint("battle_id", "user_pokemon_id", "slot", name="uq_battle_slot"),
         UniqueConstraint("battle_id", "user_pokemon_id", "move_id", name="uq_battle_move_once"),
     )
+
+
+class BattleTurn(Base):
+    """턴 로그. 스냅샷(Battle.turn) 이후의 행은 복구 시 다시 적용한다."""
+    __tablename__ = "BattleTurn"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    battle_id = Column(Integer, ForeignKey("Battle.id"), nullable=False)
+    turn = Column(Integer, nullable=False)
+    attacker_user_pokemon_id = Column(Integer, ForeignKey("UserPokemon.id"), nullable=False)
+    battle_move_id = Column(Integer, ForeignKey("BattleMove.id"), nullable=False)
+    damage = Column(Integer, nullable=False)
+    defender_hp = Column(Integer, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("battle_id", "turn", name="uq_battle_turn"),
+    )
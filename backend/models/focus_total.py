@@ -0,0 +1,63 @@
+# backend/models/focus_total.py
+from sqlalchemy import Column, ForeignKey, Integer, event, inspect
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+from ..database import Base
+from .report import Report
+
+
+class UserFocusTotal(Base):
+    """
+    사용자별 누적 집중 시간. ORM 으로 Report 를 insert/update/delete 하면 아래 이벤트가
+    같은 트랜잭션에서 함께 갱신한다. (Core bulk 쓰기는 이벤트를 타지 않으므로
+    그런 경우엔 scripts/rebuild_focus_totals.py 로 다시 맞춘다)
+    """
+    __tablename__ = "UserFocusTotal"
+
+    user_id = Column(Integer, ForeignKey("User.user_id"), primary_key=True)
+    total_focus_time = Column(Integer, nullable=False, default=0, server_default="0")
+    report_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+def _apply(connection, member_id: int, focus_delta: int, count_delta: int) -> None:
+    # Report 를 쓰는 같은 트랜잭션에서 upsert (Report 전체를 다시 SUM 하지 않는다)
+    table = UserFocusTotal.__table__
+    stmt = mysql_insert(table).values(
+        user_id=member_id,
+        total_focus_time=max(0, focus_delta),
+        report_count=max(0, count_delta),
+    )
+    stmt = stmt.on_duplicate_key_update(
+        total_focus_time=table.c.total_focus_time + focus_delta,
+        report_count=table.c.report_count + count_delta,
+    )
+    connection.execute(stmt)
+
+
+@event.listens_for(Report, "after_insert")
+def _report_inserted(mapper, connection, target: Report) -> None:
+    _apply(connection, target.member_id, target.focus_time or 0, 1)
+
+
+@event.listens_for(Report, "after_update")
+def _report_updated(mapper, connection, target: Report) -> None:
+    attrs = inspect(target).attrs
+    focus = attrs.focus_time.history
+    member = attrs.member_id.history
+    if not focus.has_changes() and not member.has_changes():
+        return
+    new_focus = target.focus_time or 0
+    old_focus = (focus.deleted[0] or 0) if focus.deleted else new_focus
+    old_member = member.deleted[0] if member.deleted else target.member_id
+    if old_member == target.member_id:
+        _apply(connection, target.member_id, new_focus - old_focus, 0)
+        return
+    # 다른 사용자로 옮겨진 Report: 예전 사용자에서 빼고 새 사용자에 더한다
+    if old_member is not None:
+        _apply(connection, old_member, -old_focus, -1)
+    _apply(connection, target.member_id, new_focus, 1)
+
+
+@event.listens_for(Report, "after_delete")
+def _report_deleted(mapper, connection, target: Report) -> None:
+    _apply(connection, target.member_id, -(target.focus_time or 0), -1)
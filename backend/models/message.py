@@ -1,14 +1,21 @@
 # backend/models/message.py
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, Text
 from ..database import Base
 
 class Message(Base):
     __tablename__ = "Message"
 
-    # 설계에서 time 이 PK 라고 되어 있는데, 보통 채팅은 같은 시각에 두 개가 들어올 수도 있어서
-    # 안전하게 room_id + time 을 PK 로 묶는 게 좋아.
-    room_id = Column(Integer, ForeignKey("Room.room_id"), primary_key=True)
-    time = Column(DateTime, primary_key=True)  # yyyy-mm-dd hh:mm:ss
+    # 예전에는 room_id + time(초 단위) 이 PK 라 같은 초에 온 메시지가 충돌했다.
+    # id 는 서버가 만드는 시간순 증가 값 (backend/room_chat.py MessageIdGenerator) 이라
+    # 버퍼에 있을 때부터 id 가 정해지고, id 순서 = 보낸 순서다.
+    id = Column(BigInteger, primary_key=True, autoincrement=False)
+    room_id = Column(Integer, ForeignKey("Room.room_id"), nullable=False)
+    time = Column(DateTime, nullable=False)
     sender = Column(Integer, ForeignKey("User.user_id"), nullable=False)
     log = Column(Text, nullable=False)
-    msg_class = Column("class", Integer, nullable=False)  # 0:일반, 1:시스템 ...
\ No newline at end of file
+    msg_class = Column("class", Integer, nullable=False)  # 0:일반, 1:시스템 ...
+
+    __table_args__ = (
+        # 방별 히스토리 keyset 조회 (room_id = ? AND id < ? ORDER BY id DESC)
+        Index("ix_message_room_id", "room_id", "id"),
+    )
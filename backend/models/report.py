@@ -1,5 +1,5 @@
 # backend/models/report.py
-from sqlalchemy import Column, Integer, Date, DateTime, String, ForeignKey
+from sqlalchemy import Column, Integer, Date, DateTime, String, ForeignKey, Index
 from ..database import Base
 
 class Report(Base):
@@ -12,4 +12,8 @@ class Report(Base):
     drowsy_count = Column(Integer, nullable=False, default=0)
     evolution_stage = Column(String(20))
     join_time = Column(DateTime)
-    leave_time = Column(DateTime)
\ No newline at end of file
+    leave_time = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_report_member_date", "member_id", "study_date"),
+    )
@@ -1,5 +1,5 @@
 # backend/models/room.py
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String
 from ..database import Base
 
 class Room(Base):
@@ -8,4 +8,14 @@ class Room(Base):
     room_id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String(100), unique=True, nullable=False)
     owner_id = Column(Integer, ForeignKey("User.user_id"), nullable=False)
-    member_id = Column(Integer, ForeignKey("User.user_id"), nullable=False)
\ No newline at end of file
+    member_id = Column(Integer, ForeignKey("User.user_id"), nullable=False)
+    capacity = Column(Integer, nullable=True)  # None 이면 제한 없음
+    purpose = Column(String(50), nullable=True)
+    battle_enabled = Column(Boolean, nullable=False, default=False, server_default="0")
+    # 현재 참여자 수. 참여/나가기에서 조건부 UPDATE 로만 바꾼다 (routers/room.py)
+    member_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        # 방 목록 필터 + room_id keyset 페이지네이션
+        Index("ix_room_purpose_id", "purpose", "room_id"),
+    )
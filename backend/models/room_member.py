@@ -13,4 +13,7 @@ class RoomMember(Base):
     __table_args__ = (
         UniqueConstraint("room_id", "user_id", name="uq_room_user"),
         # 같은 사람이 같은 방에 중복으로 들어가지 못하게
+        # (room_id 가 앞이라 방별 참여자 조회/COUNT 도 이 인덱스만으로 처리된다)
+        # 한 사람은 한 방에만 (참여 시 INSERT 가 실패하는 것으로 확인한다)
+        UniqueConstraint("user_id", name="uq_room_member_user"),
     )
\ No newline at end of file
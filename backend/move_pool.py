@@ -0,0 +1,138 @@
+# backend/move_pool.py
+"""
+배틀 생성용 기술 후보 풀 (프로세스 내 캐시).
+
+예전 _choose_moves_for_battle 는 호출마다 공격 기술 전체를 DB 에서 읽고, 후보 리스트 4개를
+새로 만들고, 남은 칸을 채울 때마다 전체를 다시 훑었다. create_battle 은 이걸 두 번 불렀다.
+여기서는 move 테이블을 한 번 읽어
+- strong (power 100~150) / weak (1~40) / physical / special : id 배열
+- by_power : power 내림차순 id 배열
+을 만들어 두고, 선택은 버킷에서 무작위로 뽑기만 한다 (이미 뽑은 최대 3개만 피하면 되므로 O(1)).
+
+scripts/fetch_moves.py 가 move 테이블을 갱신하면 cache_stamp 의 "move_pool" stamp 를 갱신하고,
+다음 조회 때 다시 읽는다. rng 를 넘기면(random.Random(seed)) 선택이 재현 가능하다.
+"""
+from __future__ import annotations
+
+import random
+import threading
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from . import cache_stamp, models
+
+STAMP = "move_pool"
+MOVES_PER_BATTLE = 4
+_MAX_REJECTS = 8
+
+
+class MoveRow(NamedTuple):
+    id: int
+    name: str
+    name_ko: Optional[str]
+    power: int
+    pp: Optional[int]
+    damage_class: str
+    type: str
+
+
+def _ids(rows: Iterable[MoveRow]) -> array:
+    return array("i", (r.id for r in rows))
+
+
+class MovePool:
+    __slots__ = ("moves", "strong", "weak", "physical", "special", "by_power", "version")
+
+    def __init__(self, rows: List[MoveRow], version: int = 0):
+        self.moves: Dict[int, MoveRow] = {r.id: r for r in rows}
+        self.strong = _ids(r for r in rows if 100 <= r.power <= 150)
+        self.weak = _ids(r for r in rows if 1 <= r.power <= 40)
+        self.physical = _ids(r for r in rows if r.damage_class == "physical")
+        self.special = _ids(r for r in rows if r.damage_class == "special")
+        # 같은 power 면 id 순 (예전 max() 는 먼저 나온 행을 골랐다)
+        self.by_power = _ids(sorted(rows, key=lambda r: (-r.power, r.id)))
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    @staticmethod
+    def _sample(bucket: array, chosen: Set[int], rng: random.Random) -> Optional[int]:
+        if not bucket:
+            return None
+        # 제외할 id 가 최대 3개뿐이라 대부분 한두 번 만에 끝난다
+        for _ in range(_MAX_REJECTS):
+            move_id = bucket[rng.randrange(len(bucket))]
+            if move_id not in chosen:
+                return move_id
+        rest = [move_id for move_id in bucket if move_id not in chosen]
+        return rng.choice(rest) if rest else None
+
+    def choose(self, rng: Optional[random.Random] = None) -> List[MoveRow]:
+        """강한 기술 / 약한 기술 / 물리 / 특수 각 1개, 모자라면 power 높은 순으로 채운다."""
+        rng = rng or random
+        chosen: List[int] = []
+        seen: Set[int] = set()
+        for bucket in (self.strong, self.weak, self.physical, self.special):
+            move_id = self._sample(bucket, seen, rng)
+            if move_id is not None:
+                chosen.append(move_id)
+                seen.add(move_id)
+
+        for move_id in self.by_power:
+            if len(chosen) >= MOVES_PER_BATTLE:
+                break
+            if move_id not in seen:
+                chosen.append(move_id)
+                seen.add(move_id)
+        return [self.moves[move_id] for move_id in chosen[:MOVES_PER_BATTLE]]
+
+
+def load(db: Session, version: int = 0) -> MovePool:
+    """공격 기술(power > 0, status 제외)을 한 번 읽어 풀을 만든다."""
+    rows = (
+        db.query(
+            models.Move.id,
+            models.Move.name,
+            models.Move.name_ko,
+            models.Move.power,
+            models.Move.pp,
+            models.Move.damage_class,
+            models.Move.type,
+        )
+        .filter(
+            models.Move.power.isnot(None),
+            models.Move.power > 0,
+            models.Move.damage_class != "status",
+        )
+        .order_by(models.Move.id.asc())
+        .all()
+    )
+    return MovePool([MoveRow(*row) for row in rows], version)
+
+
+_lock = threading.Lock()
+_pool: Optional[MovePool] = None
+
+
+def get(db: Session) -> MovePool:
+    """캐시된 기술 풀. stamp 가 바뀌었거나 아직 없으면 db 로 한 번 다시 읽는다."""
+    global _pool
+    version = cache_stamp.version(STAMP)
+    pool = _pool
+    if pool is not None and pool.version == version:
+        return pool
+    with _lock:
+        if _pool is None or _pool.version != version:
+            _pool = load(db, version)
+        return _pool
+
+
+def invalidate() -> None:
+    """현재 프로세스 캐시를 버리고, 다른 프로세스도 다시 읽도록 stamp 를 갱신한다."""
+    global _pool
+    with _lock:
+        _pool = None
+    cache_stamp.touch(STAMP)
@@ -0,0 +1,50 @@
+# backend/preprocess.py
+"""
+졸음 감지 입력 전처리 (cv2 + numpy 만 사용).
+
+예전 경로는 PIL 디코딩 → np.array → RGB2BGR → (Mediapipe 용) BGR2RGB → crop →
+BGR2RGB → PIL → torchvision transform 순서로 프레임 전체를 4번 이상 복사/변환했다.
+지금은
+- decode_frame   : cv2.imdecode(memoryview) 한 번 + 같은 버퍼에서 BGR → RGB
+- resize_face    : crop 뷰를 64x64 로 축소
+- normalize_into : (3, 64, 64) float32 배치 버퍼에 정규화 결과를 바로 기록
+만 거치고, 모든 단계가 RGB 하나로 통일되어 있다.
+"""
+import os
+
+import cv2
+import numpy as np
+
+# 학습 시와 동일: 64x64, ToTensor + Normalize(mean=0.5, std=0.5)
+# x / 255 → (x - 0.5) / 0.5  ==  x / 127.5 - 1
+FACE_SIZE = 64
+_NORM_SCALE = 1.0 / 127.5
+
+# DROWSY_DECODE_REDUCED=1 이면 JPEG 를 1/2 해상도로 바로 디코딩 (640x480 → 320x240)
+DECODE_REDUCED = os.getenv("DROWSY_DECODE_REDUCED", "0") == "1"
+
+
+def decode_frame(image_bytes: bytes, reduced: bool = DECODE_REDUCED) -> np.ndarray:
+    """
+    JPEG/PNG 바이트를 복사 없이 cv2.imdecode 로 디코딩해 RGB 배열로 돌려준다.
+    BGR → RGB 변환은 같은 버퍼에서 한 번만 한다.
+    """
+    buf = np.frombuffer(memoryview(image_bytes), dtype=np.uint8)
+    img = cv2.imdecode(buf, cv2.IMREAD_REDUCED_COLOR_2 if reduced else cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("이미지를 디코딩할 수 없습니다.")
+    cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
+    return img
+
+
+def resize_face(face_rgb: np.ndarray) -> np.ndarray:
+    """얼굴 crop(뷰)을 64x64 uint8 RGB 로 줄인다. 축소는 INTER_AREA (PIL 안티앨리어싱과 유사)."""
+    h, w = face_rgb.shape[:2]
+    interp = cv2.INTER_AREA if (h > FACE_SIZE or w > FACE_SIZE) else cv2.INTER_LINEAR
+    return cv2.resize(face_rgb, (FACE_SIZE, FACE_SIZE), interpolation=interp)
+
+
+def normalize_into(face64: np.ndarray, out: np.ndarray) -> None:
+    """64x64x3 uint8 → (3, 64, 64) float32 정규화 결과를 out 에 직접 쓴다."""
+    np.multiply(face64.transpose(2, 0, 1), _NORM_SCALE, out=out, casting="unsafe")
+    np.subtract(out, 1.0, out=out)
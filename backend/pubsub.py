@@ -0,0 +1,88 @@
+# backend/pubsub.py
+"""
+시그널링 허브용 pub/sub 브로커.
+
+허브는 메시지를 직접 소켓에 보내지 않고 브로커에 publish 하고, 브로커가 돌려주는 메시지를
+자기 워커에 붙은 소켓들에 나눠 준다. 그래서 워커가 여러 개면 브로커만 공유하는 구현으로
+바꾸면 된다 (publish / subscribe / unsubscribe / start / stop 만 맞추면 허브는 그대로).
+
+- 페이로드는 bytes. 허브가 한 번 직렬화한 것을 그대로 나르고 다시 인코딩하지 않는다.
+- LocalBroker: 같은 프로세스 안에서만 전달하는 기본 구현 (워커 1개, 개발용 대역)
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
+
+Handler = Callable[[str, bytes], Union[None, Awaitable[None]]]
+
+
+class Broker:
+    """브로커 인터페이스. channel 은 'room:123', 'lobby' 같은 문자열."""
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, channel: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def subscribe(self, prefix: str, handler: Handler) -> None:
+        """channel 이 prefix 로 시작하는 메시지를 handler(channel, data) 로 받는다. 같은 구독을 두 번 하면 한 번만 등록."""
+        raise NotImplementedError
+
+    def unsubscribe(self, prefix: str, handler: Handler) -> None:
+        """subscribe 한 (prefix, handler) 를 뺀다. 없으면 무시."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class LocalBroker(Broker):
+    """
+    프로세스 안 브로커. publish 는 구독자 핸들러를 바로 호출한다.
+    핸들러가 코루틴이면 태스크로 띄워서 publish 가 느린 구독자를 기다리지 않게 한다.
+    """
+
+    def __init__(self):
+        self._subs: List[Tuple[str, Handler]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 통계
+        self.published = 0
+        self.delivered = 0
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        self._loop = None
+
+    async def publish(self, channel: str, data: bytes) -> None:
+        self.published += 1
+        for prefix, handler in tuple(self._subs):
+            if not channel.startswith(prefix):
+                continue
+            self.delivered += 1
+            result = handler(channel, data)
+            if asyncio.iscoroutine(result):
+                asyncio.create_task(result)
+
+    def subscribe(self, prefix: str, handler: Handler) -> None:
+        if (prefix, handler) not in self._subs:
+            self._subs.append((prefix, handler))
+
+    def unsubscribe(self, prefix: str, handler: Handler) -> None:
+        if (prefix, handler) in self._subs:
+            self._subs.remove((prefix, handler))
+
+    def stats(self) -> dict:
+        return {
+            "type": "local",
+            "subscriptions": len(self._subs),
+            "published": self.published,
+            "delivered": self.delivered,
+        }
@@ -0,0 +1,447 @@
+# backend/room_chat.py
+"""
+방 채팅: 시간순 id + write-behind 저장 + 방별 최근 메시지 캐시.
+
+- MessageIdGenerator : 밀리초 시각 + 워커 번호 + 순번으로 증가하는 id (JS 에서도 안전한 53비트)
+- post()             : id 를 붙여 방 tail 캐시와 저장 대기열에 넣고 바로 돌려준다 (DB 왕복 없음)
+- flush 루프         : flush_interval_ms 마다 (또는 flush_batch 개가 쌓이면) 대기열을 한 번의
+                       executemany INSERT 로 저장. 제약 위반이 있으면 한 줄씩 다시 넣어 그 줄만 버린다.
+                       (id 중복은 워커 번호가 겹쳤다는 뜻이라 rows_duplicate 로 따로 센다)
+                       저장하지 못한 줄만 대기열 앞에 다시 넣는다. 그 줄 자체의 오류(DataError 등)는
+                       max_retries 번 실패하면 버리고, 연결 오류로 시도하지 못한 줄은 횟수에 넣지 않는다.
+                       대기열이 max_pending 을 넘으면 post() 가 ChatBacklogFull 로 새 메시지를 받지 않는다.
+- history()          : 방마다 최근 tail_size 개를 메모리에 두고, 그 안에서 답할 수 있으면 DB 를 읽지 않는다.
+                       (입장할 때 before_id 없이 읽는 최근 메시지는 DB 를 읽지 않는다)
+                       그보다 이전은 (room_id, id) 인덱스로 keyset 조회 (id < before_id ORDER BY id DESC).
+
+상태 변경은 이벤트 루프 스레드에서만 하고, DB 읽기/쓰기만 asyncio.to_thread 로 내보낸다 (battle_engine 과 같음).
+워커가 여러 개면 tail 캐시는 워커별이라 다른 워커에서 보낸 메시지는 flush 된 뒤 새로 읽은 방에만 보인다.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import IO, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+
+EPOCH_MS = 1735657200000  # 2025-01-01 00:00:00 KST
+WORKER_BITS = 4
+SEQUENCE_BITS = 8
+ER_DUP_ENTRY = 1062  # MySQL: 중복 키
+
+
+class MessageIdGenerator:
+    """
+    (ms - EPOCH_MS) << 12 | worker << 8 | seq. 41비트 시각이라 합쳐도 2^53 미만 (JS Number 로 안전).
+    같은 밀리초에 256개를 넘기거나 시계가 뒤로 가면 논리 시각을 1ms 앞당겨 계속 증가시킨다.
+    """
+
+    def __init__(self, worker_id: int = 0):
+        self.worker_id = worker_id % (1 << WORKER_BITS)
+        self._last_ms = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            now = int(time.time() * 1000) - EPOCH_MS
+            if now > self._last_ms:
+                self._last_ms, self._seq = now, 0
+            else:
+                self._seq += 1
+                if self._seq >= 1 << SEQUENCE_BITS:
+                    self._last_ms, self._seq = self._last_ms + 1, 0
+            return (self._last_ms << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS) | self._seq
+
+
+class ChatBacklogFull(Exception):
+    """저장 대기열이 가득 참 (DB 장애 등). 라우터에서 503 + Retry-After 로 바꾼다."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__(f"chat backlog is full (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+def _row(m: models.Message) -> dict:
+    return {
+        "id": m.id,
+        "room_id": m.room_id,
+        "sender": m.sender,
+        "log": m.log,
+        "msg_class": m.msg_class,
+        "time": m.time,
+    }
+
+
+class _Tail:
+    __slots__ = ("messages", "complete", "last_seen")
+
+    def __init__(self, messages: List[dict], size: int, complete: bool, now: float):
+        self.messages: Deque[dict] = deque(messages, maxlen=size)
+        # True 면 이 방의 메시지가 전부 들어 있다 (tail 보다 적게 쌓인 방)
+        self.complete = complete
+        self.last_seen = now
+
+
+class RoomChat:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_interval_ms: float = 100.0,
+        flush_batch: int = 500,
+        tail_size: int = 50,
+        max_rooms: int = 5000,
+        idle_ttl: float = 900.0,
+        max_pending: int = 50000,
+        max_retries: int = 3,
+        id_gen: Optional[MessageIdGenerator] = None,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = max(0.01, flush_interval_ms / 1000.0)
+        self.flush_batch = max(1, flush_batch)
+        self.tail_size = max(1, tail_size)
+        self.max_rooms = max(1, max_rooms)
+        self.idle_ttl = idle_ttl
+        self.max_pending = max(self.flush_batch, max_pending)
+        self.max_retries = max(1, max_retries)
+        self.id_gen = id_gen or MessageIdGenerator()
+
+        self._tails: "OrderedDict[int, _Tail]" = OrderedDict()
+        self._loading: Dict[int, asyncio.Future] = {}
+        self._pending: List[dict] = []
+        self._inflight: List[dict] = []  # flush 중인 배치 (읽기에서 빠지지 않도록)
+        self._attempts: Dict[int, int] = {}  # 메시지 id -> 그 줄 때문에 실패한 횟수
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        # 메트릭
+        self.posted = 0
+        self.tail_hits = 0
+        self.db_reads = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.rows_duplicate = 0
+        self.rejected = 0
+
+    # ---------- 라이프사이클 ----------
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._closing = False
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        # cancel() 은 쓰지 않는다: _wakeup 이 막 set 된 순간이면 wait_for 가 취소를 삼켜 루프가 끝나지 않는다
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        # 남은 메시지를 모두 저장하고 종료
+        await self.flush()
+
+    # ---------- 쓰기 ----------
+    async def post(self, room_id: int, sender: int, log: str, msg_class: int = 0) -> dict:
+        if self._task is None:
+            raise RuntimeError("RoomChat.start()가 먼저 호출되어야 합니다.")
+        if len(self._pending) >= self.max_pending:
+            self.rejected += 1
+            raise ChatBacklogFull()
+        tail = await self._tail(room_id)
+        message = {
+            "id": self.id_gen.next_id(),
+            "room_id": room_id,
+            "sender": sender,
+            "log": log,
+            "msg_class": msg_class,
+            "time": datetime.now(),
+        }
+        if tail.complete and len(tail.messages) == self.tail_size:
+            tail.complete = False  # 가장 오래된 메시지가 밀려난다
+        tail.messages.append(message)
+        self._pending.append(message)
+        self.posted += 1
+        if len(self._pending) >= self.flush_batch:
+            self._wakeup.set()
+        return message
+
+    # ---------- 읽기 ----------
+    async def history(self, room_id: int, before_id: Optional[int], limit: int) -> Tuple[List[dict], Optional[int]]:
+        """
+        before_id 보다 이전 메시지 limit 개 (오래된 것 → 최신) 와 다음 before_id.
+        tail 안에서 limit 개를 채울 수 있거나 tail 이 방 전체면 메모리에서, 아니면 DB keyset 조회.
+        """
+        tail = await self._tail(room_id)
+        cached = [m for m in tail.messages if before_id is None or m["id"] < before_id]
+        if len(cached) > limit or tail.complete:
+            self.tail_hits += 1
+            page = cached[-limit:]
+            more = len(cached) > limit
+        else:
+            self.db_reads += 1
+            rows = await asyncio.to_thread(self._read_before, room_id, before_id, limit + 1)
+            # 아직 flush 안 된 메시지도 합친다 (id 로 중복 제거)
+            merged = {m["id"]: m for m in rows}
+            for m in self._inflight + self._pending:
+                if m["room_id"] == room_id and (before_id is None or m["id"] < before_id):
+                    merged[m["id"]] = m
+            ordered = sorted(merged.values(), key=lambda m: m["id"])
+            page = ordered[-limit:]
+            more = len(ordered) > limit
+        return page, (page[0]["id"] if more and page else None)
+
+    def _read_before(self, room_id: int, before_id: Optional[int], limit: int) -> List[dict]:
+        db = self.session_factory()
+        try:
+            query = db.query(models.Message).filter(models.Message.room_id == room_id)
+            if before_id is not None:
+                query = query.filter(models.Message.id < before_id)
+            return [_row(m) for m in query.order_by(models.Message.id.desc()).limit(limit)]
+        finally:
+            db.close()
+
+    async def _tail(self, room_id: int) -> _Tail:
+        tail = self._tails.get(room_id)
+        if tail is not None:
+            self._tails.move_to_end(room_id)
+            tail.last_seen = time.monotonic()
+            return tail
+
+        # 같은 방을 동시에 여러 번 읽지 않도록 로딩 중인 future 를 공유한다
+        pending = self._loading.get(room_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        pending = asyncio.get_running_loop().create_future()
+        self._loading[room_id] = pending
+        try:
+            rows = await asyncio.to_thread(self._read_before, room_id, None, self.tail_size)
+        except BaseException as e:
+            pending.set_exception(e)
+            pending.exception()  # 기다리는 쪽이 없어도 경고가 남지 않게
+            raise
+        finally:
+            self._loading.pop(room_id, None)
+        self.db_reads += 1
+        complete = len(rows) < self.tail_size
+        merged = {m["id"]: m for m in rows}
+        for m in self._inflight + self._pending:
+            if m["room_id"] == room_id:
+                merged[m["id"]] = m
+        messages = sorted(merged.values(), key=lambda m: m["id"])
+        tail = _Tail(messages, self.tail_size, complete and len(messages) <= self.tail_size, time.monotonic())
+        self._tails[room_id] = tail
+        pending.set_result(tail)
+        self._evict()
+        return tail
+
+    def forget(self, room_id: int) -> None:
+        """
+        방이 삭제됐을 때 tail 과 아직 저장 안 된 메시지를 버린다 (방이 없어 어차피 저장되지 않는다).
+        REST 라우터(스레드풀)에서 부르므로 정리는 이벤트 루프로 넘긴다.
+        """
+        loop = self._loop
+        if loop is None:
+            self._forget(room_id)
+            return
+        try:
+            loop.call_soon_threadsafe(self._forget, room_id)
+        except RuntimeError:
+            pass  # 루프가 이미 닫힘 (종료 중)
+
+    def _forget(self, room_id: int) -> None:
+        self._tails.pop(room_id, None)
+        if any(m["room_id"] == room_id for m in self._pending):
+            self._pending = [m for m in self._pending if m["room_id"] != room_id]
+
+    # ---------- write-behind ----------
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[room-chat] flush 실패: {type(e).__name__}: {e}")
+            self._evict()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            rows, self._pending = self._pending, []
+            if not rows:
+                return
+            self._inflight = rows
+            try:
+                written, dropped, duplicate, failed, untried = await asyncio.to_thread(self._persist, rows)
+            except Exception:
+                # 세션을 열지도 못함: 다음 flush 에서 다시 시도 (그 사이 쌓인 메시지보다 앞에 둔다)
+                self._pending[:0] = rows
+                self.flush_errors += 1
+                raise
+            finally:
+                self._inflight = []
+
+            # 저장 못 한 줄만 다시 넣는다. 그 줄 자체가 실패한 경우만 횟수를 센다
+            retry: List[dict] = []
+            for row in failed:
+                attempts = self._attempts.get(row["id"], 0) + 1
+                if attempts >= self.max_retries:
+                    self._attempts.pop(row["id"], None)
+                    dropped += 1
+                    print(f"[room-chat] 메시지 {attempts}회 저장 실패 (버림): room_id={row['room_id']} id={row['id']}")
+                else:
+                    self._attempts[row["id"]] = attempts
+                    retry.append(row)
+            retry.extend(untried)
+            if self._attempts and len(retry) < len(rows):
+                keep = {row["id"] for row in retry}
+                for row in rows:
+                    if row["id"] not in keep:
+                        self._attempts.pop(row["id"], None)
+            if retry:
+                self._pending[:0] = retry
+            if untried:
+                self.flush_errors += 1
+            self.flushes += 1
+            self.rows_written += written
+            self.rows_dropped += dropped
+            self.rows_duplicate += duplicate
+
+    def _persist(self, rows: List[dict]) -> Tuple[int, int, int, List[dict], List[dict]]:
+        """
+        반환: (저장, 제약 위반으로 버림, id 중복으로 버림, 그 줄 때문에 실패한 행, 연결 오류 등으로 시도하지 못한 행)
+        """
+        db = self.session_factory()
+        written = dropped = duplicate = 0
+        failed: List[dict] = []
+        i = 0
+        try:
+            try:
+                db.execute(insert(models.Message), rows)
+                db.commit()
+                return len(rows), 0, 0, [], []
+            except (IntegrityError, DataError):
+                db.rollback()
+            # 없는 방/사용자, 너무 긴 값 등 줄 단위 문제가 섞인 배치: 한 줄씩 넣고 실패한 줄만 골라낸다
+            for i, row in enumerate(rows):
+                try:
+                    db.execute(insert(models.Message), [row])
+                    db.commit()
+                    written += 1
+                except IntegrityError as e:
+                    db.rollback()
+                    if getattr(e.orig, "args", (None,))[0] == ER_DUP_ENTRY:
+                        # 다른 워커가 같은 worker id 로 같은 밀리초에 만든 id. 설정 문제라 크게 남긴다
+                        duplicate += 1
+                        print(
+                            f"[room-chat] 메시지 id 중복 (버림, worker_id={self.id_gen.worker_id} 가 다른 워커와 겹침): "
+                            f"room_id={row['room_id']} id={row['id']}"
+                        )
+                    else:
+                        dropped += 1
+                        print(f"[room-chat] 메시지 저장 실패 (버림): room_id={row['room_id']} id={row['id']}")
+                except DataError as e:
+                    db.rollback()
+                    failed.append(row)
+                    print(f"[room-chat] 메시지 저장 실패 (다시 시도): room_id={row['room_id']} id={row['id']}: {e.orig}")
+            return written, dropped, duplicate, failed, []
+        except Exception as e:
+            # 연결 끊김 등: 지금까지 커밋한 줄은 빼고, 나머지는 다음 flush 에서 그대로 다시 시도
+            try:
+                db.rollback()
+            except Exception:
+                pass
+            print(f"[room-chat] flush 중단 ({type(e).__name__}: {e}), {len(rows) - i}개는 다음에 다시 시도")
+            return written, dropped, duplicate, failed, rows[i:]
+        finally:
+            db.close()
+
+    def _evict(self) -> None:
+        """idle_ttl 동안 안 쓰인 방과 max_rooms 초과분(LRU)의 tail 을 내린다."""
+        deadline = time.monotonic() - self.idle_ttl
+        over = len(self._tails) - self.max_rooms
+        for room_id in list(self._tails):
+            if over <= 0 and self._tails[room_id].last_seen >= deadline:
+                break  # 앞쪽이 가장 오래 안 쓰인 방
+            del self._tails[room_id]
+            over -= 1
+
+    def stats(self) -> dict:
+        return {
+            "active_rooms": len(self._tails),
+            "posted": self.posted,
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "tail_hits": self.tail_hits,
+            "db_reads": self.db_reads,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "rows_written": self.rows_written,
+            "rows_dropped": self.rows_dropped,
+            "rows_duplicate": self.rows_duplicate,
+            "worker_id": self.id_gen.worker_id,
+        }
+
+
+# (워커 번호, 잠금 파일). 프로세스가 살아 있는 동안 잠금을 잡고 있는다
+_worker_lock: Optional[Tuple[int, IO]] = None
+
+
+def default_worker_id() -> int:
+    """
+    CHAT_WORKER_ID(0~15) 가 있으면 그 값을 쓴다. 여러 서버(호스트)에서 띄울 때는 서버마다 다른 값을 줘야 한다.
+    없으면 같은 호스트의 워커끼리 겹치지 않도록 CHAT_WORKER_LOCK_DIR(기본: 임시 디렉터리)의
+    chat-worker-<n>.lock 중 비어 있는 번호를 flock 으로 잡는다. 16개가 모두 잡혀 있으면 시작하지 않는다.
+    """
+    global _worker_lock
+    limit = 1 << WORKER_BITS
+    raw = os.getenv("CHAT_WORKER_ID")
+    if raw:
+        worker_id = int(raw)
+        if not 0 <= worker_id < limit:
+            raise RuntimeError(f"CHAT_WORKER_ID 는 0~{limit - 1} 이어야 합니다: {raw}")
+        return worker_id
+    if _worker_lock is not None:
+        return _worker_lock[0]
+
+    try:
+        import fcntl
+    except ImportError:
+        # flock 이 없는 환경(Windows 등)은 워커 1개로 가정한다
+        if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+            raise RuntimeError("워커가 여러 개면 워커마다 다른 CHAT_WORKER_ID 를 지정해야 합니다.")
+        return 0
+
+    lock_dir = os.getenv("CHAT_WORKER_LOCK_DIR") or tempfile.gettempdir()
+    for worker_id in range(limit):
+        handle = open(os.path.join(lock_dir, f"chat-worker-{worker_id}.lock"), "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            continue
+        _worker_lock = (worker_id, handle)
+        return worker_id
+    raise RuntimeError(f"사용할 수 있는 채팅 워커 번호가 없습니다 ({limit}개 모두 사용 중). CHAT_WORKER_ID 를 지정하세요.")
@@ -0,0 +1,225 @@
+# backend/room_directory.py
+"""
+로비용 방 목록(GET /api/rooms/all/profile) 캐시.
+
+예전에는 로비 클라이언트가 폴링할 때마다 Room x RoomMember 조인에 더해, 참여자 전원의
+Report 전체를 SUM(focus_time) 했다 (리포트 이력이 쌓일수록 느려짐).
+- 누적 집중 시간은 UserFocusTotal 요약 테이블에서 읽는다 (Report 를 스캔하지 않음)
+- 목록은 JSON 으로 한 번 직렬화해 두고, 같은 버전이면 그 바이트를 그대로 돌려준다
+- ETag 는 본문 해시라 If-None-Match 가 같으면 304 (본문 없음)
+- 방 생성 / 참여 / 나가기 커밋 후 invalidate() → cache_stamp 로 다른 워커도 다시 만든다
+- 집중 시간은 방 변화와 무관하게 바뀌므로 ttl 초가 지나면 다시 만든다
+
+방이 수천 개가 되면 전체 목록 대신 page_rooms() (GET /api/rooms) 로 room_id keyset 페이지를 쓴다.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import not_, or_
+from sqlalchemy.orm import Session
+
+from . import cache_stamp, models
+from .schemas.room import RoomParticipantsOut
+
+STAMP = "room_directory"
+
+
+class Snapshot(NamedTuple):
+    body: bytes
+    etag: str
+    version: int
+    built_at: float
+
+
+def build_rooms(db: Session) -> List[dict]:
+    """방 목록 + 참여자 + 평균 누적 집중 시간. 쿼리 2번 (Report 는 읽지 않는다)."""
+    rows = (
+        db.query(
+            models.Room.room_id,
+            models.Room.title,
+            models.Room.capacity,
+            models.Room.battle_enabled,
+            models.Room.purpose,
+            models.RoomMember.user_id,
+        )
+        .outerjoin(
+            models.RoomMember,
+            models.RoomMember.room_id == models.Room.room_id,
+        )
+        .order_by(models.Room.room_id)
+        .all()
+    )
+
+    room_map: Dict[int, Dict] = {}
+    all_user_ids = set()
+    for room_id, title, capacity, battle_enabled, purpose, user_id in rows:
+        if room_id not in room_map:
+            room_map[room_id] = {
+                "room_id": room_id,
+                "title": title,
+                "capacity": capacity,
+                "battle_enabled": battle_enabled,
+                "purpose": purpose,
+                "participant_user_ids": [],
+            }
+        if user_id is not None:
+            room_map[room_id]["participant_user_ids"].append(user_id)
+            all_user_ids.add(user_id)
+
+    focus_totals = _focus_totals(db, all_user_ids)
+
+    return [
+        RoomParticipantsOut(
+            room_id=data["room_id"],
+            title=data["title"],
+            capacity=data["capacity"],
+            battle_enabled=data["battle_enabled"],
+            purpose=data["purpose"],
+            participant_count=len(data["participant_user_ids"]),
+            participant_user_ids=data["participant_user_ids"],
+            average_focus_time=(
+                sum(focus_totals.get(uid, 0) for uid in data["participant_user_ids"])
+                / len(data["participant_user_ids"])
+                if data["participant_user_ids"]
+                else 0.0
+            ),
+        ).model_dump()
+        for data in room_map.values()
+    ]
+
+
+def _focus_totals(db: Session, user_ids) -> Dict[int, int]:
+    if not user_ids:
+        return {}
+    return dict(
+        db.query(models.UserFocusTotal.user_id, models.UserFocusTotal.total_focus_time)
+        .filter(models.UserFocusTotal.user_id.in_(user_ids))
+        .all()
+    )
+
+
+def page_rooms(
+    db: Session,
+    cursor: Optional[int] = None,
+    limit: int = 20,
+    purpose: Optional[str] = None,
+    battle_enabled: Optional[bool] = None,
+    has_free_seat: Optional[bool] = None,
+    full: bool = False,
+) -> Tuple[List[dict], Optional[int]]:
+    """
+    room_id keyset 페이지. (items, next_cursor)
+    OFFSET 이 아니라 room_id > cursor 로 이어서 읽으므로 뒤 페이지도 비용이 같다.
+    참여자 수는 Room.member_count 를 읽는다 (RoomMember COUNT 없음).
+    summary 는 쿼리 1번, full 은 이 페이지 방들의 참여자 + 누적 집중 시간 쿼리 2번이 더해진다.
+    """
+    query = db.query(
+        models.Room.room_id,
+        models.Room.title,
+        models.Room.capacity,
+        models.Room.battle_enabled,
+        models.Room.purpose,
+        models.Room.member_count,
+    )
+    if cursor is not None:
+        query = query.filter(models.Room.room_id > cursor)
+    if purpose is not None:
+        query = query.filter(models.Room.purpose == purpose)
+    if battle_enabled is not None:
+        query = query.filter(models.Room.battle_enabled == battle_enabled)
+    if has_free_seat is not None:
+        free = or_(models.Room.capacity.is_(None), models.Room.member_count < models.Room.capacity)
+        query = query.filter(free if has_free_seat else not_(free))
+
+    # 한 개 더 읽어서 다음 페이지가 있는지 본다
+    rows = query.order_by(models.Room.room_id.asc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [
+        {
+            "room_id": room_id,
+            "title": title,
+            "capacity": capacity,
+            "battle_enabled": bool(enabled),
+            "purpose": room_purpose,
+            "participant_count": count,
+        }
+        for room_id, title, capacity, enabled, room_purpose, count in rows
+    ]
+
+    if full and items:
+        members: Dict[int, List[int]] = {item["room_id"]: [] for item in items}
+        for room_id, user_id in (
+            db.query(models.RoomMember.room_id, models.RoomMember.user_id)
+            .filter(models.RoomMember.room_id.in_(members.keys()))
+            .order_by(models.RoomMember.room_id, models.RoomMember.id)
+        ):
+            members[room_id].append(user_id)
+        totals = _focus_totals(db, {uid for ids in members.values() for uid in ids})
+        for item in items:
+            ids = members[item["room_id"]]
+            item["participant_user_ids"] = ids
+            item["average_focus_time"] = (sum(totals.get(uid, 0) for uid in ids) / len(ids)) if ids else 0.0
+
+    next_cursor = items[-1]["room_id"] if has_more else None
+    return items, next_cursor
+
+
+class RoomDirectory:
+    def __init__(self, ttl: float = 10.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Snapshot] = None
+
+        # 메트릭
+        self.hits = 0
+        self.builds = 0
+        self.not_modified = 0
+
+    def get(self, db: Session) -> Snapshot:
+        version = cache_stamp.version(STAMP)
+        snap = self._snapshot
+        if snap is not None and snap.version == version and time.monotonic() - snap.built_at < self.ttl:
+            self.hits += 1
+            return snap
+        with self._lock:
+            snap = self._snapshot
+            if snap is None or snap.version != version or time.monotonic() - snap.built_at >= self.ttl:
+                body = json.dumps(build_rooms(db), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+                snap = Snapshot(body, etag, version, time.monotonic())
+                self._snapshot = snap
+                self.builds += 1
+            return snap
+
+    def invalidate(self) -> None:
+        """방 생성/참여/나가기 커밋 후 호출. 다른 워커도 stamp 를 보고 다시 만든다."""
+        with self._lock:
+            self._snapshot = None
+        cache_stamp.touch(STAMP)
+
+    def stats(self) -> dict:
+        snap = self._snapshot
+        return {
+            "hits": self.hits,
+            "builds": self.builds,
+            "not_modified": self.not_modified,
+            "etag": snap.etag if snap else None,
+            "age_s": (time.monotonic() - snap.built_at) if snap else None,
+        }
+
+
+directory = RoomDirectory(ttl=float(os.getenv("ROOM_DIRECTORY_TTL", "10")))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
@@ -1,19 +1,24 @@
 # backend/routers/battle.py
+import asyncio
+import os
 import random
-from typing import List
+from typing import List, NamedTuple, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, insert, or_, update
+from sqlalchemy.orm import Session, aliased
 
-from ..database import get_db
-from .. import models
+from ..database import SessionLocal, get_db
+from .. import battle_engine, models, move_pool, type_chart
 from ..schemas.battle import (
     BattleAssignedMove,
     BattleCreateRequest,
     BattleCreateResponse,
     BattleDamageRequest,
     BattleDamageResponse,
-    BattleMoveOut,
+    BattleStateResponse,
+    BattleTurnRequest,
+    BattleTurnResponse,
 )
 
 router = APIRouter(
@@ -21,38 +26,26 @@ router = APIRouter(
     tags=["battle"],
 )
 
-
+# BATTLE_SEED 를 주면 기술 선택 / 엔진 데미지 난수가 재현 가능해진다 (테스트용)
+_rng = random.Random(int(os.environ["BATTLE_SEED"])) if os.getenv("BATTLE_SEED") else random.Random()
+
+# 진행 중인 배틀을 메모리에서 처리하고 턴 로그/스냅샷은 모아서 저장 (backend/battle_engine.py)
+engine = battle_engine.BattleEngine(
+    SessionLocal,
+    flush_interval_ms=float(os.getenv("BATTLE_FLUSH_MS", "200")),
+    snapshot_every=int(os.getenv("BATTLE_SNAPSHOT_EVERY", "10")),
+    idle_ttl=float(os.getenv("BATTLE_IDLE_TTL", "900")),
+    max_battles=int(os.getenv("BATTLE_MAX_ACTIVE", "10000")),
+    max_retries=int(os.getenv("BATTLE_FLUSH_RETRIES", "3")),
+    rng=_rng,
+)
+router.add_event_handler("startup", engine.start)
+router.add_event_handler("shutdown", engine.stop)
 
 
 def _get_type_multiplier(db: Session, move_type: str, def_type1: str | None, def_type2: str | None) -> float:
-    """type_effectiveness 테이블 기준으로 배율을 계산한다."""
-    def get_type_id(tname: str | None) -> int | None:
-        if not tname:
-            return None
-        row = db.query(models.Type).filter(models.Type.name == tname).first()
-        return row.id if row else None
-
-    atk_id = get_type_id(move_type)
-    if atk_id is None:
-        return 1.0
-
-    def mul_for(def_name: str | None) -> float:
-        def_id = get_type_id(def_name)
-        if def_id is None:
-            return 1.0
-        row = (
-            db.query(models.TypeEffectiveness)
-            .filter(
-                models.TypeEffectiveness.attacker_type_id == atk_id,
-                models.TypeEffectiveness.defender_type_id == def_id,
-            )
-            .first()
-        )
-        return row.multiplier if row else 1.0
-
-    m1 = mul_for(def_type1)
-    m2 = mul_for(def_type2)
-    return m1 * m2
+    """캐시된 타입 상성표 기준으로 배율을 계산한다. (상성표가 이미 올라와 있으면 DB 조회 없음)"""
+    return type_chart.get(db).multiplier(move_type, def_type1, def_type2)
 
 
 def _get_user_pokemon(db: Session, user_pokemon_id: int) -> models.UserPokemon:
@@ -144,145 +137,270 @@ def _ensure_battle_participant(db: Session, battle: models.Battle, user_pokemon_
         )
 
 
-@router.post("/damage", response_model=BattleDamageResponse)
-def calc_battle_damage(payload: BattleDamageRequest, db: Session = Depends(get_db)):
+class _AttackContext(NamedTuple):
+    battle: models.Battle
+    attacker_up_id: Optional[int]
+    defender_up_id: Optional[int]
+    attacker_team_id: Optional[int]
+    defender_team_id: Optional[int]
+    attacker: Optional[models.Pokemon]
+    defender: Optional[models.Pokemon]
+    battle_move_id: Optional[int]
+    current_pp: Optional[int]
+    move: Optional[models.Move]
+
+
+def _load_attack_context(db: Session, payload: BattleDamageRequest) -> _AttackContext:
     """
-    공격자/방어자(UserPokemon id)와 선택한 move_id, battle_id를 받아
-    타입 상성 + STAB + 랜덤 보정을 포함한 데미지를 계산한다.
+    공격 한 번에 필요한 검증/데이터를 조인 한 번으로 가져온다.
+    (배틀, 양쪽 UserPokemon, 활성 팀 여부, 기본 포켓몬, 배틀 기술, 기술 정보)
     """
-    battle = _get_battle(db, payload.battle_id)
-    attacker_up = _get_user_pokemon(db, payload.attacker_user_pokemon_id)
-    defender_up = _get_user_pokemon(db, payload.defender_user_pokemon_id)
-    _ensure_battle_participant(db, battle, attacker_up.id)
-    _ensure_battle_participant(db, battle, defender_up.id)
-    _ensure_active_team(db, attacker_up.id)
-    _ensure_active_team(db, defender_up.id)
-
-    attacker = _get_base_pokemon(db, attacker_up.poke_id)
-    defender = _get_base_pokemon(db, defender_up.poke_id)
-
-    # 배틀에 등록된 기술인지 및 PP 확인
-    bm = (
-        db.query(models.BattleMove)
-        .filter(
-            models.BattleMove.battle_id == battle.id,
-            models.BattleMove.user_pokemon_id == attacker_up.id,
-            models.BattleMove.move_id == payload.move_id,
+    attacker_up = aliased(models.UserPokemon)
+    defender_up = aliased(models.UserPokemon)
+    attacker_team = aliased(models.UserActiveTeam)
+    defender_team = aliased(models.UserActiveTeam)
+    attacker = aliased(models.Pokemon)
+    defender = aliased(models.Pokemon)
+
+    row = (
+        db.query(
+            models.Battle,
+            attacker_up.id,
+            defender_up.id,
+            attacker_team.id,
+            defender_team.id,
+            attacker,
+            defender,
+            models.BattleMove.id,
+            models.BattleMove.current_pp,
+            models.Move,
+        )
+        .outerjoin(attacker_up, attacker_up.id == payload.attacker_user_pokemon_id)
+        .outerjoin(defender_up, defender_up.id == payload.defender_user_pokemon_id)
+        .outerjoin(attacker_team, attacker_team.user_pokemon_id == attacker_up.id)
+        .outerjoin(defender_team, defender_team.user_pokemon_id == defender_up.id)
+        .outerjoin(attacker, attacker.poke_id == attacker_up.poke_id)
+        .outerjoin(defender, defender.poke_id == defender_up.poke_id)
+        .outerjoin(
+            models.BattleMove,
+            and_(
+                models.BattleMove.battle_id == models.Battle.id,
+                models.BattleMove.user_pokemon_id == attacker_up.id,
+                models.BattleMove.move_id == payload.move_id,
+            ),
         )
+        .outerjoin(models.Move, models.Move.id == models.BattleMove.move_id)
+        .filter(models.Battle.id == payload.battle_id)
         .first()
     )
-    if not bm:
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="해당 배틀을 찾을 수 없습니다.",
+        )
+    return _AttackContext(*row)
+
+
+def _validate_attack(ctx: _AttackContext) -> None:
+    """예전 단계별 조회와 같은 순서/메시지로 검증한다."""
+    if ctx.attacker_up_id is None or ctx.defender_up_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="해당 UserPokemon을 찾을 수 없습니다.",
+        )
+    participants = {ctx.battle.player_a_user_pokemon_id, ctx.battle.player_b_user_pokemon_id}
+    if ctx.attacker_up_id not in participants or ctx.defender_up_id not in participants:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="해당 배틀의 참가 포켓몬이 아닙니다.",
+        )
+    if ctx.attacker_team_id is None or ctx.defender_team_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="활성 팀에 등록된 포켓몬이 아닙니다.",
+        )
+    if ctx.attacker is None or ctx.defender is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="포켓몬 기본 정보가 없습니다.",
+        )
+    if ctx.battle_move_id is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="해당 배틀에 등록되지 않은 기술입니다.",
         )
-    if bm.current_pp is not None and bm.current_pp <= 0:
+    if ctx.current_pp is not None and ctx.current_pp <= 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="기술의 PP가 부족합니다.",
         )
+    if ctx.move is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="기술 정보를 찾을 수 없습니다.",
+        )
+
+
+def _consume_pp(db: Session, battle_move_id: int) -> bool:
+    """
+    PP 를 원자적으로 1 차감한다. 읽고-빼고-쓰는 대신 조건부 UPDATE 한 번이라
+    같은 기술을 동시에 눌러도 PP 가 음수가 되거나 차감이 누락되지 않는다.
+    """
+    result = db.execute(
+        update(models.BattleMove)
+        .where(
+            models.BattleMove.id == battle_move_id,
+            models.BattleMove.current_pp > 0,
+        )
+        .values(current_pp=models.BattleMove.current_pp - 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def _turn_conflict(detail: str) -> HTTPException:
+    # 다른 요청이 먼저 턴을 가져갔다: 상태(GET /{battle_id}/state 또는 응답의 turn)를 다시 읽고 재시도하면 된다
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=detail,
+        headers={"Retry-After": "0"},
+    )
+
+
+def _claim_turn(db: Session, ctx: _AttackContext, expected_turn: int) -> bool:
+    """
+    Battle.turn 을 버전으로 쓰는 compare-and-swap.
+    expected_turn 이 그대로이고 공격자 차례일 때만 turn 을 1 올리고 차례를 넘긴다.
+    행 잠금을 미리 잡지 않고, 충돌하면 rowcount 0 으로 바로 실패한다.
+    배틀 엔진이 잡은 배틀(mode=engine)은 건드리지 않고, 처음 공격이면 mode 를 damage 로 잡는다.
+    """
+    battle = models.Battle
+    result = db.execute(
+        update(battle)
+        .where(
+            battle.id == ctx.battle.id,
+            battle.turn == expected_turn,
+            battle.status == "ongoing",
+            or_(battle.next_user_pokemon_id.is_(None), battle.next_user_pokemon_id == ctx.attacker_up_id),
+            or_(battle.mode.is_(None), battle.mode == battle_engine.DAMAGE_MODE),
+        )
+        .values(turn=battle.turn + 1, next_user_pokemon_id=ctx.defender_up_id, mode=battle_engine.DAMAGE_MODE)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+@router.post("/damage", response_model=BattleDamageResponse)
+def calc_battle_damage(payload: BattleDamageRequest, db: Session = Depends(get_db)):
+    """
+    공격자/방어자(UserPokemon id)와 선택한 move_id, battle_id를 받아
+    타입 상성 + STAB + 랜덤 보정을 포함한 데미지를 계산한다.
+    조회는 조인 1번 + 턴 CAS UPDATE 1번 + PP 차감 UPDATE 1번, 한 트랜잭션 (타입 상성은 프로세스 캐시).
 
-    move = _get_move(db, payload.move_id)
+    expected_turn 을 보내면 그 턴일 때만 처리하고, 다른 공격이 먼저 처리됐으면 409 (재시도 가능).
+    보내지 않으면 방금 읽은 turn 을 기대값으로 쓴다.
+    """
+    ctx = _load_attack_context(db, payload)
+    _validate_attack(ctx)
+
+    current_turn = ctx.battle.turn or 0
+    expected_turn = current_turn if payload.expected_turn is None else payload.expected_turn
+    if ctx.battle.status != "ongoing":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="이미 끝난 배틀입니다.",
+        )
+    if ctx.battle.mode == battle_engine.ENGINE_MODE:
+        # 엔진 메모리의 turn 과 따로 올라가지 않도록 재시도 없는 409
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="배틀 엔진(POST /{battle_id}/turn)으로 진행 중인 배틀입니다. 같은 경로로 이어서 공격하세요.",
+        )
+    if expected_turn != current_turn:
+        raise _turn_conflict(f"배틀이 이미 {current_turn}턴입니다. 상태를 다시 읽고 재시도하세요.")
+    if ctx.battle.next_user_pokemon_id not in (None, ctx.attacker_up_id):
+        raise _turn_conflict("상대 포켓몬의 차례입니다.")
+
+    if not _claim_turn(db, ctx, expected_turn):
+        db.rollback()
+        raise _turn_conflict("다른 공격이 먼저 처리되었습니다. 상태를 다시 읽고 재시도하세요.")
+
+    # 검증 이후 다른 요청이 먼저 마지막 PP 를 썼을 수 있으므로 UPDATE 결과로 다시 확인
+    # (current_pp 가 NULL 인 기술은 PP 제한 없음). 실패하면 턴 CAS 도 함께 되돌린다.
+    if ctx.current_pp is not None and not _consume_pp(db, ctx.battle_move_id):
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="기술의 PP가 부족합니다.",
+        )
 
     type_mult = _get_type_multiplier(
         db,
-        move_type=move.type,
-        def_type1=defender.type1,
-        def_type2=defender.type2,
+        move_type=ctx.move.type,
+        def_type1=ctx.defender.type1,
+        def_type2=ctx.defender.type2,
     )
-    damage, _ = _calc_damage(attacker, defender, move, type_mult)
-
-    # PP 차감
-    if bm.current_pp is not None:
-        bm.current_pp = max(0, bm.current_pp - 1)
+    damage, _ = _calc_damage(ctx.attacker, ctx.defender, ctx.move, type_mult)
     db.commit()
 
     return BattleDamageResponse(
         damage=damage,
+        turn=expected_turn + 1,
     )
 
 
-def _choose_moves_for_battle(db: Session) -> List[models.Move]:
-    moves = (
-        db.query(models.Move)
-        .filter(
-            models.Move.power.isnot(None),
-            models.Move.power > 0,
-            models.Move.damage_class != "status",
-        )
-        .all()
-    )
-    if not moves:
+def _choose_moves_for_battle(db: Session, rng: Optional[random.Random] = None) -> List[move_pool.MoveRow]:
+    """캐시된 기술 풀에서 4개를 뽑는다. (풀이 이미 올라와 있으면 DB 조회 없음)"""
+    pool = move_pool.get(db)
+    if not len(pool):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="공격 기술 후보가 존재하지 않습니다.",
         )
+    return pool.choose(rng or _rng)
 
-    chosen: list[models.Move] = []
-    chosen_ids: set[int] = set()
 
-    strong_candidates = [m for m in moves if 100 <= m.power <= 150]
-    strong_random = random.choice(strong_candidates) if strong_candidates else None
-    if strong_random:
-        chosen.append(strong_random)
-        chosen_ids.add(strong_random.id)
+async def _warm_move_pool() -> None:
+    # 첫 배틀 생성이 풀 적재를 기다리지 않도록 시작 시 미리 읽는다 (실패하면 첫 요청 때 다시 시도)
+    def _load():
+        db = SessionLocal()
+        try:
+            move_pool.get(db)
+        finally:
+            db.close()
 
-    weak_candidates = [m for m in moves if 1 <= m.power <= 40 and m.id not in chosen_ids]
-    weak_random = random.choice(weak_candidates) if weak_candidates else None
-    if weak_random:
-        chosen.append(weak_random)
-        chosen_ids.add(weak_random.id)
-
-    physical_candidates = [
-        m for m in moves
-        if m.damage_class == "physical" and m.id not in chosen_ids
-    ]
-    physical_random = random.choice(physical_candidates) if physical_candidates else None
-    if physical_random:
-        chosen.append(physical_random)
-        chosen_ids.add(physical_random.id)
-
-    special_candidates = [
-        m for m in moves
-        if m.damage_class == "special" and m.id not in chosen_ids
-    ]
-    special_random = random.choice(special_candidates) if special_candidates else None
-    if special_random:
-        chosen.append(special_random)
-        chosen_ids.add(special_random.id)
+    try:
+        await asyncio.to_thread(_load)
+    except Exception as e:
+        print(f"[battle] move pool preload 실패: {type(e).__name__}: {e}")
 
-    while len(chosen) < 4:
-        rest = [m for m in moves if m.id not in chosen_ids]
-        if not rest:
-            break
-        best_rest = max(rest, key=lambda m: m.power)
-        chosen.append(best_rest)
-        chosen_ids.add(best_rest.id)
 
-    return chosen[:4]
+router.add_event_handler("startup", _warm_move_pool)
 
 
 def _assign_moves_to_battle(
-    db: Session,
     battle_id: int,
     user_pokemon_id: int,
-    moves: List[models.Move],
-) -> List[BattleAssignedMove]:
+    moves: List[move_pool.MoveRow],
+) -> tuple[list[dict], List[BattleAssignedMove]]:
+    """BattleMove insert 용 행과 응답용 기술 목록을 기술 풀 데이터만으로 만든다."""
+    rows: list[dict] = []
     assigned: List[BattleAssignedMove] = []
     for idx, mv in enumerate(moves, start=1):
-        bm = models.BattleMove(
-            battle_id=battle_id,
-            user_pokemon_id=user_pokemon_id,
-            move_id=mv.id,
-            slot=idx,
-            current_pp=mv.pp,
+        rows.append(
+            {
+                "battle_id": battle_id,
+                "user_pokemon_id": user_pokemon_id,
+                "move_id": mv.id,
+                "slot": idx,
+                "current_pp": mv.pp,
+            }
         )
-        db.add(bm)
         assigned.append(
             BattleAssignedMove(
                 move_id=mv.id,
                 name=mv.name,
-                name_ko=getattr(mv, "name_ko", None),
+                name_ko=mv.name_ko,
                 power=mv.power,
                 pp=mv.pp,
                 damage_class=mv.damage_class,
@@ -290,37 +408,64 @@ def _assign_moves_to_battle(
                 current_pp=mv.pp,
             )
         )
-    return assigned
+    return rows, assigned
+
+
+def _ensure_battle_players(db: Session, user_pokemon_ids: List[int]) -> None:
+    """두 UserPokemon 존재 + 활성 팀 등록 여부를 조인 한 번으로 확인한다."""
+    rows = dict(
+        db.query(models.UserPokemon.id, models.UserActiveTeam.id)
+        .outerjoin(models.UserActiveTeam, models.UserActiveTeam.user_pokemon_id == models.UserPokemon.id)
+        .filter(models.UserPokemon.id.in_(user_pokemon_ids))
+        .all()
+    )
+    if any(up_id not in rows for up_id in user_pokemon_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="해당 UserPokemon을 찾을 수 없습니다.",
+        )
+    if any(rows[up_id] is None for up_id in user_pokemon_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="활성 팀에 등록된 포켓몬이 아닙니다.",
+        )
 
 
 @router.post("", response_model=BattleCreateResponse, status_code=status.HTTP_201_CREATED)
 def create_battle(payload: BattleCreateRequest, db: Session = Depends(get_db)):
-    """배틀을 생성하고 각 포켓몬의 기술 4개를 확정 저장한다."""
-    player_a_up = _get_user_pokemon(db, payload.player_a_user_pokemon_id)
-    player_b_up = _get_user_pokemon(db, payload.player_b_user_pokemon_id)
-    _ensure_active_team(db, player_a_up.id)
-    _ensure_active_team(db, player_b_up.id)
-
-    battle = models.Battle(
-        player_a_user_pokemon_id=player_a_up.id,
-        player_b_user_pokemon_id=player_b_up.id,
-        status="ongoing",
-    )
-    db.add(battle)
-    db.commit()
-    db.refresh(battle)
+    """
+    배틀을 생성하고 각 포켓몬의 기술 4개를 확정 저장한다.
+    검증 조인 1번 + Battle insert 1번 + BattleMove 8행 executemany 1번, 커밋은 한 번.
+    """
+    player_a_id = payload.player_a_user_pokemon_id
+    player_b_id = payload.player_b_user_pokemon_id
+    _ensure_battle_players(db, [player_a_id, player_b_id])
 
     player_a_moves = _choose_moves_for_battle(db)
     player_b_moves = _choose_moves_for_battle(db)
 
-    assigned_player_a = _assign_moves_to_battle(db, battle.id, player_a_up.id, player_a_moves)
-    assigned_player_b = _assign_moves_to_battle(db, battle.id, player_b_up.id, player_b_moves)
-    db.commit()
+    try:
+        result = db.execute(
+            insert(models.Battle).values(
+                player_a_user_pokemon_id=player_a_id,
+                player_b_user_pokemon_id=player_b_id,
+                status="ongoing",
+            )
+        )
+        battle_id = result.inserted_primary_key[0]
+
+        rows_a, assigned_player_a = _assign_moves_to_battle(battle_id, player_a_id, player_a_moves)
+        rows_b, assigned_player_b = _assign_moves_to_battle(battle_id, player_b_id, player_b_moves)
+        db.execute(insert(models.BattleMove), rows_a + rows_b)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
 
     return BattleCreateResponse(
-        battle_id=battle.id,
-        player_a_user_pokemon_id=player_a_up.id,
-        player_b_user_pokemon_id=player_b_up.id,
+        battle_id=battle_id,
+        player_a_user_pokemon_id=player_a_id,
+        player_b_user_pokemon_id=player_b_id,
         player_a_moves=assigned_player_a,
         player_b_moves=assigned_player_b,
     )
@@ -368,3 +513,35 @@ def get_battle_moves_for_participant(
         )
         for bm, mv in rows
     ]
+
+
+@router.post("/{battle_id}/turn", response_model=BattleTurnResponse)
+async def play_battle_turn(battle_id: int, payload: BattleTurnRequest):
+    """
+    배틀 엔진에서 턴을 처리한다. 상태는 메모리에 있고 DB 저장은 write-behind 로 모아서 한다.
+    (캐시에 없는 배틀만 처음 한 번 스냅샷 + 턴 로그에서 복구)
+    """
+    try:
+        result = await engine.play_turn(
+            battle_id, payload.attacker_user_pokemon_id, payload.slot, payload.expected_turn
+        )
+    except battle_engine.BattleError as e:
+        if e.status_code == status.HTTP_409_CONFLICT:
+            raise _turn_conflict(e.detail)
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return BattleTurnResponse(**result._asdict())
+
+
+@router.get("/{battle_id}/state", response_model=BattleStateResponse)
+async def get_battle_state(battle_id: int):
+    """현재 HP / PP / 차례 (엔진 메모리 기준)."""
+    try:
+        state = await engine.get(battle_id)
+    except battle_engine.BattleError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return BattleStateResponse(**state.to_dict())
+
+
+@router.get("/engine/stats")
+def get_battle_engine_stats():
+    return engine.stats()
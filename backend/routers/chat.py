@@ -0,0 +1,84 @@
+# backend/routers/chat.py
+import asyncio
+import os
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from ..database import SessionLocal
+from .. import models, room_chat, signaling
+from ..schemas.message import MessageHistoryPage, MessageOut, MessagePost
+
+router = APIRouter(
+    prefix="/api/rooms",
+    tags=["chat"],
+)
+
+# 메시지는 메모리 tail 과 저장 대기열에 넣고 모아서 저장 (backend/room_chat.py)
+chat = room_chat.RoomChat(
+    SessionLocal,
+    flush_interval_ms=float(os.getenv("CHAT_FLUSH_MS", "100")),
+    flush_batch=int(os.getenv("CHAT_FLUSH_BATCH", "500")),
+    tail_size=int(os.getenv("CHAT_TAIL_SIZE", "50")),
+    max_rooms=int(os.getenv("CHAT_MAX_ROOMS", "5000")),
+    max_pending=int(os.getenv("CHAT_MAX_PENDING", "50000")),
+    max_retries=int(os.getenv("CHAT_FLUSH_RETRIES", "3")),
+    id_gen=room_chat.MessageIdGenerator(room_chat.default_worker_id()),
+)
+router.add_event_handler("startup", chat.start)
+router.add_event_handler("shutdown", chat.stop)
+
+
+def _is_member(room_id: int, user_id: int) -> bool:
+    # uq_room_user (room_id, user_id) 인덱스 한 번
+    db = SessionLocal()
+    try:
+        return (
+            db.query(models.RoomMember.id)
+            .filter(models.RoomMember.room_id == room_id, models.RoomMember.user_id == user_id)
+            .first()
+        ) is not None
+    finally:
+        db.close()
+
+
+@router.post("/{room_id}/messages", response_model=MessageOut, status_code=status.HTTP_201_CREATED)
+async def post_message(room_id: int, payload: MessagePost):
+    """메시지를 보낸다. 저장은 모아서 하므로 응답 직후 아주 잠깐은 DB 에 없을 수 있다 (조회 API 에는 보인다)."""
+    if not await asyncio.to_thread(_is_member, room_id, payload.sender):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="이 스터디룸에 참여하고 있지 않습니다.",
+        )
+    try:
+        message = await chat.post(room_id, payload.sender, payload.log, payload.msg_class)
+    except room_chat.ChatBacklogFull as e:
+        # DB 가 밀려 저장 대기열이 가득 참: 메모리를 더 쓰지 않고 잠시 뒤 다시 보내게 한다
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="메시지가 밀려 있습니다. 잠시 후 다시 보내주세요.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    out = MessageOut(**message)
+    # 같은 방 /ws/signaling 접속자에게 바로 push
+    await signaling.hub.broadcast(str(room_id), {"type": "chat", "message": out.model_dump(mode="json")})
+    return out
+
+
+@router.get("/{room_id}/messages", response_model=MessageHistoryPage)
+async def get_messages(
+    room_id: int,
+    before_id: Optional[int] = Query(None, description="이 id 보다 이전 메시지 (없으면 최신부터)"),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """
+    채팅 기록 (오래된 것 → 최신). 더 이전 페이지는 next_before_id 를 before_id 로 넘긴다.
+    입장할 때 before_id 없이 읽는 최근 메시지는 방별 메모리 tail 에서 바로 돌려준다.
+    """
+    items, next_before_id = await chat.history(room_id, before_id, limit)
+    return {"items": items, "next_before_id": next_before_id}
+
+
+@router.get("/chat/stats")
+def chat_stats():
+    return chat.stats()
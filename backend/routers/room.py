@@ -1,12 +1,15 @@
-from typing import List, Dict
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import func, insert, or_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from ..database import get_db
-from .. import models
+from .. import models, room_directory, signaling
+from .chat import chat
 from ..schemas.room import (
+    RoomListPage,
     RoomParticipantsOut,
     RoomCreate,
     RoomJoinRequest,
@@ -33,77 +36,48 @@ def get_current_user(
 
 
 @router.get("/all/profile", response_model=List[RoomParticipantsOut])
-def list_room_participants(db: Session = Depends(get_db)):
+def list_room_participants(
+    if_none_match: Optional[str] = Header(default=None),
+    db: Session = Depends(get_db),
+):
     """
     방별로 방 이름, 현재 참여자 수, 최대 참여자 수, 참여자 user_id 목록을 반환한다.
+    캐시된 목록(backend/room_directory.py)을 그대로 돌려주고, ETag 가 같으면 304.
     """
-    rows = (
-        db.query(
-            models.Room.room_id,
-            models.Room.title,
-            models.Room.capacity,
-            models.Room.battle_enabled,
-            models.Room.purpose,
-            models.RoomMember.user_id,
-        )
-        .outerjoin(
-            models.RoomMember,
-            models.RoomMember.room_id == models.Room.room_id,
-        )
-        .order_by(models.Room.room_id)
-        .all()
+    snap = room_directory.directory.get(db)
+    headers = {"ETag": snap.etag, "Cache-Control": "no-cache"}
+    if room_directory.etag_matches(if_none_match, snap.etag):
+        room_directory.directory.not_modified += 1
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=snap.body, media_type="application/json", headers=headers)
+
+
+@router.get("", response_model=RoomListPage)
+def list_rooms(
+    cursor: Optional[int] = Query(None, description="이전 페이지의 next_cursor (room_id)"),
+    limit: int = Query(20, ge=1, le=100),
+    purpose: Optional[str] = Query(None),
+    battle_enabled: Optional[bool] = Query(None),
+    has_free_seat: Optional[bool] = Query(None, description="true 면 빈 자리가 있는 방만"),
+    view: Literal["summary", "full"] = Query("summary", description="full 이면 참여자 id / 평균 집중 시간 포함"),
+    db: Session = Depends(get_db),
+):
+    """room_id 기준 keyset 페이지네이션 방 목록. 다음 페이지는 next_cursor 를 cursor 로 넘긴다."""
+    items, next_cursor = room_directory.page_rooms(
+        db,
+        cursor=cursor,
+        limit=limit,
+        purpose=purpose,
+        battle_enabled=battle_enabled,
+        has_free_seat=has_free_seat,
+        full=view == "full",
     )
+    return {"items": items, "next_cursor": next_cursor}
 
-    if not rows:
-        return []
-
-    room_map: Dict[int, Dict] = {}
-    all_user_ids = set()
-    for room_id, title, capacity, battle_enabled, purpose, user_id in rows:
-        if room_id not in room_map:
-            room_map[room_id] = {
-                "room_id": room_id,
-                "title": title,
-                "capacity": capacity,
-                "battle_enabled": battle_enabled,
-                "purpose": purpose,
-                "participant_user_ids": [],
-            }
-        if user_id is not None:
-            room_map[room_id]["participant_user_ids"].append(user_id)
-            all_user_ids.add(user_id)
-
-    focus_totals = {}
-    if all_user_ids:
-        focus_rows = (
-            db.query(
-                models.Report.member_id,
-                func.coalesce(func.sum(models.Report.focus_time), 0),
-            )
-            .filter(models.Report.member_id.in_(all_user_ids))
-            .group_by(models.Report.member_id)
-            .all()
-        )
-        focus_totals = {member_id: total for member_id, total in focus_rows}
-
-    return [
-        RoomParticipantsOut(
-            room_id=data["room_id"],
-            title=data["title"],
-            capacity=data["capacity"],
-            battle_enabled=data["battle_enabled"],
-            purpose=data["purpose"],
-            participant_count=len(data["participant_user_ids"]),
-            participant_user_ids=data["participant_user_ids"],
-            average_focus_time=(
-                sum(focus_totals.get(uid, 0) for uid in data["participant_user_ids"])
-                / len(data["participant_user_ids"])
-                if data["participant_user_ids"]
-                else 0.0
-            ),
-        )
-        for data in room_map.values()
-    ]
+
+@router.get("/directory/stats")
+def room_directory_stats():
+    return room_directory.directory.stats()
 
 
 @router.post("/create", status_code=status.HTTP_201_CREATED)
@@ -139,91 +113,148 @@ def create_room(
         capacity=payload.capacity,
         purpose=payload.purpose,
         battle_enabled=payload.battle_enabled,
+        member_count=1,
     )
-    db.add(new_room)
-    db.flush()
-
-    owner_member = models.RoomMember(
-        room_id=new_room.room_id,
-        user_id=current_user.user_id,
-        role="owner",
-    )
-    db.add(owner_member)
+    try:
+        db.add(new_room)
+        db.flush()
+
+        owner_member = models.RoomMember(
+            room_id=new_room.room_id,
+            user_id=current_user.user_id,
+            role="owner",
+        )
+        db.add(owner_member)
 
-    db.commit()
+        db.commit()
+    except IntegrityError:
+        # 위 SELECT 와 INSERT 사이에 같은 사용자가 다른 방을 만들거나 참여했다 (uq_room_member_user),
+        # 또는 같은 이름의 방이 먼저 만들어졌다
+        db.rollback()
+        if db.query(models.RoomMember.id).filter(models.RoomMember.user_id == current_user.user_id).first():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="이미 참여하고 있는 스터디룸이 있습니다.",
+            )
+        if db.query(models.Room.room_id).filter(models.Room.title == payload.title).first():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="이미 존재하는 스터디룸 이름입니다.",
+            )
+        raise
     db.refresh(new_room)
+    room_directory.directory.invalidate()
+    signaling.hub.notify_occupancy(
+        "create", new_room.room_id, member_count=1, capacity=new_room.capacity, user_id=current_user.user_id
+    )
 
     return {"message": "스터디룸이 생성되었습니다."}
 
 
-@router.post("/{room_id}/join", response_model=RoomJoinResponse)
-def join_room(
-    room_id: int,
-    payload: RoomJoinRequest,
-    db: Session = Depends(get_db),
-):
-    room = db.query(models.Room).filter(models.Room.room_id == room_id).first()
-    if not room:
-        raise HTTPException(status_code=404, detail="해당 스터디룸을 찾을 수 없습니다.")
+def _claim_seat(db: Session, room_id: int) -> bool:
+    """정원이 남아 있으면 member_count 를 1 올린다. 동시에 들어와도 정원을 넘지 않는다."""
+    result = db.execute(
+        update(models.Room)
+        .where(
+            models.Room.room_id == room_id,
+            or_(models.Room.capacity.is_(None), models.Room.member_count < models.Room.capacity),
+        )
+        .values(member_count=models.Room.member_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
 
-    user = db.query(models.User).filter(models.User.user_id == payload.user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="해당 사용자를 찾을 수 없습니다.")
 
-    existing_member = (
-        db.query(models.RoomMember)
-        .filter(
-            models.RoomMember.room_id == room_id,
-            models.RoomMember.user_id == payload.user_id,
-        )
-        .first()
+def _membership_conflict(db: Session, room_id: int, user_id: int) -> Optional[HTTPException]:
+    """없는 사용자 / 이미 이 방 / 다른 방에 참여 중이면 그 에러, 아니면 None (예전 join 의 검사 순서)."""
+    if db.query(models.User.user_id).filter(models.User.user_id == user_id).first() is None:
+        return HTTPException(status_code=404, detail="해당 사용자를 찾을 수 없습니다.")
+    joined = (
+        db.query(models.RoomMember.room_id)
+        .filter(models.RoomMember.user_id == user_id)
+        .scalar()
     )
-    if existing_member:
-        raise HTTPException(
+    if joined is None:
+        return None
+    if joined == room_id:
+        return HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="이미 참여 중인 스터디룸입니다.",
         )
-
-    other_membership = (
-        db.query(models.RoomMember)
-        .filter(
-            models.RoomMember.user_id == payload.user_id,
-            models.RoomMember.room_id != room_id,
-        )
-        .first()
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="이미 참여하고 있는 스터디룸이 있습니다.",
     )
-    if other_membership:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="이미 참여하고 있는 스터디룸이 있습니다.",
-        )
 
-    current_count = (
-        db.query(models.RoomMember)
-        .filter(models.RoomMember.room_id == room_id)
-        .count()
+
+def _join_conflict(db: Session, room_id: int, user_id: int) -> HTTPException:
+    """RoomMember INSERT 가 제약 조건에 걸렸을 때 (롤백 후) 이유를 찾아 기존 메시지로 돌려준다."""
+    return _membership_conflict(db, room_id, user_id) or HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="이미 참여하고 있는 스터디룸이 있습니다.",
     )
-    if room.capacity is not None and current_count >= room.capacity:
+
+
+@router.post("/{room_id}/join", response_model=RoomJoinResponse)
+def join_room(
+    room_id: int,
+    payload: RoomJoinRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    한 트랜잭션에서 자리 확보 UPDATE → RoomMember INSERT → 방 정보 SELECT → 커밋.
+    - 정원: member_count < capacity 조건부 UPDATE (행 잠금이라 동시에 들어와도 초과하지 않음)
+    - 중복 참여 / 다른 방 참여 / 없는 사용자: INSERT 의 unique / FK 제약 위반으로 잡고 롤백
+      (롤백하면 올린 member_count 도 되돌아간다)
+    실패했을 때만 원인을 구분하려고 추가로 조회한다 (정원 초과여도 참여 여부를 먼저 확인).
+    """
+    if not _claim_seat(db, room_id):
+        db.rollback()
+        exists = db.query(models.Room.room_id).filter(models.Room.room_id == room_id).first()
+        if exists is None:
+            raise HTTPException(status_code=404, detail="해당 스터디룸을 찾을 수 없습니다.")
+        # 정원보다 참여 여부를 먼저 알려 준다 (이미 이 방에 있는 사람이 다시 join 한 경우 등)
+        conflict = _membership_conflict(db, room_id, payload.user_id)
+        if conflict is not None:
+            raise conflict
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="이미 정원이 가득 찼습니다.",
         )
 
-    new_member = models.RoomMember(
-        room_id=room_id,
-        user_id=payload.user_id,
-        role="member",
+    try:
+        db.execute(
+            insert(models.RoomMember).values(room_id=room_id, user_id=payload.user_id, role="member")
+        )
+    except IntegrityError:
+        db.rollback()
+        raise _join_conflict(db, room_id, payload.user_id)
+
+    room = (
+        db.query(
+            models.Room.title,
+            models.Room.capacity,
+            models.Room.battle_enabled,
+            models.Room.purpose,
+            models.Room.member_count,
+        )
+        .filter(models.Room.room_id == room_id)
+        .one()
     )
-    db.add(new_member)
     db.commit()
+    room_directory.directory.invalidate()
+    signaling.hub.notify_occupancy(
+        "join", room_id, member_count=room.member_count, capacity=room.capacity, user_id=payload.user_id
+    )
 
     return RoomJoinResponse(
         message="참여되었습니다.",
-        room_id=room.room_id,
+        room_id=room_id,
         title=room.title,
         capacity=room.capacity,
         battle_enabled=room.battle_enabled,
         purpose=room.purpose,
+        member_count=room.member_count,
     )
 
 
@@ -259,7 +290,14 @@ def leave_room(
         )
 
     was_owner = membership.role == "owner"
+    capacity = room.capacity
     db.delete(membership)
+    db.execute(
+        update(models.Room)
+        .where(models.Room.room_id == room_id, models.Room.member_count > 0)
+        .values(member_count=models.Room.member_count - 1)
+        .execution_options(synchronize_session=False)
+    )
     db.flush()
 
     remaining_members = (
@@ -269,9 +307,13 @@ def leave_room(
     )
 
     if not remaining_members:
-        # 아무도 남지 않았으면 방 삭제
+        # 아무도 남지 않았으면 방 삭제 (채팅 기록도 같이)
+        db.query(models.Message).filter(models.Message.room_id == room_id).delete(synchronize_session=False)
         db.delete(room)
         db.commit()
+        room_directory.directory.invalidate()
+        chat.forget(room_id)  # 메모리 tail / 저장 대기 메시지도 버린다
+        signaling.hub.notify_occupancy("delete", room_id, member_count=0, capacity=capacity, user_id=user_id)
         return {"message": "방에서 나갔고, 마지막 참여자였기 때문에 스터디룸이 삭제되었습니다."}
 
     if was_owner:
@@ -286,4 +328,8 @@ def leave_room(
             new_owner.role = "owner"
 
     db.commit()
+    room_directory.directory.invalidate()
+    signaling.hub.notify_occupancy(
+        "leave", room_id, member_count=len(remaining_members), capacity=capacity, user_id=user_id
+    )
     return {"message": "방에서 나갔습니다."}
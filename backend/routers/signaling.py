@@ -0,0 +1,76 @@
+# backend/routers/signaling.py
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+
+from .. import models
+from ..database import SessionLocal
+from ..signaling import hub
+
+router = APIRouter(tags=["signaling"])
+
+router.add_event_handler("startup", hub.start)
+router.add_event_handler("shutdown", hub.stop)
+
+MAX_MESSAGE = 64 * 1024  # SDP 도 이 정도면 충분하다
+
+
+def _is_member(room_id: int, user_id: int) -> bool:
+    # routers/chat.py 의 POST 와 같은 검사 (uq_room_user 인덱스 한 번)
+    db = SessionLocal()
+    try:
+        return (
+            db.query(models.RoomMember.id)
+            .filter(models.RoomMember.room_id == room_id, models.RoomMember.user_id == user_id)
+            .first()
+        ) is not None
+    finally:
+        db.close()
+
+
+@router.websocket("/ws/signaling")
+async def signaling_stream(
+    websocket: WebSocket,
+    room: str,
+    user_id: Optional[int] = None,
+):
+    """
+    ws://.../ws/signaling?room=<room_id>&user_id=..
+    - user_id 가 그 방의 RoomMember 가 아니면 1008 (policy violation) 로 닫는다
+    - 접속하면 {"type": "welcome", "id": <peer id>} 를 받고, 방에는 join 이 간다
+    - offer / answer / ice 는 같은 방의 다른 peer 에게 "from" 을 붙여 중계 ("to" 가 있으면 그 peer 에게만)
+    - 방 참여 현황이 바뀌면 occupancy 이벤트도 같이 받는다
+    """
+    await websocket.accept()
+    if not room.isdigit() or user_id is None or not await asyncio.to_thread(_is_member, int(room), user_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="not a member of this room")
+        return
+    peer = await hub.join(websocket, room, user_id)
+    try:
+        async for text in websocket.iter_text():
+            if len(text) <= MAX_MESSAGE:
+                await hub.relay(peer, text)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await hub.leave(peer)
+
+
+@router.websocket("/ws/lobby")
+async def lobby_stream(websocket: WebSocket):
+    """방 생성/참여/나가기/삭제 때마다 occupancy 이벤트를 push 한다. 클라이언트 메시지는 무시."""
+    await websocket.accept()
+    peer = await hub.watch_lobby(websocket)
+    try:
+        async for _ in websocket.iter_text():
+            pass
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await hub.leave(peer)
+
+
+@router.get("/api/signaling/stats")
+def signaling_stats():
+    return hub.stats()
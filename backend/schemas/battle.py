@@ -15,10 +15,12 @@ class BattleDamageRequest(BaseModel):
     attacker_user_pokemon_id: int
     defender_user_pokemon_id: int
     move_id: int
+    expected_turn: int | None = None  # 클라이언트가 보고 있는 턴 (다르면 409)
 
 
 class BattleDamageResponse(BaseModel):
     damage: int
+    turn: int | None = None  # 이 공격까지 반영된 턴 (다음 요청의 expected_turn)
 
 
 class BattleCreateRequest(BaseModel):
@@ -37,3 +39,38 @@ class BattleCreateResponse(BaseModel):
     player_b_user_pokemon_id: int
     player_a_moves: list[BattleAssignedMove]
     player_b_moves: list[BattleAssignedMove]
+
+
+class BattleTurnRequest(BaseModel):
+    attacker_user_pokemon_id: int
+    slot: int  # 1~4
+    expected_turn: int | None = None  # 클라이언트가 보고 있는 턴 (다르면 409)
+
+
+class BattleTurnResponse(BaseModel):
+    battle_id: int
+    turn: int
+    attacker_user_pokemon_id: int
+    defender_user_pokemon_id: int
+    move_id: int
+    damage: int
+    defender_hp: int
+    pp_left: int | None = None
+    status: str
+    winner_user_pokemon_id: int | None = None
+
+
+class BattleFighterState(BaseModel):
+    user_pokemon_id: int
+    hp: int
+    max_hp: int
+    pp: list[int | None]
+
+
+class BattleStateResponse(BaseModel):
+    battle_id: int
+    turn: int
+    status: str
+    next_user_pokemon_id: int | None = None
+    winner_user_pokemon_id: int | None = None
+    fighters: list[BattleFighterState]
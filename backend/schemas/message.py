@@ -1,5 +1,5 @@
 # backend/schemas/message.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 
@@ -15,8 +15,21 @@ class MessageCreate(MessageBase):
     time: datetime | None = None
 
 
+class MessagePost(BaseModel):
+    # room_id 는 경로에서, id / time 은 서버에서 정한다
+    sender: int
+    log: str = Field(..., min_length=1, max_length=2000)
+    msg_class: int = 0
+
+
 class MessageOut(MessageBase):
+    id: int
     time: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class MessageHistoryPage(BaseModel):
+    items: list[MessageOut]          # 오래된 것 → 최신 순
+    next_before_id: int | None = None  # 더 이전 메시지를 읽을 때 before_id (없으면 None)
\ No newline at end of file
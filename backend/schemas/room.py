@@ -9,11 +9,45 @@ class RoomBase(BaseModel):
 
 
 class RoomCreate(RoomBase):
-    pass
+    capacity: int | None = None
+    purpose: str | None = None
+    battle_enabled: bool = False
 
 
 class RoomOut(RoomBase):
     room_id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class RoomJoinRequest(BaseModel):
+    user_id: int
+
+
+class RoomJoinResponse(BaseModel):
+    message: str
+    room_id: int
+    title: str
+    capacity: int | None = None
+    battle_enabled: bool = False
+    purpose: str | None = None
+    member_count: int
+
+
+class RoomSummaryOut(BaseModel):
+    room_id: int
+    title: str
+    capacity: int | None = None
+    battle_enabled: bool = False
+    purpose: str | None = None
+    participant_count: int
+
+
+class RoomParticipantsOut(RoomSummaryOut):
+    participant_user_ids: list[int]
+    average_focus_time: float
+
+
+class RoomListPage(BaseModel):
+    items: list[RoomParticipantsOut] | list[RoomSummaryOut]
+    next_cursor: int | None = None  # 다음 페이지 요청의 cursor (마지막 페이지면 None)
@@ -0,0 +1,89 @@
+# backend/scripts/bench_batcher.py
+"""
+InferenceBatcher 배치 설정별 처리량 / 지연시간(p50, p99) 측정.
+
+실행: python -m backend.scripts.bench_batcher --clients 200 --requests 20
+
+mediapipe 없이 YawnCNN forward 만 측정하도록 임의의 64x64 얼굴 텐서를 사용한다.
+(체크포인트가 있으면 로드하고, 없으면 랜덤 가중치로 측정)
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import torch
+
+from backend.best_model import YawnCNN
+from backend.inference_batcher import InferenceBatcher
+
+MODEL_PATH = "backend/best_model_Yawn_fold4.pth"
+
+# (max_batch_size, max_wait_ms)
+SETTINGS = [(1, 0), (4, 2), (8, 5), (16, 5), (32, 10)]
+
+
+def _load_model() -> YawnCNN:
+    model = YawnCNN(num_classes=3)
+    if os.path.exists(MODEL_PATH):
+        model.load_state_dict(torch.load(MODEL_PATH, map_location="cpu"))
+    model.eval()
+    return model
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+async def _run_setting(model, max_batch: int, max_wait_ms: float, clients: int, per_client: int):
+    def infer(faces):
+        with torch.no_grad():
+            return list(torch.softmax(model(torch.stack(faces)), dim=1))
+
+    batcher = InferenceBatcher(infer, max_batch_size=max_batch, max_wait_ms=max_wait_ms)
+    await batcher.start()
+    latencies = []
+
+    async def client():
+        face = torch.randn(3, 64, 64)
+        for _ in range(per_client):
+            t0 = time.perf_counter()
+            await batcher.submit(face)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    stats = batcher.stats()
+    await batcher.stop()
+
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": _percentile(latencies, 0.99),
+        "avg_batch": stats["avg_batch_size"],
+    }
+
+
+async def main(clients: int, per_client: int):
+    torch.set_num_threads(max(1, os.cpu_count() or 1))
+    model = _load_model()
+    print(f"clients={clients}, requests/client={per_client}, device=cpu")
+    print(f"{'batch':>5} {'wait_ms':>7} {'req/s':>9} {'p50_ms':>8} {'p99_ms':>8} {'avg_batch':>9}")
+    for max_batch, max_wait_ms in SETTINGS:
+        r = await _run_setting(model, max_batch, max_wait_ms, clients, per_client)
+        print(
+            f"{max_batch:>5} {max_wait_ms:>7.1f} {r['throughput']:>9.1f} "
+            f"{r['p50']:>8.2f} {r['p99']:>8.2f} {r['avg_batch']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.requests))
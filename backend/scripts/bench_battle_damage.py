@@ -0,0 +1,246 @@
+# backend/scripts/bench_battle_damage.py
+"""
+POST /api/battle/damage: 예전 단계별 조회 경로 vs 조인 1번 + 조건부 PP UPDATE 경로 비교.
+
+실행 (로컬 MySQL 에 type / move / Pokemon 이 채워져 있어야 한다):
+    python -m backend.scripts.bench_battle_damage --attacks 500 --race-threads 8
+
+- 임시 User 2명 / UserPokemon / UserActiveTeam / Battle 을 만들고 끝나면 지운다.
+- 각 경로의 공격 1회당 SQL 문 수, p50 / p99 지연시간을 출력한다.
+- --race-threads 로 같은 기술을 동시에 눌러 PP 차감 누락(lost update) 여부도 확인한다.
+"""
+import argparse
+import statistics
+import threading
+import time
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from backend import models
+from backend.database import SessionLocal, engine
+from backend.routers import battle as battle_router
+from backend.schemas.battle import BattleCreateRequest, BattleDamageRequest
+
+
+def _legacy_type_multiplier(db, move_type, def_type1, def_type2) -> float:
+    # user-012 이전의 타입 조회 (이름 → id, 상성 행을 매번 SELECT)
+    def get_type_id(tname):
+        if not tname:
+            return None
+        row = db.query(models.Type).filter(models.Type.name == tname).first()
+        return row.id if row else None
+
+    atk_id = get_type_id(move_type)
+    if atk_id is None:
+        return 1.0
+
+    def mul_for(def_name):
+        def_id = get_type_id(def_name)
+        if def_id is None:
+            return 1.0
+        row = (
+            db.query(models.TypeEffectiveness)
+            .filter(
+                models.TypeEffectiveness.attacker_type_id == atk_id,
+                models.TypeEffectiveness.defender_type_id == def_id,
+            )
+            .first()
+        )
+        return row.multiplier if row else 1.0
+
+    return mul_for(def_type1) * mul_for(def_type2)
+
+
+def _legacy_damage(payload: BattleDamageRequest, db) -> int:
+    # 예전 calc_battle_damage 본문 (단계별 SELECT + 읽고-빼고-쓰는 PP 차감)
+    r = battle_router
+    battle = r._get_battle(db, payload.battle_id)
+    attacker_up = r._get_user_pokemon(db, payload.attacker_user_pokemon_id)
+    defender_up = r._get_user_pokemon(db, payload.defender_user_pokemon_id)
+    r._ensure_battle_participant(db, battle, attacker_up.id)
+    r._ensure_battle_participant(db, battle, defender_up.id)
+    r._ensure_active_team(db, attacker_up.id)
+    r._ensure_active_team(db, defender_up.id)
+    attacker = r._get_base_pokemon(db, attacker_up.poke_id)
+    defender = r._get_base_pokemon(db, defender_up.poke_id)
+    bm = (
+        db.query(models.BattleMove)
+        .filter(
+            models.BattleMove.battle_id == battle.id,
+            models.BattleMove.user_pokemon_id == attacker_up.id,
+            models.BattleMove.move_id == payload.move_id,
+        )
+        .first()
+    )
+    if bm.current_pp is not None and bm.current_pp <= 0:
+        raise HTTPException(status_code=400, detail="기술의 PP가 부족합니다.")
+    move = r._get_move(db, payload.move_id)
+    type_mult = _legacy_type_multiplier(db, move.type, defender.type1, defender.type2)
+    damage, _ = r._calc_damage(attacker, defender, move, type_mult)
+    if bm.current_pp is not None:
+        bm.current_pp = max(0, bm.current_pp - 1)
+    db.commit()
+    return damage
+
+
+def _current_damage(payload: BattleDamageRequest, db) -> int:
+    return battle_router.calc_battle_damage(payload, db).damage
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def _seed(db):
+    tag = uuid.uuid4().hex[:8]
+    pokes = db.query(models.Pokemon).limit(2).all()
+    if len(pokes) < 2:
+        raise SystemExit("Pokemon 테이블이 비어 있습니다. scripts/fetch_pokemon.py 를 먼저 실행하세요.")
+
+    users = [
+        models.User(email=f"bench-{tag}-{i}@local", pw="bench", nickname=f"bench-{i}", selected=0)
+        for i in range(2)
+    ]
+    db.add_all(users)
+    db.flush()
+    ups = [models.UserPokemon(user_id=u.user_id, poke_id=p.poke_id) for u, p in zip(users, pokes)]
+    db.add_all(ups)
+    db.flush()
+    db.add_all([models.UserActiveTeam(user_id=u.user_id, user_pokemon_id=up.id, slot=1) for u, up in zip(users, ups)])
+    db.commit()
+
+    created = battle_router.create_battle(
+        BattleCreateRequest(player_a_user_pokemon_id=ups[0].id, player_b_user_pokemon_id=ups[1].id),
+        db,
+    )
+    # 턴 순서를 지켜야 하므로(user-018) A, B 가 번갈아 공격하는 요청 두 개
+    payloads = (
+        BattleDamageRequest(
+            battle_id=created.battle_id,
+            attacker_user_pokemon_id=ups[0].id,
+            defender_user_pokemon_id=ups[1].id,
+            move_id=created.player_a_moves[0].move_id,
+        ),
+        BattleDamageRequest(
+            battle_id=created.battle_id,
+            attacker_user_pokemon_id=ups[1].id,
+            defender_user_pokemon_id=ups[0].id,
+            move_id=created.player_b_moves[0].move_id,
+        ),
+    )
+    return users, ups, created.battle_id, payloads
+
+
+def _set_pp(db, payload: BattleDamageRequest, pp: int) -> None:
+    db.query(models.BattleMove).filter(
+        models.BattleMove.battle_id == payload.battle_id,
+        models.BattleMove.user_pokemon_id == payload.attacker_user_pokemon_id,
+        models.BattleMove.move_id == payload.move_id,
+    ).update({"current_pp": pp})
+    db.commit()
+
+
+def _get_pp(db, payload: BattleDamageRequest) -> int:
+    db.expire_all()
+    return db.query(models.BattleMove.current_pp).filter(
+        models.BattleMove.battle_id == payload.battle_id,
+        models.BattleMove.user_pokemon_id == payload.attacker_user_pokemon_id,
+        models.BattleMove.move_id == payload.move_id,
+    ).scalar()
+
+
+def _cleanup(db, users, ups, battle_id: int) -> None:
+    db.rollback()
+    db.query(models.BattleMove).filter(models.BattleMove.battle_id == battle_id).delete()
+    db.query(models.Battle).filter(models.Battle.id == battle_id).delete()
+    up_ids = [up.id for up in ups]
+    db.query(models.UserActiveTeam).filter(models.UserActiveTeam.user_pokemon_id.in_(up_ids)).delete()
+    db.query(models.UserPokemon).filter(models.UserPokemon.id.in_(up_ids)).delete()
+    db.query(models.User).filter(models.User.user_id.in_([u.user_id for u in users])).delete()
+    db.commit()
+
+
+def _bench(name: str, fn, payloads, attacks: int, counter: _QueryCounter) -> None:
+    db = SessionLocal()
+    try:
+        for payload in payloads:
+            _set_pp(db, payload, attacks + 10)
+        fn(payloads[0], db)  # 워밍업 (타입 상성표 캐시 적재 포함)
+        latencies = []
+        before = counter.count
+        for i in range(attacks):
+            t0 = time.perf_counter()
+            fn(payloads[(i + 1) % 2], db)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+        per_attack = (counter.count - before) / attacks
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{name:<10} {per_attack:>12.1f} {statistics.median(latencies):>9.2f} {p99:>9.2f}")
+    finally:
+        db.close()
+
+
+def _race(name: str, fn, payloads, threads: int, per_thread: int) -> None:
+    # 스레드 절반은 A, 절반은 B 로 같은 기술을 동시에 누른다 (턴 충돌 409 는 실패로 센다)
+    db = SessionLocal()
+    start_pp = threads * per_thread
+    for payload in payloads:
+        _set_pp(db, payload, start_pp)
+    ok = [0] * threads
+
+    def worker(i: int):
+        session = SessionLocal()
+        try:
+            for _ in range(per_thread):
+                try:
+                    fn(payloads[i % 2], session)
+                    ok[i] += 1
+                except HTTPException:
+                    session.rollback()
+        finally:
+            session.close()
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    # 성공한 공격 수만큼 PP 가 줄지 않았다면 그 차이만큼 차감이 덮어써진 것
+    final_pp = sum(_get_pp(db, payload) for payload in payloads)
+    lost = final_pp - (2 * start_pp - sum(ok))
+    print(f"{name:<10} attacks_ok={sum(ok):>5} final_pp={final_pp:>5} lost_updates={lost:>5}")
+    db.close()
+
+
+def main(args):
+    counter = _QueryCounter()
+    db = SessionLocal()
+    users, ups, battle_id, payloads = _seed(db)
+    try:
+        print(f"battle_id={battle_id}, attacks={args.attacks}")
+        print(f"{'path':<10} {'queries/atk':>12} {'p50_ms':>9} {'p99_ms':>9}")
+        _bench("legacy", _legacy_damage, payloads, args.attacks, counter)
+        _bench("joined", _current_damage, payloads, args.attacks, counter)
+
+        if args.race_threads:
+            print(f"\nPP race: {args.race_threads} threads x {args.race_per_thread} attacks")
+            _race("legacy", _legacy_damage, payloads, args.race_threads, args.race_per_thread)
+            _race("joined", _current_damage, payloads, args.race_threads, args.race_per_thread)
+    finally:
+        _cleanup(db, users, ups, battle_id)
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--attacks", type=int, default=500)
+    parser.add_argument("--race-threads", type=int, default=8)
+    parser.add_argument("--race-per-thread", type=int, default=25)
+    main(parser.parse_args())
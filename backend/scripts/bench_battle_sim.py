@@ -0,0 +1,109 @@
+# backend/scripts/bench_battle_sim.py
+"""
+벡터화 배틀 시뮬레이터: 스칼라 데미지 공식과의 일치 확인 + 처리량 + 밸런스 리포트.
+
+실행 (로컬 MySQL 에 type / move / Pokemon 이 채워져 있어야 한다):
+    python -m backend.scripts.bench_battle_sim --hits 200000 --battles-per-pair 50 --seed 0
+
+1) parity    : 무작위 (공격자, 방어자, 기술) 조합에 대해 routers/battle.py 의 _calc_damage 와
+               battle_sim.hit_damage 가 같은 난수로 같은 데미지를 내는지 확인하고, 두 경로의 hits/s 를 잰다.
+               _calc_damage 는 공격 기술이면 random.uniform 을 정확히 한 번 부르므로
+               random.seed 로 같은 난수열을 재생한다.
+2) simulate  : 모든 종족 쌍 x battles-per-pair 판을 한 번에 돌려 battles/s, 데미지 분포,
+               KO 턴, 종족별 평균 승률 상/하위를 출력한다 (_choose_moves_for_battle 규칙 조정용).
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from backend import battle_sim, models, move_pool, type_chart
+from backend.database import SessionLocal
+from backend.routers import battle as battle_router
+
+
+def _parity(db, data: battle_sim.SimData, n: int, seed: int) -> None:
+    chart = type_chart.get(db)
+    pokes = db.query(models.Pokemon).order_by(models.Pokemon.poke_id.asc()).all()
+    moves = list(move_pool.get(db).moves.values())
+
+    rng = np.random.default_rng(seed)
+    atk = rng.integers(0, len(pokes), size=n)
+    de = rng.integers(0, len(pokes), size=n)
+    mv = rng.integers(0, len(moves), size=n)
+
+    random.seed(seed)
+    rand = np.array([random.uniform(0.85, 1.0) for _ in range(n)])
+
+    # 스칼라: 라우터와 같은 경로 (상성은 캐시된 상성표, 난수는 random.uniform)
+    attackers = [SimpleNamespace(**{k: getattr(p, k, None) for k in ("base_attack", "base_defense", "base_sp_attack", "base_sp_defense", "type1", "type2")}) for p in pokes]
+    random.seed(seed)
+    t0 = time.perf_counter()
+    scalar = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        a, d, m = attackers[atk[i]], attackers[de[i]], moves[mv[i]]
+        mult = chart.multiplier(m.type, d.type1, d.type2)
+        scalar[i], _ = battle_router._calc_damage(a, d, m, mult)
+    scalar_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    vector = battle_sim.hit_damage(data, atk, de, mv, rand)
+    vector_s = time.perf_counter() - t0
+
+    mismatch = int((scalar != vector).sum())
+    print(f"parity: {n} hits, mismatches={mismatch}")
+    print(f"  scalar  {n / scalar_s:>14,.0f} hits/s")
+    print(f"  vector  {n / vector_s:>14,.0f} hits/s  (x{scalar_s / vector_s:.0f})")
+    if mismatch:
+        i = int(np.flatnonzero(scalar != vector)[0])
+        print(f"  first mismatch: atk={atk[i]} def={de[i]} move={mv[i]} scalar={scalar[i]} vector={vector[i]}")
+
+
+def _simulate(data: battle_sim.SimData, battles_per_pair: int, seed: int, top: int) -> None:
+    n_species = data.poke_ids.size
+    a, b = battle_sim.all_pairs(n_species, battles_per_pair)
+    t0 = time.perf_counter()
+    result = battle_sim.simulate(data, a, b, rng=np.random.default_rng(seed))
+    elapsed = time.perf_counter() - t0
+
+    print(f"\nsimulate: {a.size:,} battles ({n_species} species, {battles_per_pair}/pair) in {elapsed:.2f}s "
+          f"-> {a.size / elapsed:,.0f} battles/s")
+    p = np.percentile(result.hits, [5, 25, 50, 75, 95])
+    print(f"  damage/hit p5={p[0]:.0f} p25={p[1]:.0f} p50={p[2]:.0f} p75={p[3]:.0f} p95={p[4]:.0f}")
+    ko = result.ko_turn
+    print(f"  KO turn mean={ko.mean():.2f} median={np.median(ko):.0f} "
+          f"1-hit KO={np.mean(ko == 1):.1%} timeouts={np.mean(ko >= 100):.1%}")
+
+    win_rate, _ = battle_sim.pair_summary(result, n_species)
+    # A 로 싸운 승률과 B 로 싸운 승률(1 - A 승률)을 합쳐 종족별 평균 승률
+    overall = (np.nanmean(win_rate, axis=1) + np.nanmean(1.0 - win_rate, axis=0)) / 2
+    order = np.argsort(overall)
+    print(f"  top {top} species by win rate:")
+    for i in order[::-1][:top]:
+        print(f"    poke_id={data.poke_ids[i]:>5} win={overall[i]:.1%}")
+    print(f"  bottom {top} species by win rate:")
+    for i in order[:top]:
+        print(f"    poke_id={data.poke_ids[i]:>5} win={overall[i]:.1%}")
+
+
+def main(args):
+    db = SessionLocal()
+    try:
+        data = battle_sim.SimData.load(db)
+        if data.poke_ids.size == 0 or data.move_ids.size == 0:
+            raise SystemExit("Pokemon / move 테이블이 비어 있습니다.")
+        _parity(db, data, args.hits, args.seed)
+    finally:
+        db.close()
+    _simulate(data, args.battles_per_pair, args.seed, args.top)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hits", type=int, default=200_000)
+    parser.add_argument("--battles-per-pair", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=10)
+    main(parser.parse_args())
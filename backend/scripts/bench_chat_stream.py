@@ -0,0 +1,97 @@
+# backend/scripts/bench_chat_stream.py
+"""
+AI 코치 스트리밍 벤치마크 (OpenAI 없이 가짜 모델로).
+
+실행:
+    python -m backend.scripts.bench_chat_stream --concurrency 50 --token-ms 20
+
+- invoke : 예전 /chat 처럼 답변 전체가 나온 뒤 응답 (첫 바이트 = 전체 시간)
+- stream : llm_stream.sse 로 조각마다 SSE 이벤트 (첫 바이트 = 첫 토큰)
+  두 경로의 첫 바이트 / 전체 시간 p50 / p95 를 출력한다.
+- cancel : 조각 몇 개만 읽고 끊었을 때 upstream 스트림이 바로 닫히는지 (남은 토큰을 만들지 않는지) 확인한다.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+from backend import llm_stream
+
+
+def _chain(token_ms: float):
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "너는 온라인 스터디룸 사용자를 도와주는 학습 코치야."),
+        MessagesPlaceholder(variable_name="history"),
+        ("human", "{input}"),
+    ])
+    return prompt | llm_stream.fake_llm(token_delay_ms=token_ms) | StrOutputParser()
+
+
+INPUTS = {"history": [], "input": "집중이 안 돼요"}
+
+
+async def _invoke_once(chain) -> tuple:
+    t0 = time.perf_counter()
+    await chain.ainvoke(INPUTS)
+    total = (time.perf_counter() - t0) * 1000.0
+    return total, total
+
+
+async def _stream_once(chain, stats) -> tuple:
+    t0 = time.perf_counter()
+    first = None
+    async for _ in llm_stream.sse(chain, INPUTS, None, stats):
+        if first is None:
+            first = (time.perf_counter() - t0) * 1000.0
+    return first, (time.perf_counter() - t0) * 1000.0
+
+
+def _report(name: str, results) -> None:
+    first = sorted(r[0] for r in results)
+    total = sorted(r[1] for r in results)
+    p95 = lambda v: v[min(len(v) - 1, int(len(v) * 0.95))]
+    print(f"{name:<8} first_byte p50={statistics.median(first):>8.1f} p95={p95(first):>8.1f}  "
+          f"total p50={statistics.median(total):>8.1f} p95={p95(total):>8.1f} ms")
+
+
+async def _cancel(chain, stats, after: int) -> None:
+    produced = 0
+    inner = chain.astream
+
+    async def counting(inputs):
+        nonlocal produced
+        async for chunk in inner(inputs):
+            produced += 1
+            yield chunk
+
+    class _Counting:
+        astream = staticmethod(counting)
+
+    gen = llm_stream.sse(_Counting(), INPUTS, None, stats)
+    for _ in range(after):
+        await gen.__anext__()
+    await gen.aclose()  # 클라이언트가 끊긴 것과 같다
+    await asyncio.sleep(0.2)
+    stopped = produced <= after + 1
+    print(f"cancel   read {after} chunks, upstream produced {produced} -> [{'ok' if stopped else 'FAIL'}] upstream closed, "
+          f"stats.cancelled={stats.cancelled}")
+
+
+async def main(args):
+    chain = _chain(args.token_ms)
+    print(f"concurrency={args.concurrency}, token_ms={args.token_ms}, reply={len(llm_stream.FAKE_REPLY)} chars")
+    _report("invoke", await asyncio.gather(*(_invoke_once(chain) for _ in range(args.concurrency))))
+    stats = llm_stream.StreamStats()
+    _report("stream", await asyncio.gather(*(_stream_once(chain, stats) for _ in range(args.concurrency))))
+    print(f"         stats: {stats.stats()}")
+    await _cancel(chain, llm_stream.StreamStats(), after=3)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--token-ms", type=float, default=20.0)
+    asyncio.run(main(parser.parse_args()))
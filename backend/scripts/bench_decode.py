@@ -0,0 +1,118 @@
+# backend/scripts/bench_decode.py
+"""
+프레임 디코딩 + 얼굴 전처리 마이크로벤치마크 (이전 PIL 경로 vs backend/preprocess.py).
+
+실행: python -m backend.scripts.bench_decode --iters 500 [--image path/to/frame.jpg]
+
+Mediapipe 는 두 경로가 같으므로 빼고, 고정된 얼굴 박스로 디코딩 → crop → 64x64 정규화까지만 잰다.
+이미지를 주지 않으면 640x480 합성 프레임을 JPEG(품질 95)로 인코딩해서 쓴다.
+"""
+import argparse
+import io
+import time
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+from torchvision import transforms
+
+from backend.preprocess import FACE_SIZE, decode_frame, normalize_into, resize_face
+
+# 이전 detector.py 와 동일한 transform
+legacy_transform = transforms.Compose([
+    transforms.Resize((64, 64)),
+    transforms.ToTensor(),
+    transforms.Normalize(mean=[0.5, 0.5, 0.5],
+                         std=[0.5, 0.5, 0.5])
+])
+
+# 상대 좌표 얼굴 박스 (xmin, ymin, width, height)
+FACE_BOX = (0.3, 0.2, 0.4, 0.55)
+
+
+def _synthetic_frame() -> bytes:
+    h, w = 480, 640
+    yy, xx = np.mgrid[0:h, 0:w]
+    img = np.stack([(xx * 255 // w), (yy * 255 // h), ((xx + yy) % 256)], axis=-1).astype(np.uint8)
+    noise = np.random.default_rng(0).integers(0, 24, size=img.shape, dtype=np.uint8)
+    img = cv2.add(img, noise)
+    cv2.ellipse(img, (320, 250), (110, 140), 0, 0, 360, (180, 150, 130), -1)
+    ok, enc = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    assert ok
+    return enc.tobytes()
+
+
+def _box(w: int, h: int):
+    xmin, ymin, bw, bh = FACE_BOX
+    return int(xmin * w), int(ymin * h), int((xmin + bw) * w), int((ymin + bh) * h)
+
+
+def legacy_path(image_bytes: bytes) -> torch.Tensor:
+    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    img_cv = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+    # 예전 경로가 face_detector(mediapipe) 입력용으로 하던 변환. 결과는 쓰지 않고 비용만 같이 잰다
+    cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB)
+    h, w, _ = img_cv.shape
+    x1, y1, x2, y2 = _box(w, h)
+    face = img_cv[y1:y2, x1:x2]
+    face_pil = Image.fromarray(cv2.cvtColor(face, cv2.COLOR_BGR2RGB))
+    return legacy_transform(face_pil)
+
+
+def make_new_path(reduced: bool):
+    out = np.empty((1, 3, FACE_SIZE, FACE_SIZE), dtype=np.float32)
+
+    def new_path(image_bytes: bytes) -> np.ndarray:
+        img = decode_frame(image_bytes, reduced=reduced)
+        h, w, _ = img.shape
+        x1, y1, x2, y2 = _box(w, h)
+        normalize_into(resize_face(img[y1:y2, x1:x2]), out[0])
+        return out[0]
+
+    return new_path
+
+
+def _bench(fn, data: bytes, iters: int):
+    for _ in range(10):
+        fn(data)
+    timings = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        fn(data)
+        timings.append((time.perf_counter() - t0) * 1000.0)
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(0.99 * (len(timings) - 1))]
+
+
+def main(iters: int, image_path: str | None):
+    if image_path:
+        with open(image_path, "rb") as f:
+            data = f.read()
+    else:
+        data = _synthetic_frame()
+
+    torch.set_num_threads(1)
+    cv2.setNumThreads(1)
+
+    reference = legacy_path(data).numpy()
+    print(f"frame bytes={len(data)}, iters={iters}")
+    print(f"{'path':<22} {'p50_ms':>8} {'p99_ms':>8} {'max|diff|':>10}")
+    for name, fn in (
+        ("legacy (PIL)", legacy_path),
+        ("imdecode", make_new_path(False)),
+        ("imdecode reduced_2", make_new_path(True)),
+    ):
+        p50, p99 = _bench(fn, data, iters)
+        result = fn(data)
+        result = result.numpy() if isinstance(result, torch.Tensor) else result
+        diff = float(np.abs(result - reference).max())
+        print(f"{name:<22} {p50:>8.3f} {p99:>8.3f} {diff:>10.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iters", type=int, default=500)
+    parser.add_argument("--image", default=None)
+    args = parser.parse_args()
+    main(args.iters, args.image)
@@ -0,0 +1,94 @@
+# backend/scripts/bench_ensemble.py
+"""
+단일 모델 vs 다중 fold 앙상블(순차 호출 / vmap 스택) 정확도 + 지연시간 비교.
+
+실행: python -m backend.scripts.bench_ensemble [--folds fold4,fold5,32_0.4] [--data-dir path]
+
+--data-dir 는 Normal/ Sleepy/ Yawn/ 하위 폴더에 얼굴 crop(jpg)이 들어 있는 라벨 데이터.
+없으면 DROWSY_CALIB_DIR 의 crop 으로 지연시간과 fold4 단일 모델과의 레이블 일치율만 보고한다.
+정확도는 detector.decide 와 같은 Sleepy 가중치 / Yawn 임계값 로직을 거친 최종 라벨 기준이다.
+"""
+import argparse
+import os
+import time
+
+import torch
+
+from backend import inference_backends
+
+LABELS = ("Normal", "Sleepy", "Yawn")
+
+
+def _decide(probs: torch.Tensor) -> torch.Tensor:
+    # detector.decide 와 동일한 규칙을 배치로 적용 (mediapipe 를 import 하지 않기 위해 복제)
+    adjusted = probs * torch.tensor([1.0, 1.2, 1.0])
+    adjusted = adjusted / adjusted.sum(dim=1, keepdim=True)
+    pred = adjusted.argmax(dim=1)
+    weak_yawn = (pred == 2) & (adjusted[:, 2] < 0.7)
+    fallback = torch.where(adjusted[:, 0] > adjusted[:, 1], 0, 1)
+    return torch.where(weak_yawn, fallback, pred)
+
+
+def _load_labeled(data_dir: str):
+    faces, labels = [], []
+    for idx, name in enumerate(LABELS):
+        class_faces = inference_backends.load_calibration_faces(os.path.join(data_dir, name), limit=10_000)
+        faces.extend(class_faces)
+        labels.extend([idx] * len(class_faces))
+    return faces, torch.tensor(labels)
+
+
+def _latency_ms(fn, batch: torch.Tensor, iters: int) -> float:
+    with torch.no_grad():
+        for _ in range(5):
+            fn(batch)
+        t0 = time.perf_counter()
+        for _ in range(iters):
+            fn(batch)
+    return (time.perf_counter() - t0) * 1000.0 / iters
+
+
+def main(folds, data_dir: str | None, iters: int):
+    device = torch.device("cpu")
+    if data_dir:
+        faces, labels = _load_labeled(data_dir)
+    else:
+        calib_dir = os.getenv("DROWSY_CALIB_DIR", inference_backends.DEFAULT_CALIB_DIR)
+        faces, labels = inference_backends.load_calibration_faces(calib_dir), None
+    if not faces:
+        raise SystemExit("평가할 얼굴 이미지가 없습니다.")
+    batch = inference_backends.faces_to_batch(faces)
+
+    singles = {n: inference_backends.load_eager(inference_backends.CHECKPOINTS[n], device) for n in folds}
+    stacked = inference_backends.build_ensemble(folds, device)
+
+    def sequential(x):
+        return torch.log(torch.stack([torch.softmax(m(x), dim=1) for m in singles.values()]).mean(dim=0))
+
+    candidates = {f"single:{n}": m for n, m in singles.items()}
+    candidates[f"sequential x{len(folds)}"] = sequential
+    candidates[f"stacked x{len(folds)}"] = stacked
+
+    with torch.no_grad():
+        reference = _decide(torch.softmax(next(iter(singles.values()))(batch), dim=1))
+
+    metric = "accuracy" if labels is not None else f"agree({folds[0]})"
+    print(f"samples={len(batch)}, folds={folds}")
+    print(f"{'mode':<20} {metric:>14} {'b1_ms':>7} {'b16_ms':>7}")
+    for name, fn in candidates.items():
+        with torch.no_grad():
+            pred = _decide(torch.softmax(fn(batch), dim=1))
+        target = labels if labels is not None else reference
+        score = (pred == target).float().mean().item()
+        b1 = _latency_ms(fn, batch[:1], iters)
+        b16 = _latency_ms(fn, batch[:16], iters)
+        print(f"{name:<20} {score:>14.3f} {b1:>7.3f} {b16:>7.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--folds", default=",".join(inference_backends.CHECKPOINTS))
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--iters", type=int, default=50)
+    args = parser.parse_args()
+    main(args.folds.split(","), args.data_dir, args.iters)
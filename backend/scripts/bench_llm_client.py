@@ -0,0 +1,136 @@
+# backend/scripts/bench_llm_client.py
+"""
+요청마다 ChatOpenAI 를 새로 만드는 예전 get_chain() vs ChainRegistry(체인 + keep-alive 클라이언트 재사용).
+
+실행 (OpenAI 키 필요 없음, 로컬 가짜 OpenAI 호환 서버를 띄운다):
+    python -m backend.scripts.bench_llm_client --requests 300 --threads 8
+
+- 127.0.0.1 에 /v1/chat/completions 를 흉내 내는 HTTP/1.1 keep-alive 서버를 띄운다 (답변은 고정, 지연 --server-ms)
+- per-request : 요청마다 ChatOpenAI + 체인을 새로 만들어 invoke (예전 main.get_chain)
+- registry    : ChainRegistry.get() 으로 받은 체인을 invoke
+- 경로별 req/s, p50 / p95 지연시간, 서버가 받은 TCP 연결 수를 출력한다.
+  로컬이라 TLS 핸드셰이크는 빠져 있다 (실제 api.openai.com 에서는 새 연결 비용이 더 크다).
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_openai import ChatOpenAI
+
+from backend import llm_registry
+
+PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "너는 온라인 스터디룸 사용자를 도와주는 학습 코치야."),
+    MessagesPlaceholder(variable_name="history"),
+    ("human", "{input}"),
+])
+INPUTS = {"history": [], "input": "집중이 안 돼요"}
+
+
+class _MockOpenAI(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    connections = 0
+    delay = 0.0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with _MockOpenAI.lock:
+            _MockOpenAI.connections += 1
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.delay:
+            time.sleep(self.delay)
+        payload = json.dumps({
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "25분 집중하고 5분 쉬어 보세요."},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 20, "completion_tokens": 10, "total_tokens": 30},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def _legacy_chain(config: llm_registry.ChainConfig):
+    # user-025 이전의 get_chain (요청마다 새 ChatOpenAI = 새 httpx 클라이언트 / 커넥션 풀)
+    llm = ChatOpenAI(
+        model=config.model, temperature=config.temperature, timeout=config.timeout,
+        api_key=config.api_key, base_url=config.base_url,
+    )
+    return PROMPT | llm | StrOutputParser()
+
+
+def _run(name: str, get_chain, requests: int, threads: int) -> None:
+    latencies = []
+    lock = threading.Lock()
+    todo = iter(range(requests))
+    before = _MockOpenAI.connections
+
+    def worker():
+        local = []
+        for _ in todo:
+            t0 = time.perf_counter()
+            get_chain().invoke(INPUTS)
+            local.append((time.perf_counter() - t0) * 1000.0)
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:<12} {len(latencies) / elapsed:>9.1f} {statistics.median(latencies):>9.2f} {p95:>9.2f} "
+          f"{_MockOpenAI.connections - before:>12}")
+
+
+def main(args):
+    _MockOpenAI.delay = args.server_ms / 1000.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MockOpenAI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    config = llm_registry.ChainConfig(
+        model="gpt-4o", temperature=0.2, timeout=60.0, base_url=base_url, api_key="sk-mock",
+    )
+    registry = llm_registry.ChainRegistry(lambda: (ChatOpenAI, PROMPT, StrOutputParser))
+    try:
+        print(f"requests={args.requests}, threads={args.threads}, server_ms={args.server_ms}")
+        print(f"{'path':<12} {'req/s':>9} {'p50_ms':>9} {'p95_ms':>9} {'connections':>12}")
+        _run("per-request", lambda: _legacy_chain(config), args.requests, args.threads)
+        _run("registry", lambda: registry.get(config), args.requests, args.threads)
+        print(f"registry: {registry.stats()['builds']} build(s), {registry.stats()['hits']} hits")
+    finally:
+        asyncio.run(registry.aclose())
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--server-ms", type=float, default=0.0)
+    main(parser.parse_args())
@@ -0,0 +1,152 @@
+# backend/scripts/bench_room_chat.py
+"""
+방 채팅 벤치마크: 메시지마다 INSERT + 커밋 vs RoomChat(모아서 저장) + 히스토리 읽기.
+
+실행 (로컬 MySQL):
+    python -m backend.scripts.bench_room_chat --rooms 20 --messages 20000 --concurrency 64
+
+- 임시 User / Room 을 만들고, 코루틴 concurrency 개가 무작위 방에 메시지를 보낸다.
+- per-row : 메시지마다 to_thread 로 세션을 열고 INSERT + commit (라우터에서 바로 저장하는 방식)
+- buffered: RoomChat.post() 후 stop() 으로 마지막 flush 까지 (flush 시간 포함)
+- 끝나면 저장된 행 수가 보낸 수와 같은지, 방별 id 가 보낸 순서대로 증가하는지 확인한다.
+- 히스토리: 최근 페이지(tail) / 이전 페이지(DB keyset) 읽기 지연시간을 출력한다.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import func, insert
+
+from backend import models, room_chat
+from backend.database import SessionLocal
+
+
+def _seed(db, n_rooms: int, n_users: int):
+    tag = uuid.uuid4().hex[:8]
+    db.execute(
+        insert(models.User),
+        [
+            {"email": f"bench-chat-{tag}-{i}@local", "pw": "bench", "nickname": f"bench-{i}", "selected": 0}
+            for i in range(n_users)
+        ],
+    )
+    user_ids = [uid for (uid,) in db.query(models.User.user_id).filter(models.User.email.like(f"bench-chat-{tag}-%"))]
+    db.execute(
+        insert(models.Room),
+        [{"title": f"bench-chat-{tag}-{i}", "owner_id": user_ids[0], "member_id": user_ids[0]} for i in range(n_rooms)],
+    )
+    room_ids = [rid for (rid,) in db.query(models.Room.room_id).filter(models.Room.title.like(f"bench-chat-{tag}-%"))]
+    db.commit()
+    return user_ids, room_ids
+
+
+def _cleanup(db, user_ids, room_ids) -> None:
+    db.rollback()
+    db.query(models.Message).filter(models.Message.room_id.in_(room_ids)).delete(synchronize_session=False)
+    db.query(models.Room).filter(models.Room.room_id.in_(room_ids)).delete(synchronize_session=False)
+    db.query(models.User).filter(models.User.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.commit()
+
+
+def _count(db, room_ids) -> int:
+    db.expire_all()
+    return db.query(func.count(models.Message.id)).filter(models.Message.room_id.in_(room_ids)).scalar()
+
+
+def _insert_one(row: dict) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(insert(models.Message), [row])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _drive(n: int, concurrency: int, send) -> float:
+    todo = iter(range(n))
+
+    async def worker():
+        for i in todo:
+            await send(i)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - t0
+
+
+async def _bench(args, user_ids, room_ids):
+    rng = random.Random(args.seed)
+    picks = [(rng.choice(room_ids), rng.choice(user_ids)) for _ in range(args.messages)]
+    ids = room_chat.MessageIdGenerator(15)
+
+    async def per_row(i):
+        room_id, sender = picks[i]
+        row = {"id": ids.next_id(), "room_id": room_id, "sender": sender, "log": f"m{i}", "msg_class": 0, "time": datetime.now()}
+        await asyncio.to_thread(_insert_one, row)
+
+    elapsed = await _drive(args.messages, args.concurrency, per_row)
+    print(f"{'per-row':<10} {args.messages / elapsed:>12,.0f} msgs/s")
+
+    chat = room_chat.RoomChat(SessionLocal, flush_interval_ms=args.flush_ms, tail_size=args.tail)
+    await chat.start()
+    sent = {}
+
+    async def buffered(i):
+        room_id, sender = picks[i]
+        message = await chat.post(room_id, sender, f"b{i}")
+        sent.setdefault(room_id, []).append(message["id"])
+
+    elapsed = await _drive(args.messages, args.concurrency, buffered)
+    t0 = time.perf_counter()
+    await chat.flush()
+    drained = time.perf_counter() - t0
+    print(f"{'buffered':<10} {args.messages / elapsed:>12,.0f} msgs/s  (final flush {drained * 1000:.1f} ms)")
+    print(f"  flushes={chat.flushes}, rows_written={chat.rows_written}, dropped={chat.rows_dropped}")
+    ordered = all(ids_ == sorted(ids_) for ids_ in sent.values())
+    print(f"  [{'ok' if ordered else 'FAIL'}] ids increase in send order per room")
+
+    # 히스토리: 최근 페이지(tail) 와 한참 이전 페이지(DB)
+    room_id = max(sent, key=lambda r: len(sent[r]))
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        page, before = await chat.history(room_id, None, args.limit)
+    tail_ms = (time.perf_counter() - t0) * 1000.0 / args.repeat
+    t0 = time.perf_counter()
+    deep = sent[room_id][len(sent[room_id]) // 4]
+    for _ in range(args.repeat):
+        older, _ = await chat.history(room_id, deep, args.limit)
+    db_ms = (time.perf_counter() - t0) * 1000.0 / args.repeat
+    print(f"history recent (tail) {tail_ms:.3f} ms, older (keyset) {db_ms:.3f} ms, page={len(page)}/{len(older)}")
+    await chat.stop()
+    return sum(len(v) for v in sent.values())
+
+
+def main(args):
+    db = SessionLocal()
+    user_ids, room_ids = _seed(db, args.rooms, args.users)
+    try:
+        print(f"rooms={args.rooms}, messages={args.messages}, concurrency={args.concurrency}")
+        buffered = asyncio.run(_bench(args, user_ids, room_ids))
+        stored = _count(db, room_ids)
+        expected = args.messages + buffered
+        print(f"  [{'ok' if stored == expected else 'FAIL'}] stored rows {stored} == sent {expected}")
+    finally:
+        _cleanup(db, user_ids, room_ids)
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--flush-ms", type=float, default=100.0)
+    parser.add_argument("--tail", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,136 @@
+# backend/scripts/bench_room_list.py
+"""
+방 목록 벤치마크: 전체 목록(room_directory.build_rooms) vs room_id keyset 페이지(page_rooms).
+
+실행 (로컬 MySQL):
+    python -m backend.scripts.bench_room_list --rooms 10000 --limit 20 --repeat 20
+
+- 임시 User 와 Room(제목이 bench-rooms- 로 시작) 을 rooms 개, 방마다 0~capacity 명의 RoomMember 를 만든다.
+- 전체 목록 1번, keyset 첫 페이지 / 중간 페이지 / 마지막 근처 페이지 / 필터 페이지를 각각 repeat 번 돌려
+  평균 ms 를 출력한다. 뒤쪽 페이지도 첫 페이지와 비용이 비슷해야 한다 (OFFSET 이 아님).
+- 끝나면 만든 행을 모두 지운다.
+"""
+import argparse
+import random
+import time
+import uuid
+
+from sqlalchemy import insert
+
+from backend import models, room_directory
+from backend.database import SessionLocal
+
+PURPOSES = ["study", "exam", "coding", "reading", None]
+
+
+def _seed(db, n_rooms: int, n_users: int, rng: random.Random):
+    tag = uuid.uuid4().hex[:8]
+    users = [
+        models.User(email=f"bench-rooms-{tag}-{i}@local", pw="bench", nickname=f"bench-{i}", selected=0)
+        for i in range(n_users)
+    ]
+    db.add_all(users)
+    db.flush()
+    user_ids = [u.user_id for u in users]
+
+    rooms = [
+        {
+            "title": f"bench-rooms-{tag}-{i}",
+            "owner_id": user_ids[i % n_users],
+            "member_id": user_ids[i % n_users],
+            "capacity": rng.choice([None, 2, 4, 6, 8]),
+            "purpose": rng.choice(PURPOSES),
+            "battle_enabled": rng.random() < 0.3,
+        }
+        for i in range(n_rooms)
+    ]
+    db.execute(insert(models.Room), rooms)
+    room_ids = [
+        rid for (rid,) in db.query(models.Room.room_id)
+        .filter(models.Room.title.like(f"bench-rooms-{tag}-%"))
+        .order_by(models.Room.room_id)
+    ]
+
+    members = []
+    for room_id, room in zip(room_ids, rooms):
+        size = rng.randint(0, min(room["capacity"] or 8, n_users))
+        for uid in rng.sample(user_ids, size):
+            members.append({"room_id": room_id, "user_id": uid, "role": "member"})
+    if members:
+        db.execute(insert(models.RoomMember), members)
+    db.commit()
+    return user_ids, room_ids, len(members)
+
+
+def _cleanup(db, user_ids, room_ids) -> None:
+    db.rollback()
+    for i in range(0, len(room_ids), 1000):
+        chunk = room_ids[i:i + 1000]
+        db.query(models.RoomMember).filter(models.RoomMember.room_id.in_(chunk)).delete(synchronize_session=False)
+        db.query(models.Room).filter(models.Room.room_id.in_(chunk)).delete(synchronize_session=False)
+    db.query(models.User).filter(models.User.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.commit()
+
+
+def _time(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) * 1000.0 / repeat
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    user_ids, room_ids, n_members = _seed(db, args.rooms, args.users, rng)
+    try:
+        print(f"rooms={len(room_ids)}, members={n_members}, limit={args.limit}, repeat={args.repeat}")
+        print(f"{'case':<28} {'ms':>10} {'items':>7}")
+
+        t0 = time.perf_counter()
+        rooms = room_directory.build_rooms(db)
+        print(f"{'full list (build_rooms)':<28} {(time.perf_counter() - t0) * 1000.0:>10.2f} {len(rooms):>7}")
+
+        # 벤치 방들의 앞 / 가운데 / 끝 근처에서 시작하는 페이지
+        cursors = {
+            "first": room_ids[0] - 1,
+            "middle": room_ids[len(room_ids) // 2],
+            "deep": room_ids[-args.limit - 1] if len(room_ids) > args.limit else room_ids[0],
+        }
+        cases = []
+        for name, cursor in cursors.items():
+            cases.append((f"{name} page (summary)", dict(cursor=cursor)))
+            cases.append((f"{name} page (full)", dict(cursor=cursor, full=True)))
+        cases.append(("filter purpose+battle", dict(cursor=cursors["first"], purpose="study", battle_enabled=True)))
+        cases.append(("filter has_free_seat", dict(cursor=cursors["middle"], has_free_seat=True)))
+
+        for name, kwargs in cases:
+            items = []
+
+            def run():
+                items[:], _ = room_directory.page_rooms(db, limit=args.limit, **kwargs)
+
+            ms = _time(run, args.repeat)
+            print(f"{name:<28} {ms:>10.2f} {len(items):>7}")
+
+        # 페이지를 끝까지 따라가며 전체 목록과 같은 방을 빠짐없이 한 번씩 보는지 확인
+        seen, cursor = [], cursors["first"]
+        while cursor is not None:
+            items, cursor = room_directory.page_rooms(db, cursor=cursor, limit=100)
+            seen.extend(item["room_id"] for item in items)
+        bench = set(room_ids)
+        bench_seen = [rid for rid in seen if rid in bench]
+        print(f"walk all pages: {'ok' if bench_seen == room_ids else 'MISMATCH'} ({len(bench_seen)} rooms)")
+    finally:
+        _cleanup(db, user_ids, room_ids)
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
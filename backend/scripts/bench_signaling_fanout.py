@@ -0,0 +1,86 @@
+# backend/scripts/bench_signaling_fanout.py
+"""
+시그널링 fan-out 벤치마크: 받는 사람마다 직렬화(server.js 방식) vs 한 번 직렬화 + 송신 큐(SignalingHub).
+
+실행 (DB 필요 없음):
+    python -m backend.scripts.bench_signaling_fanout --peers 50 --messages 2000
+
+- 가짜 WebSocket(send_text 가 받은 바이트 수만 센다) peers 개를 한 방에 붙이고
+  ice 메시지 messages 개를 보낸다. messages/s 와 전달 수를 출력한다.
+- 메시지는 실제 SDP 크기(수 KB)에 맞춰 candidate 문자열을 채운다.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from backend.pubsub import LocalBroker
+from backend.signaling import SignalingHub
+
+
+class _FakeSocket:
+    def __init__(self):
+        self.received = 0
+        self.bytes = 0
+
+    async def send_text(self, text: str) -> None:
+        self.received += 1
+        self.bytes += len(text)
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+def _message(i: int, size: int) -> dict:
+    return {"type": "ice", "seq": i, "candidate": {"candidate": "a" * size, "sdpMid": "0", "sdpMLineIndex": 0}}
+
+
+async def _per_recipient(peers: int, messages: int, size: int) -> tuple:
+    # server.js: for (ws of set) ws.send(JSON.stringify(msg))
+    sockets = [_FakeSocket() for _ in range(peers)]
+    t0 = time.perf_counter()
+    for i in range(messages):
+        msg = _message(i, size)
+        for ws in sockets[1:]:
+            await ws.send_text(json.dumps(msg))
+    elapsed = time.perf_counter() - t0
+    return elapsed, sum(ws.received for ws in sockets)
+
+
+async def _hub(peers: int, messages: int, size: int) -> tuple:
+    hub = SignalingHub(LocalBroker(), send_queue=messages + 8)
+    await hub.start()
+    sockets = [_FakeSocket() for _ in range(peers)]
+    members = [await hub.join(ws, "bench", i) for i, ws in enumerate(sockets)]
+    # welcome / join 알림이 다 나갈 때까지 기다렸다가 카운터를 비운다
+    while any(not p.queue.empty() for p in members):
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    for ws in sockets:
+        ws.received = ws.bytes = 0
+    expected = messages * (peers - 1)
+
+    t0 = time.perf_counter()
+    for i in range(messages):
+        await hub.relay(members[0], json.dumps(_message(i, size)))
+    while sum(ws.received for ws in sockets) < expected:
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - t0
+    await hub.stop()
+    return elapsed, sum(ws.received for ws in sockets)
+
+
+def main(args):
+    print(f"peers={args.peers}, messages={args.messages}, payload~{args.size}B")
+    print(f"{'path':<14} {'messages/s':>12} {'deliveries/s':>14} {'delivered':>10}")
+    for name, fn in (("per-recipient", _per_recipient), ("serialize-once", _hub)):
+        elapsed, delivered = asyncio.run(fn(args.peers, args.messages, args.size))
+        print(f"{name:<14} {args.messages / elapsed:>12,.0f} {delivered / elapsed:>14,.0f} {delivered:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--peers", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=2000)
+    main(parser.parse_args())
@@ -0,0 +1,97 @@
+# backend/scripts/check_battle_paths.py
+"""
+POST /damage 와 배틀 엔진(POST /{battle_id}/turn)을 한 배틀에 섞어 쓸 수 없는지 확인한다.
+
+실행 (로컬 MySQL 에 type / move / Pokemon 이 채워져 있어야 한다):
+    python -m backend.scripts.check_battle_paths
+
+1) 엔진으로 먼저 공격한 배틀: /damage 는 409, Battle.mode == engine, flush 뒤 Battle.turn == 엔진 턴
+2) /damage 로 먼저 공격한 배틀: 엔진 턴은 409, Battle.mode == damage, Battle.turn == /damage 턴
+두 경로가 같은 turn 번호를 각각 받아들이면 둘 중 하나는 나중에 조용히 사라진다.
+"""
+import asyncio
+
+from fastapi import HTTPException
+
+from backend import battle_engine, models
+from backend.database import SessionLocal
+from backend.routers import battle as battle_router
+from backend.scripts.bench_battle_damage import _cleanup, _seed
+
+
+def _read(db, battle_id: int):
+    db.expire_all()
+    return db.query(models.Battle.turn, models.Battle.mode).filter(models.Battle.id == battle_id).one()
+
+
+def _damage_status(db, payload) -> int:
+    try:
+        battle_router.calc_battle_damage(payload, db)
+        return 200
+    except HTTPException as e:
+        db.rollback()
+        return e.status_code
+
+
+async def _engine_first(engine: battle_engine.BattleEngine, db) -> dict:
+    users, ups, battle_id, payloads = _seed(db)
+    try:
+        state = await engine.get(battle_id)
+        first = state.fighters[state.actor].user_pokemon_id
+        await engine.play_turn(battle_id, first, 1)
+        # 엔진 다음 차례인 쪽이 /damage 로 공격
+        payload = next(p for p in payloads if p.attacker_user_pokemon_id != first)
+        status_code = await asyncio.to_thread(_damage_status, db, payload)
+        await engine.flush(force=True)
+        turn, mode = _read(db, battle_id)
+        return {
+            "engine first: /damage -> 409": status_code == 409,
+            "engine first: Battle.mode == engine": mode == battle_engine.ENGINE_MODE,
+            "engine first: Battle.turn == 1": turn == 1,
+        }
+    finally:
+        db.query(models.BattleTurn).filter(models.BattleTurn.battle_id == battle_id).delete()
+        _cleanup(db, users, ups, battle_id)
+
+
+async def _damage_first(engine: battle_engine.BattleEngine, db) -> dict:
+    users, ups, battle_id, payloads = _seed(db)
+    try:
+        first = await asyncio.to_thread(_damage_status, db, payloads[0])
+        try:
+            await engine.play_turn(battle_id, payloads[1].attacker_user_pokemon_id, 1)
+            engine_status = 200
+        except battle_engine.BattleError as e:
+            engine_status = e.status_code
+        await engine.flush(force=True)
+        turn, mode = _read(db, battle_id)
+        return {
+            "damage first: /damage -> 200": first == 200,
+            "damage first: engine turn -> 409": engine_status == 409,
+            "damage first: Battle.mode == damage": mode == battle_engine.DAMAGE_MODE,
+            "damage first: Battle.turn == 1": turn == 1,
+        }
+    finally:
+        db.query(models.BattleTurn).filter(models.BattleTurn.battle_id == battle_id).delete()
+        _cleanup(db, users, ups, battle_id)
+
+
+async def main() -> None:
+    engine = battle_engine.BattleEngine(SessionLocal, flush_interval_ms=50)
+    await engine.start()
+    db = SessionLocal()
+    try:
+        checks = {}
+        checks.update(await _engine_first(engine, db))
+        checks.update(await _damage_first(engine, db))
+    finally:
+        await engine.stop()
+        db.close()
+    for name, passed in checks.items():
+        print(f"  [{'ok' if passed else 'FAIL'}] {name}")
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+# backend/scripts/check_battle_sim_parity.py
+"""
+battle_sim.hit_damage 와 routers/battle.py 의 _calc_damage 가 같은 데미지를 내는지 DB 없이 확인한다.
+
+bench_battle_sim 의 parity 는 MySQL 데이터로 돌리지만, 여기서는 고정된 상성표 / 종족 / 기술로
+모든 (공격자, 방어자, 기술) 조합을 비교한다. 상성표에 없는 타입("shadow", "cosmic"), 타입 없음(None),
+type1 없이 type2 만 있는 종족처럼 경계에 있는 경우를 일부러 넣었다.
+
+실행: python -m backend.scripts.check_battle_sim_parity
+"""
+import random
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+from backend import battle_sim, type_chart
+from backend.routers import battle as battle_router
+
+TYPES = [
+    "normal", "fire", "water", "grass", "electric", "ice", "fighting", "poison", "ground",
+    "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy",
+]
+EFFECTIVE = {
+    ("fire", "grass"): 2.0,
+    ("fire", "water"): 0.5,
+    ("water", "fire"): 2.0,
+    ("grass", "water"): 2.0,
+    ("electric", "ground"): 0.0,
+    ("normal", "ghost"): 0.0,
+}
+
+
+def _chart() -> type_chart.TypeChart:
+    single = np.ones((len(TYPES), len(TYPES)), dtype=np.float32)
+    for (atk, de), mult in EFFECTIVE.items():
+        single[TYPES.index(atk), TYPES.index(de)] = mult
+    return type_chart.TypeChart(TYPES, single)
+
+
+def _poke(poke_id, type1, type2, hp=80, atk=90, de=70, spa=100, spd=60, spe=75):
+    return SimpleNamespace(
+        poke_id=poke_id, base_hp=hp, base_attack=atk, base_defense=de,
+        base_sp_attack=spa, base_sp_defense=spd, base_speed=spe, type1=type1, type2=type2,
+    )
+
+
+POKES = [
+    _poke(1, "fire", None),
+    _poke(2, "water", "ground"),
+    _poke(3, "grass", "poison", atk=55, spa=120),
+    _poke(4, "shadow", None, atk=130, de=40),     # 상성표에 없는 타입
+    _poke(5, None, "fire", spd=110),              # type1 없이 type2 만
+    _poke(6, "cosmic", "ghost", spa=140),
+    _poke(7, None, None, atk=60, de=60),
+]
+MOVES = [
+    SimpleNamespace(id=1, name="ember", power=40, damage_class="special", type="fire"),
+    SimpleNamespace(id=2, name="surf", power=90, damage_class="special", type="water"),
+    SimpleNamespace(id=3, name="earthquake", power=100, damage_class="physical", type="ground"),
+    SimpleNamespace(id=4, name="shadow rush", power=90, damage_class="physical", type="shadow"),
+    SimpleNamespace(id=5, name="star beam", power=120, damage_class="special", type="cosmic"),
+    SimpleNamespace(id=6, name="tackle", power=40, damage_class="physical", type="normal"),
+    SimpleNamespace(id=7, name="mystery", power=70, damage_class="physical", type=None),
+]
+
+
+def main(seed: int = 0) -> int:
+    chart = _chart()
+    data = battle_sim.SimData.from_rows(chart, POKES, MOVES)
+
+    idx = np.indices((len(POKES), len(POKES), len(MOVES))).reshape(3, -1)
+    atk, de, mv = idx[0], idx[1], idx[2]
+
+    random.seed(seed)
+    rand = np.array([random.uniform(0.85, 1.0) for _ in range(atk.size)])
+
+    # 스칼라: 라우터와 같은 경로. 모든 기술이 power > 0 이라 조합마다 random.uniform 을 한 번 부른다
+    random.seed(seed)
+    scalar = np.empty(atk.size, dtype=np.int64)
+    for i in range(atk.size):
+        a, d, m = POKES[atk[i]], POKES[de[i]], MOVES[mv[i]]
+        scalar[i], _ = battle_router._calc_damage(a, d, m, chart.multiplier(m.type, d.type1, d.type2))
+
+    vector = battle_sim.hit_damage(data, atk, de, mv, rand)
+    bad = np.flatnonzero(scalar != vector)
+    print(f"parity: {atk.size} hits, mismatches={bad.size}")
+    for i in bad[:10]:
+        print(
+            f"  atk={POKES[atk[i]].poke_id} def={POKES[de[i]].poke_id} move={MOVES[mv[i]].name} "
+            f"scalar={scalar[i]} vector={vector[i]}"
+        )
+    return 1 if bad.size else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# backend/scripts/check_llm_registry.py
+"""
+교체된 체인의 httpx 클라이언트가 실제로 닫히는지 확인한다 (OpenAI 호출 / 네트워크 없음).
+
+실행: python -m backend.scripts.check_llm_registry
+
+main.py 처럼 get() 을 스레드풀(asyncio.to_thread)에서 부르고, API 키만 바꾼 설정으로 체인을 네 번 교체한다.
+retire_grace_s=0 이라 다음 get() 에서 이전 체인을 닫아야 한다.
+1) 교체된 세 체인의 sync / async 클라이언트가 모두 닫힘, retired == 0, retired_closed == 3
+2) 지금 쓰는 체인의 클라이언트는 열려 있음
+3) aclose() 뒤에는 지금 쓰는 체인도 닫힘
+"""
+import asyncio
+import sys
+
+from backend import llm_registry
+
+
+class _Client:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    async def aclose(self):
+        await asyncio.sleep(0)
+        self.closed = True
+
+
+def _config(i: int) -> llm_registry.ChainConfig:
+    return llm_registry.ChainConfig(model="check", temperature=0.2, timeout=30.0, base_url=None, api_key=f"key-{i}")
+
+
+async def main() -> int:
+    registry = llm_registry.ChainRegistry(loader=None, retire_grace_s=0.0)
+    built = []
+
+    def build(config):
+        entry = llm_registry._Entry(config, object(), _Client(), _Client())
+        built.append((entry.http_client, entry.http_async_client))
+        return entry
+
+    registry._build = build
+    await registry.start()
+
+    for i in range(4):
+        await asyncio.to_thread(registry.get, _config(i))
+    await asyncio.to_thread(registry.get, _config(3))  # 세 번째로 교체된 체인을 닫는다
+    for _ in range(10):  # 루프로 넘긴 aclose() 가 끝날 때까지
+        await asyncio.sleep(0)
+
+    old, current = built[:-1], built[-1]
+    stats = registry.stats()
+    checks = {
+        "retired sync clients closed": all(sync.closed for sync, _ in old),
+        "retired async clients closed (from thread)": all(async_.closed for _, async_ in old),
+        f"retired == 0 ({stats['retired']})": stats["retired"] == 0,
+        f"retired_closed == 3 ({stats['retired_closed']})": stats["retired_closed"] == 3,
+        "current clients still open": not current[0].closed and not current[1].closed,
+    }
+    await registry.aclose()
+    checks["aclose() closes current clients"] = current[0].closed and current[1].closed
+
+    for name, passed in checks.items():
+        print(f"  [{'ok' if passed else 'FAIL'}] {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,104 @@
+# backend/scripts/check_room_join.py
+"""
+방 생성 / 참여의 에러 응답 확인 (로컬 MySQL).
+
+실행:
+    python -m backend.scripts.check_room_join --threads 8
+
+1) 정원 1 인 방의 방장이 다시 join        -> 400 "이미 참여 중인 스터디룸입니다." (정원 초과가 아니라)
+2) 다른 사용자가 가득 찬 방에 join       -> 400 "이미 정원이 가득 찼습니다."
+3) 한 사용자가 동시에 방을 여러 개 생성  -> 하나만 201, 나머지는 400 "이미 참여하고 있는 스터디룸이 있습니다."
+                                          (uq_room_member_user 위반이 500 으로 새지 않는다)
+임시 사용자 / 방은 끝나면 지운다.
+"""
+import argparse
+import threading
+import uuid
+
+from fastapi import HTTPException
+
+from backend import models
+from backend.database import SessionLocal
+from backend.routers import room as room_router
+from backend.schemas.room import RoomCreate, RoomJoinRequest
+
+
+def _outcome(fn) -> str:
+    try:
+        fn()
+        return "ok"
+    except HTTPException as e:
+        return f"{e.status_code} {e.detail}"
+    except Exception as e:
+        return f"{type(e).__name__}"
+
+
+def _create(db, user: models.User, title: str, capacity: int):
+    payload = RoomCreate(title=title, owner_id=user.user_id, member_id=user.user_id, capacity=capacity)
+    return room_router.create_room(payload, db, current_user=user)
+
+
+def main(args):
+    tag = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    users = [
+        models.User(email=f"check-room-{tag}-{i}@local", pw="check", nickname=f"check-{i}", selected=0)
+        for i in range(3)
+    ]
+    db.add_all(users)
+    db.commit()
+    owner, other, racer = users
+    try:
+        _create(db, owner, f"check-{tag}", capacity=1)
+        room_id = db.query(models.Room.room_id).filter(models.Room.title == f"check-{tag}").scalar()
+        rejoin = _outcome(lambda: room_router.join_room(room_id, RoomJoinRequest(user_id=owner.user_id), db))
+        full = _outcome(lambda: room_router.join_room(room_id, RoomJoinRequest(user_id=other.user_id), db))
+
+        barrier = threading.Barrier(args.threads)
+        results = [None] * args.threads
+
+        def worker(i: int):
+            session = SessionLocal()
+            try:
+                user = session.get(models.User, racer.user_id)
+                barrier.wait()
+                results[i] = _outcome(lambda: _create(session, user, f"check-{tag}-race-{i}", capacity=4))
+            finally:
+                session.close()
+
+        pool = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+
+        checks = {
+            f"owner re-join -> already in this room ({rejoin})": rejoin == "400 이미 참여 중인 스터디룸입니다.",
+            f"other user -> room full ({full})": full == "400 이미 정원이 가득 찼습니다.",
+            "concurrent create -> exactly one created": results.count("ok") == 1,
+            "concurrent create -> others 400 already joined": all(
+                r in ("ok", "400 이미 참여하고 있는 스터디룸이 있습니다.") for r in results
+            ),
+        }
+        for name, passed in checks.items():
+            print(f"  [{'ok' if passed else 'FAIL'}] {name}")
+        if not all(checks.values()):
+            print(f"  concurrent create results: {results}")
+            raise SystemExit(1)
+    finally:
+        db.rollback()
+        user_ids = [u.user_id for u in users]
+        room_ids = [
+            rid for (rid,) in db.query(models.Room.room_id).filter(models.Room.title.like(f"check-{tag}%"))
+        ]
+        db.query(models.RoomMember).filter(models.RoomMember.user_id.in_(user_ids)).delete(synchronize_session=False)
+        db.query(models.Room).filter(models.Room.room_id.in_(room_ids)).delete(synchronize_session=False)
+        db.query(models.User).filter(models.User.user_id.in_(user_ids)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    main(parser.parse_args())
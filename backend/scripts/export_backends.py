@@ -0,0 +1,109 @@
+# backend/scripts/export_backends.py
+"""
+YawnCNN 추론 백엔드별 레이블 일치율 / 지연시간 / 메모리 확인 (CPU 전용).
+
+실행: python -m backend.scripts.export_backends [--backends eager,torchscript,int8_static]
+                                                [--tolerance 0.98] [--export-dir backend/exported]
+
+- 검증 입력: DROWSY_CALIB_DIR(기본 backend/debug_faces) 의 얼굴 crop + 랜덤 입력
+- 일치율이 tolerance 미만인 백엔드가 있으면 종료 코드 1
+- --export-dir 를 주면 torchscript 로 저장 가능한 백엔드는 .pt 로 내보낸다
+"""
+import argparse
+import io
+import os
+import resource
+import sys
+import time
+
+import torch
+
+from backend import inference_backends
+
+MODEL_PATH = "backend/best_model_Yawn_fold4.pth"
+
+
+def _rss_mb() -> float:
+    # Linux 기준 ru_maxrss 는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _serialized_mb(model) -> float:
+    buf = io.BytesIO()
+    try:
+        if isinstance(model, torch.jit.ScriptModule):
+            torch.jit.save(model, buf)
+        else:
+            torch.save(model.state_dict(), buf)
+    except Exception:
+        return float("nan")
+    return buf.tell() / (1024.0 * 1024.0)
+
+
+def _latency_ms(model, batch: torch.Tensor, iters: int) -> float:
+    with torch.no_grad():
+        for _ in range(5):
+            model(batch)
+        t0 = time.perf_counter()
+        for _ in range(iters):
+            model(batch)
+    return (time.perf_counter() - t0) * 1000.0 / iters
+
+
+def main(backends, tolerance: float, iters: int, export_dir: str | None) -> int:
+    device = torch.device("cpu")
+    calib_dir = os.getenv("DROWSY_CALIB_DIR", inference_backends.DEFAULT_CALIB_DIR)
+
+    faces = inference_backends.load_calibration_faces(calib_dir)
+    inputs = [inference_backends.faces_to_batch(faces)] if faces else []
+    inputs.append(torch.randn(64, 3, 64, 64).clamp_(-1, 1))
+    verify = torch.cat(inputs)
+
+    eager = inference_backends.load_eager(MODEL_PATH, device)
+    with torch.no_grad():
+        ref_probs = torch.softmax(eager(verify), dim=1)
+    ref_labels = ref_probs.argmax(dim=1)
+
+    print(f"verify samples={len(verify)} (calibration faces={len(faces)}), tolerance={tolerance}")
+    print(f"{'backend':<14} {'agree':>7} {'max|dp|':>8} {'b1_ms':>7} {'b16_ms':>7} {'size_MB':>8} {'peak_rss':>8}")
+
+    failed = False
+    for name in backends:
+        try:
+            model = inference_backends.build(name, MODEL_PATH, device, calib_dir=calib_dir)
+        except Exception as e:
+            print(f"{name:<14} 실패: {type(e).__name__}: {e}")
+            failed = True
+            continue
+
+        with torch.no_grad():
+            probs = torch.softmax(model(verify), dim=1)
+        agree = (probs.argmax(dim=1) == ref_labels).float().mean().item()
+        max_dp = (probs - ref_probs).abs().max().item()
+
+        b1 = _latency_ms(model, verify[:1], iters)
+        b16 = _latency_ms(model, verify[:16], iters)
+        print(
+            f"{name:<14} {agree:>7.3f} {max_dp:>8.4f} {b1:>7.3f} {b16:>7.3f} "
+            f"{_serialized_mb(model):>8.2f} {_rss_mb():>8.1f}"
+        )
+        if agree < tolerance:
+            failed = True
+
+        if export_dir and isinstance(model, torch.jit.ScriptModule):
+            os.makedirs(export_dir, exist_ok=True)
+            path = os.path.join(export_dir, f"yawn_{name}.pt")
+            torch.jit.save(model, path)
+            print(f"  → {path}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", default=",".join(inference_backends.BACKENDS))
+    parser.add_argument("--tolerance", type=float, default=0.98)
+    parser.add_argument("--iters", type=int, default=50)
+    parser.add_argument("--export-dir", default=None)
+    args = parser.parse_args()
+    sys.exit(main(args.backends.split(","), args.tolerance, args.iters, args.export_dir))
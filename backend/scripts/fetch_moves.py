@@ -4,7 +4,7 @@ import requests
 from sqlalchemy.orm import Session
 
 from backend.database import SessionLocal
-from backend import models
+from backend import models, move_pool
 
 API_BASE = "https://pokeapi.co/api/v2/move"
 
@@ -67,6 +67,7 @@ def fetch_and_save_moves(start_id: int = 1, end_id: int = 900, sleep: float = 0.
                 time.sleep(sleep)  # 과도한 요청 방지
 
         db.commit()
+        move_pool.invalidate()  # 서버의 배틀 기술 풀 다시 읽게
         print("✅ move 데이터 업데이트 완료")
     finally:
         db.close()
@@ -2,6 +2,7 @@
 """
 PokeAPI에서 타입/상성 정보를 가져와
 type, type_effectiveness 테이블을 채운다.
+끝나면 서버 프로세스의 타입 상성표 캐시(backend/type_chart.py)를 무효화한다.
 """
 import time
 from typing import Dict, Tuple
@@ -10,7 +11,7 @@ import requests
 from sqlalchemy.orm import Session
 
 from backend.database import SessionLocal
-from backend import models
+from backend import models, type_chart
 
 
 def _fetch_json(url: str) -> Dict:
@@ -80,6 +81,7 @@ def fill_types():
                 )
             )
         db.commit()
+        type_chart.invalidate()
         print("✅ 완료")
     finally:
         db.close()
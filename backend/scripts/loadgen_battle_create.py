@@ -0,0 +1,134 @@
+# backend/scripts/loadgen_battle_create.py
+"""
+배틀 생성 부하 테스트: 예전 경로(커밋 2번 + BattleMove ORM 8개) vs 단일 트랜잭션 bulk insert.
+
+실행 (로컬 MySQL 에 move / Pokemon 이 채워져 있어야 한다):
+    python -m backend.scripts.loadgen_battle_create --threads 16 --seconds 10
+
+- 임시 User / UserPokemon / UserActiveTeam 한 쌍을 만들고, 스레드마다 자기 세션으로
+  create_battle 을 반복 호출한다. 끝나면 만든 배틀과 임시 행을 모두 지운다.
+- 경로별 battles/s 와 p50 / p99 지연시간을 출력한다.
+- 기술 선택은 두 경로 모두 캐시된 기술 풀(backend/move_pool.py)을 쓰므로 쓰기 경로 차이만 잰다.
+- 엔진 커넥션 풀(기본 5 + overflow 10)보다 스레드가 많으면 커넥션 대기 시간도 섞인다.
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from backend import models
+from backend.database import SessionLocal
+from backend.routers import battle as battle_router
+from backend.schemas.battle import BattleAssignedMove, BattleCreateRequest, BattleCreateResponse
+from backend.scripts.bench_battle_damage import _cleanup, _seed
+
+
+def _legacy_create(payload: BattleCreateRequest, db) -> int:
+    # user-016 이전의 create_battle (Battle 커밋 + refresh 후 BattleMove 를 하나씩 add, 커밋 2번)
+    r = battle_router
+    player_a_up = r._get_user_pokemon(db, payload.player_a_user_pokemon_id)
+    player_b_up = r._get_user_pokemon(db, payload.player_b_user_pokemon_id)
+    r._ensure_active_team(db, player_a_up.id)
+    r._ensure_active_team(db, player_b_up.id)
+
+    battle = models.Battle(
+        player_a_user_pokemon_id=player_a_up.id,
+        player_b_user_pokemon_id=player_b_up.id,
+        status="ongoing",
+    )
+    db.add(battle)
+    db.commit()
+    db.refresh(battle)
+
+    assigned = []
+    for up in (player_a_up, player_b_up):
+        for idx, mv in enumerate(r._choose_moves_for_battle(db), start=1):
+            db.add(
+                models.BattleMove(
+                    battle_id=battle.id,
+                    user_pokemon_id=up.id,
+                    move_id=mv.id,
+                    slot=idx,
+                    current_pp=mv.pp,
+                )
+            )
+            assigned.append(
+                BattleAssignedMove(
+                    move_id=mv.id, name=mv.name, name_ko=mv.name_ko, power=mv.power,
+                    pp=mv.pp, damage_class=mv.damage_class, slot=idx, current_pp=mv.pp,
+                )
+            )
+    db.commit()
+    BattleCreateResponse(
+        battle_id=battle.id,
+        player_a_user_pokemon_id=player_a_up.id,
+        player_b_user_pokemon_id=player_b_up.id,
+        player_a_moves=assigned[:4],
+        player_b_moves=assigned[4:],
+    )
+    return battle.id
+
+
+def _bulk_create(payload: BattleCreateRequest, db) -> int:
+    return battle_router.create_battle(payload, db).battle_id
+
+
+def _run(name: str, fn, payload: BattleCreateRequest, threads: int, seconds: float, created: list) -> None:
+    latencies: list = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        db = SessionLocal()
+        local_ids, local_lat = [], []
+        try:
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                local_ids.append(fn(payload, db))
+                local_lat.append((time.perf_counter() - t0) * 1000.0)
+        finally:
+            db.close()
+        with lock:
+            created.extend(local_ids)
+            latencies.extend(local_lat)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+    p50 = statistics.median(latencies) if latencies else 0.0
+    print(f"{name:<8} {len(latencies) / elapsed:>10.1f} {p50:>9.2f} {p99:>9.2f}")
+
+
+def main(args):
+    db = SessionLocal()
+    users, ups, seed_battle_id, _ = _seed(db)
+    payload = BattleCreateRequest(player_a_user_pokemon_id=ups[0].id, player_b_user_pokemon_id=ups[1].id)
+    created: list = []
+    try:
+        print(f"threads={args.threads}, seconds={args.seconds}")
+        print(f"{'path':<8} {'battles/s':>10} {'p50_ms':>9} {'p99_ms':>9}")
+        _run("legacy", _legacy_create, payload, args.threads, args.seconds, created)
+        _run("bulk", _bulk_create, payload, args.threads, args.seconds, created)
+    finally:
+        db.rollback()
+        for i in range(0, len(created), 1000):
+            chunk = created[i:i + 1000]
+            db.query(models.BattleMove).filter(models.BattleMove.battle_id.in_(chunk)).delete(synchronize_session=False)
+            db.query(models.Battle).filter(models.Battle.id.in_(chunk)).delete(synchronize_session=False)
+        db.commit()
+        _cleanup(db, users, ups, seed_battle_id)
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    main(parser.parse_args())
@@ -0,0 +1,99 @@
+# backend/scripts/loadgen_drowsiness.py
+"""
+졸음 감지 로컬 부하 생성기: multipart POST /api/drowsiness vs WebSocket /ws/drowsiness.
+
+실행 (서버를 먼저 띄운 뒤):
+    uvicorn backend.main:app --port 8000 &
+    python -m backend.scripts.loadgen_drowsiness --clients 50 --seconds 20 --server-pid $!
+
+- 각 클라이언트는 --interval 초마다 같은 JPEG 프레임을 보낸다 (0 이면 응답 받는 즉시 다음 프레임).
+- --server-pid 를 주면 /proc/<pid>/stat 의 utime+stime 으로 서버 CPU ms/frame 을 계산한다.
+- 필요 패키지: httpx, websockets
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+import websockets
+
+from backend.scripts.bench_decode import _synthetic_frame
+
+
+def _cpu_seconds(pid: int | None) -> float:
+    if pid is None:
+        return 0.0
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # fields[11], fields[12] = utime, stime (clock ticks)
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def _multipart_client(base_url: str, frame: bytes, user: str, deadline: float, interval: float, counter: dict):
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        while time.perf_counter() < deadline:
+            res = await client.post(
+                "/api/drowsiness",
+                files={"file": ("capture.jpg", frame, "image/jpeg")},
+                data={"user_id": user},
+            )
+            counter["ok" if res.status_code == 200 else "busy"] += 1
+            if interval:
+                await asyncio.sleep(interval)
+
+
+async def _ws_client(ws_url: str, frame: bytes, user: str, deadline: float, interval: float, counter: dict):
+    async with websockets.connect(f"{ws_url}/ws/drowsiness?user_id={user}", max_size=None) as ws:
+        while time.perf_counter() < deadline:
+            await ws.send(frame)
+            payload = json.loads(await ws.recv())
+            counter["ok" if payload.get("status") == "ok" else "busy"] += 1
+            if interval:
+                await asyncio.sleep(interval)
+
+
+async def _run(name: str, make_client, clients: int, seconds: float, server_pid: int | None):
+    counter = {"ok": 0, "busy": 0}
+    deadline = time.perf_counter() + seconds
+    cpu_before = _cpu_seconds(server_pid)
+    started = time.perf_counter()
+    await asyncio.gather(*(make_client(f"loadgen-{i}", deadline, counter) for i in range(clients)))
+    elapsed = time.perf_counter() - started
+    cpu_used = _cpu_seconds(server_pid) - cpu_before
+
+    frames = counter["ok"]
+    cpu_per_frame = (cpu_used * 1000.0 / frames) if (server_pid and frames) else float("nan")
+    print(f"{name:<10} {frames / elapsed:>9.1f} {counter['busy']:>6} {cpu_per_frame:>14.2f}")
+
+
+async def main(args):
+    frame = open(args.image, "rb").read() if args.image else _synthetic_frame()
+    base_url = args.url.rstrip("/")
+    ws_url = base_url.replace("http://", "ws://").replace("https://", "wss://")
+
+    print(f"clients={args.clients}, seconds={args.seconds}, frame bytes={len(frame)}")
+    print(f"{'route':<10} {'frames/s':>9} {'busy':>6} {'server_cpu_ms/f':>14}")
+
+    await _run(
+        "multipart",
+        lambda user, deadline, counter: _multipart_client(base_url, frame, user, deadline, args.interval, counter),
+        args.clients, args.seconds, args.server_pid,
+    )
+    await _run(
+        "websocket",
+        lambda user, deadline, counter: _ws_client(ws_url, frame, user, deadline, args.interval, counter),
+        args.clients, args.seconds, args.server_pid,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--interval", type=float, default=0.0)
+    parser.add_argument("--image", default=None)
+    parser.add_argument("--server-pid", type=int, default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,38 @@
+# backend/scripts/profile_imports.py
+"""
+backend.main import 비용 프로파일 (python -X importtime).
+
+실행: python -m backend.scripts.profile_imports --top 25
+
+새 인터프리터에서 모듈을 import 하고 누적 시간이 큰 순서로 출력한다.
+torch / cv2 / mediapipe / langchain 이 목록 상단에 보이면 지연 로드가 깨진 것이다.
+"""
+import argparse
+
+from backend import startup
+
+HEAVY = ("torch", "cv2", "mediapipe", "langchain", "langchain_openai", "openai")
+
+
+def main(args):
+    rows = startup.import_profile(args.module, top=args.top)
+    if not rows:
+        print(f"{args.module} import 에 실패했거나 importtime 출력이 없습니다.")
+        return
+
+    total = max(r[2] for r in rows)
+    print(f"{args.module}: total {total:.1f} ms")
+    print(f"{'module':<50} {'self_ms':>9} {'cum_ms':>9}")
+    for name, self_ms, cumulative_ms in rows:
+        print(f"{name[:50]:<50} {self_ms:>9.1f} {cumulative_ms:>9.1f}")
+
+    loaded = {r[0].strip() for r in startup.import_profile(args.module, top=10**6)}
+    eager = [m for m in HEAVY if m in loaded]
+    print(f"eager heavy imports: {', '.join(eager) if eager else '(none)'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="backend.main")
+    parser.add_argument("--top", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,44 @@
+# backend/scripts/rebuild_focus_totals.py
+"""
+UserFocusTotal 을 Report 전체에서 다시 계산한다.
+
+- 처음 도입할 때 (기존 Report 이력 반영)
+- ORM 이벤트를 타지 않는 방식(Core bulk insert, 직접 SQL)으로 Report 를 고쳤을 때
+
+실행: python -m backend.scripts.rebuild_focus_totals
+"""
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.database import SessionLocal
+from backend import models
+
+
+def rebuild_focus_totals():
+    db: Session = SessionLocal()
+    try:
+        rows = (
+            db.query(
+                models.Report.member_id,
+                func.coalesce(func.sum(models.Report.focus_time), 0),
+                func.count(models.Report.report_id),
+            )
+            .group_by(models.Report.member_id)
+            .all()
+        )
+        db.query(models.UserFocusTotal).delete()
+        db.bulk_insert_mappings(
+            models.UserFocusTotal,
+            [
+                {"user_id": member_id, "total_focus_time": int(total), "report_count": count}
+                for member_id, total, count in rows
+            ],
+        )
+        db.commit()
+        print(f"✅ {len(rows)}명의 누적 집중 시간을 다시 계산했습니다.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_focus_totals()
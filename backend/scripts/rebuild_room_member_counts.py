@@ -0,0 +1,37 @@
+# backend/scripts/rebuild_room_member_counts.py
+"""
+Room.member_count 를 RoomMember 에서 다시 계산한다.
+
+- 컬럼을 처음 추가했을 때 (기존 방의 참여자 수 반영)
+- 참여/나가기 API 를 거치지 않고 RoomMember 를 직접 고쳤을 때
+
+실행: python -m backend.scripts.rebuild_room_member_counts
+"""
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from backend.database import SessionLocal
+from backend import models
+
+
+def rebuild_room_member_counts():
+    db: Session = SessionLocal()
+    try:
+        counted = (
+            select(func.count(models.RoomMember.id))
+            .where(models.RoomMember.room_id == models.Room.room_id)
+            .scalar_subquery()
+        )
+        result = db.execute(
+            update(models.Room)
+            .values(member_count=counted)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        print(f"✅ {result.rowcount}개 방의 참여자 수를 다시 계산했습니다.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_room_member_counts()
@@ -0,0 +1,105 @@
+# backend/scripts/stress_battle_turns.py
+"""
+POST /api/battle/damage 낙관적 동시성(turn CAS) 스트레스 테스트.
+
+실행 (로컬 MySQL 에 type / move / Pokemon 이 채워져 있어야 한다):
+    python -m backend.scripts.stress_battle_turns --threads 16 --turns 400
+
+- 임시 배틀 하나를 만들고, 스레드 절반은 A, 절반은 B 로 공격한다.
+- 각 스레드는 Battle.turn 을 읽고 expected_turn 으로 보낸다. 409 면 다시 읽고 재시도한다.
+- 끝나면 불변식을 확인한다:
+    Battle.turn == 성공한 공격 수
+    각 기술의 PP 감소량 == 그 쪽의 성공한 공격 수
+    A / B 성공 수 차이 <= 1 (차례가 번갈아 넘어감)
+"""
+import argparse
+import threading
+import time
+
+from fastapi import HTTPException
+
+from backend import models
+from backend.database import SessionLocal
+from backend.routers import battle as battle_router
+from backend.scripts.bench_battle_damage import _cleanup, _get_pp, _seed, _set_pp
+
+
+def _read_turn(db, battle_id: int) -> int:
+    db.expire_all()
+    return db.query(models.Battle.turn).filter(models.Battle.id == battle_id).scalar() or 0
+
+
+def main(args):
+    db = SessionLocal()
+    users, ups, battle_id, payloads = _seed(db)
+    for payload in payloads:
+        _set_pp(db, payload, args.turns)
+
+    ok = [0, 0]
+    conflicts = [0] * args.threads
+    errors = [0] * args.threads
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def worker(i: int):
+        side = i % 2
+        base = payloads[side]
+        session = SessionLocal()
+        try:
+            while not done.is_set():
+                payload = base.model_copy(update={"expected_turn": _read_turn(session, battle_id)})
+                try:
+                    battle_router.calc_battle_damage(payload, session)
+                except HTTPException as e:
+                    session.rollback()
+                    if e.status_code == 409:
+                        conflicts[i] += 1
+                        continue
+                    errors[i] += 1
+                    if e.detail == "기술의 PP가 부족합니다.":
+                        return
+                    continue
+                with lock:
+                    ok[side] += 1
+                    if sum(ok) >= args.turns:
+                        done.set()
+        finally:
+            session.close()
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    try:
+        turn = _read_turn(db, battle_id)
+        used = [args.turns - _get_pp(db, payload) for payload in payloads]
+        total = sum(ok)
+        attempts = total + sum(conflicts) + sum(errors)
+        print(f"threads={args.threads}, turns={total} in {elapsed:.2f}s -> {total / elapsed:.1f} turns/s")
+        print(f"attempts={attempts}, conflicts(409)={sum(conflicts)} ({sum(conflicts) / max(1, attempts):.1%}), other errors={sum(errors)}")
+
+        checks = {
+            "battle.turn == successful attacks": turn == total,
+            "PP used (A) == A attacks": used[0] == ok[0],
+            "PP used (B) == B attacks": used[1] == ok[1],
+            "turns alternate (|A - B| <= 1)": abs(ok[0] - ok[1]) <= 1,
+        }
+        for name, passed in checks.items():
+            print(f"  [{'ok' if passed else 'FAIL'}] {name}")
+        print(f"  battle.turn={turn}, A={ok[0]} (pp used {used[0]}), B={ok[1]} (pp used {used[1]})")
+        if not all(checks.values()):
+            raise SystemExit(1)
+    finally:
+        _cleanup(db, users, ups, battle_id)
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=400)
+    main(parser.parse_args())
@@ -0,0 +1,214 @@
+# backend/scripts/stress_room_join.py
+"""
+방 참여 동시성 스트레스 테스트: 예전 join(조회 5번 + COUNT 후 INSERT) vs 조건부 UPDATE join.
+
+실행 (로컬 MySQL):
+    python -m backend.scripts.stress_room_join --rooms 20 --capacity 4 --users 400 --threads 32
+
+- 임시 User 와 정원 capacity 인 방 rooms 개를 만들고, 스레드들이 사용자 하나씩 꺼내
+  무작위 방에 참여를 시도한다 (인기 방에 몰리도록 앞쪽 방에 가중치를 준다).
+- 경로마다 joins/s, 성공 / 실패 수를 출력하고 불변식을 확인한다:
+    방별 참여자 수 <= capacity
+    Room.member_count == 실제 RoomMember 수 (새 경로만)
+    한 사용자는 한 방에만
+  예전 경로는 COUNT 와 INSERT 사이에 다른 요청이 끼어들어 정원을 넘길 수 있다.
+- 경로가 끝날 때마다 참여 기록을 지우고, 마지막에 임시 행을 모두 지운다.
+"""
+import argparse
+import queue
+import random
+import threading
+import time
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+
+from backend import models
+from backend.database import SessionLocal
+from backend.routers import room as room_router
+from backend.schemas.room import RoomJoinRequest
+
+
+def _legacy_join(db, room_id: int, user_id: int) -> None:
+    # user-021 이전의 join_room (조회 5번 후 INSERT, 정원 확인과 INSERT 사이에 잠금 없음)
+    room = db.query(models.Room).filter(models.Room.room_id == room_id).first()
+    if not room:
+        raise HTTPException(status_code=404, detail="해당 스터디룸을 찾을 수 없습니다.")
+    user = db.query(models.User).filter(models.User.user_id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="해당 사용자를 찾을 수 없습니다.")
+    if db.query(models.RoomMember).filter(
+        models.RoomMember.room_id == room_id, models.RoomMember.user_id == user_id
+    ).first():
+        raise HTTPException(status_code=400, detail="이미 참여 중인 스터디룸입니다.")
+    if db.query(models.RoomMember).filter(
+        models.RoomMember.user_id == user_id, models.RoomMember.room_id != room_id
+    ).first():
+        raise HTTPException(status_code=400, detail="이미 참여하고 있는 스터디룸이 있습니다.")
+    count = db.query(models.RoomMember).filter(models.RoomMember.room_id == room_id).count()
+    if room.capacity is not None and count >= room.capacity:
+        raise HTTPException(status_code=400, detail="이미 정원이 가득 찼습니다.")
+    db.add(models.RoomMember(room_id=room_id, user_id=user_id, role="member"))
+    db.commit()
+
+
+def _atomic_join(db, room_id: int, user_id: int) -> None:
+    room_router.join_room(room_id, RoomJoinRequest(user_id=user_id), db)
+
+
+def _seed(db, n_rooms: int, capacity: int, n_users: int):
+    tag = uuid.uuid4().hex[:8]
+    db.execute(
+        insert(models.User),
+        [
+            {"email": f"bench-join-{tag}-{i}@local", "pw": "bench", "nickname": f"bench-{i}", "selected": 0}
+            for i in range(n_users)
+        ],
+    )
+    user_ids = [
+        uid for (uid,) in db.query(models.User.user_id).filter(models.User.email.like(f"bench-join-{tag}-%"))
+    ]
+    db.execute(
+        insert(models.Room),
+        [
+            {
+                "title": f"bench-join-{tag}-{i}",
+                "owner_id": user_ids[0],
+                "member_id": user_ids[0],
+                "capacity": capacity,
+                "member_count": 0,
+            }
+            for i in range(n_rooms)
+        ],
+    )
+    room_ids = [
+        rid for (rid,) in db.query(models.Room.room_id)
+        .filter(models.Room.title.like(f"bench-join-{tag}-%"))
+        .order_by(models.Room.room_id)
+    ]
+    db.commit()
+    return user_ids, room_ids
+
+
+def _reset(db, room_ids) -> None:
+    db.rollback()
+    db.query(models.RoomMember).filter(models.RoomMember.room_id.in_(room_ids)).delete(synchronize_session=False)
+    db.query(models.Room).filter(models.Room.room_id.in_(room_ids)).update(
+        {models.Room.member_count: 0}, synchronize_session=False
+    )
+    db.commit()
+
+
+def _check(db, room_ids, capacity: int, check_counter: bool) -> bool:
+    db.expire_all()
+    actual = dict(
+        db.query(models.RoomMember.room_id, func.count(models.RoomMember.id))
+        .filter(models.RoomMember.room_id.in_(room_ids))
+        .group_by(models.RoomMember.room_id)
+        .all()
+    )
+    counters = dict(
+        db.query(models.Room.room_id, models.Room.member_count).filter(models.Room.room_id.in_(room_ids)).all()
+    )
+    users = (
+        db.query(models.RoomMember.user_id)
+        .filter(models.RoomMember.room_id.in_(room_ids))
+        .group_by(models.RoomMember.user_id)
+        .having(func.count(models.RoomMember.id) > 1)
+        .count()
+    )
+    over = sum(1 for rid in room_ids if actual.get(rid, 0) > capacity)
+    checks = {
+        f"no room over capacity ({over} overfilled)": over == 0,
+        "one room per user": users == 0,
+    }
+    if check_counter:
+        drift = sum(1 for rid in room_ids if counters.get(rid, 0) != actual.get(rid, 0))
+        checks[f"member_count == RoomMember rows ({drift} drifted)"] = drift == 0
+    for name, passed in checks.items():
+        print(f"    [{'ok' if passed else 'FAIL'}] {name}")
+    print(f"    seated={sum(actual.values())} / {capacity * len(room_ids)}")
+    return all(checks.values())
+
+
+def _run(name: str, fn, room_ids, user_ids, threads: int, seed: int):
+    rng = random.Random(seed)
+    # 앞쪽 방일수록 인기 (가중치 1/(i+1))
+    weights = [1.0 / (i + 1) for i in range(len(room_ids))]
+    attempts = queue.Queue()
+    for uid in user_ids[1:]:
+        for rid in rng.choices(room_ids, weights=weights, k=2):
+            attempts.put((rid, uid))
+
+    ok, rejected, errors = [0], [0], [0]
+    lock = threading.Lock()
+
+    def worker():
+        db = SessionLocal()
+        local = [0, 0, 0]
+        try:
+            while True:
+                try:
+                    rid, uid = attempts.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    fn(db, rid, uid)
+                    local[0] += 1
+                except HTTPException:
+                    db.rollback()
+                    local[1] += 1
+                except IntegrityError:
+                    # 예전 경로에서 unique 제약에 막힌 경우
+                    db.rollback()
+                    local[2] += 1
+        finally:
+            db.close()
+        with lock:
+            ok[0] += local[0]
+            rejected[0] += local[1]
+            errors[0] += local[2]
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    total = ok[0] + rejected[0] + errors[0]
+    print(f"  {name:<8} {total / elapsed:>10.1f} attempts/s  joined={ok[0]} rejected={rejected[0]} integrity_errors={errors[0]}")
+
+
+def main(args):
+    db = SessionLocal()
+    user_ids, room_ids = _seed(db, args.rooms, args.capacity, args.users)
+    passed = True
+    try:
+        print(f"rooms={args.rooms}, capacity={args.capacity}, users={args.users}, threads={args.threads}")
+        for name, fn, check_counter in (("legacy", _legacy_join, False), ("atomic", _atomic_join, True)):
+            _run(name, fn, room_ids, user_ids, args.threads, args.seed)
+            result = _check(db, room_ids, args.capacity, check_counter)
+            if name == "atomic":
+                passed = result
+            _reset(db, room_ids)
+    finally:
+        _reset(db, room_ids)
+        db.query(models.Room).filter(models.Room.room_id.in_(room_ids)).delete(synchronize_session=False)
+        db.query(models.User).filter(models.User.user_id.in_(user_ids)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+    if not passed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--users", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
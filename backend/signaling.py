@@ -0,0 +1,259 @@
+# backend/signaling.py
+"""
+WebRTC 시그널링 + 방 접속 현황 허브 (signaling-server/server.js 대체).
+
+- /ws/signaling?room=..&user_id=.. : offer / answer / ice 를 같은 방의 다른 peer 에게 중계
+  ("to" 에 peer id 를 넣으면 그 peer 에게만). 접속/종료 시 방에 join / leave 를 알린다.
+  user_id 가 그 방의 RoomMember 일 때만 받는다 (routers/signaling.py, 아니면 1008 로 닫음).
+- /ws/lobby : 방 참여/나가기/생성/삭제 때 occupancy 이벤트를 push 받는다
+  (로비가 /api/rooms/all/profile 을 폴링하지 않아도 됨)
+
+server.js 는 받는 사람마다 JSON.stringify 를 다시 했다. 여기서는
+- 메시지를 한 번만 직렬화해 브로커(backend/pubsub.py)에 publish 하고
+- 브로커가 돌려준 같은 문자열을 방의 소켓마다 송신 큐에 넣는다 (peer 별 send 태스크).
+  느린 클라이언트 때문에 다른 사람 전송이 밀리지 않고, 큐가 가득 찬 peer 는 끊는다.
+
+REST 라우터(routers/room.py)는 스레드풀에서 돌기 때문에 notify_occupancy() 는
+이벤트 루프로 넘겨서 publish 한다. 허브가 시작되지 않았으면(스크립트 등) 아무것도 하지 않는다.
+
+브로커 메시지 = "<보내는 peer id>\\t<받는 peer id>\\n<JSON>" (빈 값이면 제외/지정 없음)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import uuid
+from typing import Dict, Optional
+
+from fastapi import WebSocket
+
+from .pubsub import Broker, LocalBroker
+
+RELAY_TYPES = frozenset({"offer", "answer", "ice"})
+ROOM_PREFIX = "room:"
+LOBBY = "lobby"
+
+
+def _dumps(payload: dict) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def _envelope(text: str, sender: str = "", target: str = "") -> bytes:
+    return f"{sender}\t{target}\n".encode("utf-8") + text.encode("utf-8")
+
+
+class Peer:
+    __slots__ = ("id", "room", "user_id", "ws", "queue", "task", "dropped")
+
+    def __init__(self, ws: WebSocket, room: Optional[str], user_id: Optional[int], queue_size: int):
+        self.id = uuid.uuid4().hex[:12]
+        self.room = room
+        self.user_id = user_id
+        self.ws = ws
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: Optional[asyncio.Task] = None
+        self.dropped = False
+
+    async def _sender(self) -> None:
+        try:
+            while True:
+                await self.ws.send_text(await self.queue.get())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # 이미 끊긴 소켓: 수신 루프가 정리한다
+            pass
+
+    def offer(self, text: str) -> bool:
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+
+class SignalingHub:
+    def __init__(self, broker: Broker, send_queue: int = 256):
+        self.broker = broker
+        self.send_queue = send_queue
+        self.rooms: Dict[str, Dict[str, Peer]] = {}
+        self.lobby: Dict[str, Peer] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 통계
+        self.relayed = 0
+        self.sent = 0
+        self.slow_disconnects = 0
+        self.occupancy_events = 0
+
+    # ---------- 라이프사이클 ----------
+    async def start(self) -> None:
+        if self._loop is not None:
+            return
+        await self.broker.start()
+        self.broker.subscribe(ROOM_PREFIX, self._on_room)
+        self.broker.subscribe(LOBBY, self._on_lobby)
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        self._loop = None
+        # 다시 start() 해도 핸들러가 두 번 불리지 않도록 구독을 푼다
+        self.broker.unsubscribe(ROOM_PREFIX, self._on_room)
+        self.broker.unsubscribe(LOBBY, self._on_lobby)
+        for peer in [p for peers in self.rooms.values() for p in peers.values()] + list(self.lobby.values()):
+            if peer.task is not None:
+                peer.task.cancel()
+        self.rooms.clear()
+        self.lobby.clear()
+        await self.broker.stop()
+
+    # ---------- 접속 ----------
+    async def join(self, ws: WebSocket, room: str, user_id: Optional[int]) -> Peer:
+        peer = self._attach(ws, room, user_id)
+        self.rooms.setdefault(room, {})[peer.id] = peer
+        peer.offer(_dumps({"type": "welcome", "id": peer.id, "room": room}))
+        # server.js 와 같이 새로 들어온 사람 포함 방 전체에 join (상대가 offer 를 만들 기회)
+        await self._publish_room(room, {"type": "join", "from": peer.id, "user_id": user_id})
+        return peer
+
+    async def watch_lobby(self, ws: WebSocket) -> Peer:
+        peer = self._attach(ws, None, None)
+        self.lobby[peer.id] = peer
+        return peer
+
+    async def leave(self, peer: Peer) -> None:
+        if peer.task is not None:
+            peer.task.cancel()
+        if peer.room is None:
+            self.lobby.pop(peer.id, None)
+            return
+        peers = self.rooms.get(peer.room)
+        if peers is None or peers.pop(peer.id, None) is None:
+            return
+        if not peers:
+            del self.rooms[peer.room]
+        await self._publish_room(peer.room, {"type": "leave", "from": peer.id, "user_id": peer.user_id}, sender=peer.id)
+
+    def _attach(self, ws: WebSocket, room: Optional[str], user_id: Optional[int]) -> Peer:
+        peer = Peer(ws, room, user_id, self.send_queue)
+        peer.task = asyncio.create_task(peer._sender())
+        return peer
+
+    # ---------- 중계 ----------
+    async def relay(self, peer: Peer, text: str) -> None:
+        """클라이언트 메시지 하나. offer / answer / ice 만 중계하고 나머지는 무시."""
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(data, dict) or data.get("type") not in RELAY_TYPES:
+            return
+        data["from"] = peer.id
+        target = data.get("to")
+        self.relayed += 1
+        await self._publish_room(peer.room, data, sender=peer.id, target=target if isinstance(target, str) else "")
+
+    async def broadcast(self, room: str, payload: dict) -> None:
+        """서버에서 만든 이벤트(채팅 등)를 방 전체에 보낸다. 허브가 돌고 있지 않으면 무시."""
+        if self._loop is None:
+            return
+        await self._publish_room(room, payload)
+
+    async def _publish_room(self, room: str, payload: dict, sender: str = "", target: str = "") -> None:
+        await self.broker.publish(ROOM_PREFIX + room, _envelope(_dumps(payload), sender, target))
+
+    def _on_room(self, channel: str, data: bytes) -> None:
+        peers = self.rooms.get(channel[len(ROOM_PREFIX):])
+        if not peers:
+            return
+        header, _, body = data.partition(b"\n")
+        sender, _, target = header.decode("utf-8").partition("\t")
+        text = body.decode("utf-8")  # 워커당 한 번
+        if target:
+            peer = peers.get(target)
+            if peer is not None:
+                self._deliver(peer, text)
+            return
+        for peer in list(peers.values()):
+            if peer.id != sender:
+                self._deliver(peer, text)
+
+    def _on_lobby(self, channel: str, data: bytes) -> None:
+        if not self.lobby:
+            return
+        text = data.partition(b"\n")[2].decode("utf-8")
+        for peer in list(self.lobby.values()):
+            self._deliver(peer, text)
+
+    def _deliver(self, peer: Peer, text: str) -> None:
+        if peer.dropped:
+            return
+        if peer.offer(text):
+            self.sent += 1
+            return
+        # 송신 큐가 가득 참 = 따라오지 못하는 클라이언트. 끊고 재접속하게 한다.
+        peer.dropped = True
+        self.slow_disconnects += 1
+        asyncio.create_task(self._close_slow(peer))
+
+    async def _close_slow(self, peer: Peer) -> None:
+        try:
+            await peer.ws.close(code=1013)  # try again later
+        except Exception:
+            pass
+        await self.leave(peer)
+
+    # ---------- 방 참여 현황 (REST 라우터에서 호출) ----------
+    def notify_occupancy(
+        self,
+        event: str,
+        room_id: int,
+        member_count: Optional[int] = None,
+        capacity: Optional[int] = None,
+        user_id: Optional[int] = None,
+    ) -> None:
+        """
+        event: create / join / leave / delete. 커밋이 끝난 뒤 호출한다.
+        아무 스레드에서나 불러도 되고, 허브가 돌고 있지 않으면 무시한다.
+        """
+        loop = self._loop
+        if loop is None:
+            return
+        data = _envelope(
+            _dumps(
+                {
+                    "type": "occupancy",
+                    "event": event,
+                    "room_id": room_id,
+                    "member_count": member_count,
+                    "capacity": capacity,
+                    "user_id": user_id,
+                }
+            )
+        )
+        self.occupancy_events += 1
+
+        def publish():
+            asyncio.create_task(self.broker.publish(LOBBY, data))
+            asyncio.create_task(self.broker.publish(ROOM_PREFIX + str(room_id), data))
+
+        try:
+            loop.call_soon_threadsafe(publish)
+        except RuntimeError:
+            pass  # 루프가 이미 닫힘 (종료 중)
+
+    def stats(self) -> dict:
+        return {
+            "rooms": len(self.rooms),
+            "peers": sum(len(p) for p in self.rooms.values()),
+            "lobby_watchers": len(self.lobby),
+            "relayed": self.relayed,
+            "sent": self.sent,
+            "slow_disconnects": self.slow_disconnects,
+            "occupancy_events": self.occupancy_events,
+            "broker": self.broker.stats(),
+        }
+
+
+hub = SignalingHub(LocalBroker(), send_queue=int(os.getenv("SIGNALING_SEND_QUEUE", "256")))
@@ -0,0 +1,157 @@
+# backend/smoothing.py
+"""
+사용자/방 세션별 졸음 판정 안정화(temporal smoothing).
+
+예전에는 detector.py 의 전역 prediction_buffer 하나를 모든 사용자가 같이 써서
+다수결이 의미가 없었다. 여기서는 (user_id, room_id) 세션마다 작은 고정 크기
+링버퍼를 두고 아래 모드 중 하나로 안정된 상태를 돌려준다.
+
+- majority   : 최근 window 프레임 라벨 다수결 (동률이면 직전 상태 유지)
+- ema        : softmax 확률의 지수이동평균 argmax
+- hysteresis : EMA 확률 기준, 새 상태가 enter 이상 + 현재 상태가 exit 이하일 때만 전환
+
+세션은 idle_ttl 초 동안 갱신이 없으면 지워지고, max_sessions 를 넘으면
+가장 오래 쓰지 않은 세션부터 지운다.
+"""
+from __future__ import annotations
+
+import time
+from array import array
+from collections import OrderedDict
+from typing import Hashable, Optional, Sequence
+
+MODES = ("majority", "ema", "hysteresis")
+
+
+class SessionSmoother:
+    __slots__ = ("labels", "counts", "pos", "filled", "ema", "state", "last_seen")
+
+    def __init__(self, window: int, num_classes: int):
+        self.labels = array("B", bytes(window))       # 라벨 링버퍼
+        self.counts = array("H", [0] * num_classes)  # 버퍼 안 라벨별 개수
+        self.pos = 0
+        self.filled = 0
+        self.ema = array("f", [0.0] * num_classes)
+        self.state = -1                               # 아직 판정 없음
+        self.last_seen = 0.0
+
+    def push_label(self, label: int) -> None:
+        window = len(self.labels)
+        if self.filled == window:
+            self.counts[self.labels[self.pos]] -= 1
+        else:
+            self.filled += 1
+        self.labels[self.pos] = label
+        self.counts[label] += 1
+        self.pos = (self.pos + 1) % window
+
+    def push_probs(self, probs: Sequence[float], alpha: float) -> None:
+        if self.state < 0:
+            for i, p in enumerate(probs):
+                self.ema[i] = p
+            return
+        for i, p in enumerate(probs):
+            self.ema[i] = alpha * p + (1.0 - alpha) * self.ema[i]
+
+
+class SmoothingStore:
+    def __init__(
+        self,
+        mode: str = "majority",
+        num_classes: int = 3,
+        window: int = 10,
+        ema_alpha: float = 0.3,
+        enter_threshold: float = 0.6,
+        exit_threshold: float = 0.4,
+        idle_ttl: float = 300.0,
+        max_sessions: int = 10000,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"지원하지 않는 smoothing 모드입니다: {mode}")
+        self.mode = mode
+        self.num_classes = num_classes
+        self.window = max(1, window)
+        self.ema_alpha = ema_alpha
+        self.enter_threshold = enter_threshold
+        self.exit_threshold = exit_threshold
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max(1, max_sessions)
+
+        self._sessions: "OrderedDict[Hashable, SessionSmoother]" = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def update(self, key: Hashable, label: int, probs: Sequence[float], now: Optional[float] = None) -> int:
+        """현재 프레임의 라벨/확률을 반영하고 안정된 라벨 인덱스를 돌려준다."""
+        now = time.monotonic() if now is None else now
+        self._evict_idle(now)
+
+        session = self._sessions.get(key)
+        if session is None:
+            session = SessionSmoother(self.window, self.num_classes)
+            self._sessions[key] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._sessions.move_to_end(key)
+        session.last_seen = now
+
+        session.push_label(label)
+        session.push_probs(probs, self.ema_alpha)
+
+        if self.mode == "majority":
+            session.state = self._majority(session, label)
+        elif self.mode == "ema":
+            session.state = self._argmax(session.ema)
+        else:
+            session.state = self._hysteresis(session, label)
+        return session.state
+
+    def reset(self, key: Hashable) -> None:
+        self._sessions.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "evicted": self.evicted,
+        }
+
+    # ---------- 내부 ----------
+    def _evict_idle(self, now: float) -> None:
+        # OrderedDict 는 최근 사용 순서라 앞쪽만 보면 된다
+        deadline = now - self.idle_ttl
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.last_seen >= deadline:
+                break
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    @staticmethod
+    def _argmax(values: Sequence[float]) -> int:
+        return max(range(len(values)), key=values.__getitem__)
+
+    def _majority(self, session: SessionSmoother, label: int) -> int:
+        best = max(session.counts)
+        if session.state >= 0 and session.counts[session.state] == best:
+            return session.state
+        if session.counts[label] == best:
+            return label
+        return self._argmax(session.counts)
+
+    def _hysteresis(self, session: SessionSmoother, label: int) -> int:
+        if session.state < 0:
+            return label
+        candidate = self._argmax(session.ema)
+        if (
+            candidate != session.state
+            and session.ema[candidate] >= self.enter_threshold
+            and session.ema[session.state] <= self.exit_threshold
+        ):
+            return candidate
+        return session.state
@@ -0,0 +1,181 @@
+# backend/startup.py
+"""
+무거운 구성요소(졸음 감지 모델, DB 생성, LangChain)를 지연/백그라운드 로드하는 레지스트리.
+
+예전에는 backend.main 을 import 하는 순간 torch / cv2 / mediapipe import, .pth 로드,
+MySQL CREATE DATABASE, LangChain/OpenAI import 가 전부 일어나서 워커 재시작마다 수 초가 걸렸다.
+
+- register(name, loader)      : 구성요소 등록 (아직 로드하지 않음)
+- component.get()             : 처음 쓸 때 로드 (스레드 안전, 한 번만). 실패하면 STARTUP_RETRY_COOLDOWN_S 동안은
+                                다시 로드하지 않고 ComponentUnavailable 을 바로 던진다 (/ready 에 에러와 재시도까지 남은 시간)
+- await component.aget()      : 이벤트 루프를 막지 않고 스레드에서 로드/대기
+- preload(names)              : startup 훅에서 백그라운드 스레드로 병렬 로드 시작
+- readiness(required)         : /ready 응답용 상태 (liveness 는 /live)
+- import_profile(module)      : python -X importtime 결과를 누적 시간 순으로 정리
+
+STARTUP_PRELOAD / STARTUP_REQUIRED 환경변수로 워커 역할별로 조절한다.
+(예: 채팅/방/배틀 전용 워커는 STARTUP_PRELOAD=database 로 모델을 아예 올리지 않는다)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+RETRY_COOLDOWN_S = float(os.getenv("STARTUP_RETRY_COOLDOWN_S", "30"))
+
+
+class ComponentUnavailable(RuntimeError):
+    """로드에 실패한 뒤 재시도 대기 중인 구성요소. 프레임마다 로드 비용을 다시 치르지 않게 한다."""
+
+    def __init__(self, name: str, error: Optional[str], retry_in: float):
+        super().__init__(f"{name} 로드 실패 ({error}), {retry_in:.0f}초 뒤 다시 시도")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class LazyComponent:
+    __slots__ = (
+        "name", "_loader", "_on_ready", "_lock", "_value", "state", "error", "load_ms", "_thread",
+        "cooldown_s", "_failed_at",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        on_ready: Optional[Callable[[Any], None]] = None,
+        cooldown_s: float = RETRY_COOLDOWN_S,
+    ):
+        self.name = name
+        self._loader = loader
+        self._on_ready = on_ready
+        self._lock = threading.Lock()
+        self._value: Any = None
+        self.state = "pending"        # pending | loading | ready | failed
+        self.error: Optional[str] = None
+        self.load_ms: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self.cooldown_s = cooldown_s
+        self._failed_at = 0.0
+
+    def _retry_in(self) -> float:
+        if self.state != "failed":
+            return 0.0
+        return max(0.0, self._failed_at + self.cooldown_s - time.monotonic())
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def get(self) -> Any:
+        if self.state == "ready":
+            return self._value
+        retry_in = self._retry_in()
+        if retry_in > 0:
+            raise ComponentUnavailable(self.name, self.error, retry_in)
+        with self._lock:
+            if self.state == "ready":
+                return self._value
+            # 기다리는 동안 다른 스레드가 로드에 실패했으면 그 결과를 쓴다
+            retry_in = self._retry_in()
+            if retry_in > 0:
+                raise ComponentUnavailable(self.name, self.error, retry_in)
+            self.state = "loading"
+            started = time.perf_counter()
+            try:
+                value = self._loader()
+                if self._on_ready is not None:
+                    self._on_ready(value)
+            except Exception as e:
+                self.state = "failed"
+                self._failed_at = time.monotonic()
+                self.error = f"{type(e).__name__}: {e}"
+                print(f"[startup] {self.name} 로드 실패: {self.error}")
+                raise
+            self._value = value
+            self.error = None
+            self.load_ms = (time.perf_counter() - started) * 1000.0
+            self.state = "ready"
+            print(f"[startup] {self.name} ready ({self.load_ms:.0f} ms)")
+            return value
+
+    async def aget(self) -> Any:
+        if self.state == "ready":
+            return self._value
+        return await asyncio.to_thread(self.get)
+
+    def start_background(self) -> None:
+        if self.state == "ready" or self._thread is not None:
+            return
+
+        def _run():
+            try:
+                self.get()
+            except Exception:
+                pass  # 상태/에러는 get() 에서 기록
+
+        self._thread = threading.Thread(target=_run, name=f"preload-{self.name}", daemon=True)
+        self._thread.start()
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "load_ms": self.load_ms,
+            "error": self.error,
+            "retry_in_s": round(self._retry_in(), 1) if self.state == "failed" else None,
+        }
+
+
+_registry: Dict[str, LazyComponent] = {}
+
+
+def register(name: str, loader: Callable[[], Any], on_ready: Optional[Callable[[Any], None]] = None) -> LazyComponent:
+    component = LazyComponent(name, loader, on_ready)
+    _registry[name] = component
+    return component
+
+
+def parse_names(raw: Optional[str]) -> List[str]:
+    return [n.strip() for n in (raw or "").split(",") if n.strip()]
+
+
+def preload(names: Iterable[str]) -> None:
+    """각 구성요소를 별도 스레드에서 동시에 로드하기 시작한다 (기다리지 않음)."""
+    for name in names:
+        component = _registry.get(name)
+        if component is None:
+            print(f"[startup] 알 수 없는 preload 대상: {name}")
+            continue
+        component.start_background()
+
+
+def readiness(required: Iterable[str]) -> Tuple[bool, dict]:
+    required = list(required)
+    components = {name: c.status() for name, c in _registry.items()}
+    ok = all(name in _registry and _registry[name].ready for name in required)
+    return ok, {"ready": ok, "required": required, "components": components}
+
+
+def import_profile(module: str, top: int = 20) -> List[Tuple[str, float, float]]:
+    """새 인터프리터에서 module 을 import 하며 -X importtime 을 수집한다. (모듈, self_ms, cumulative_ms)"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append((name.strip(), int(self_us) / 1000.0, int(cumulative_us) / 1000.0))
+        except ValueError:
+            continue
+    rows.sort(key=lambda r: r[2], reverse=True)
+    return rows[:top]
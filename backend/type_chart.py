@@ -0,0 +1,99 @@
+# backend/type_chart.py
+"""
+프로세스 내 타입 상성표 캐시.
+
+type / type_effectiveness 는 18x18 고정 표인데, 예전 _get_type_multiplier 는
+데미지 계산마다 SELECT 를 최대 5번 보냈다. 여기서는 두 테이블을 한 번 읽어서
+- index  : 타입 이름 → 0~17 인덱스
+- single : (18, 18) 공격 타입 x 방어 타입 배율
+- dual   : (18, 18, 19) 공격 x 방어1 x 방어2 배율 곱 (방어2 인덱스 18 = 단일 타입)
+을 만들어 두고, 데미지 계산은 배열 조회 한 번으로 끝낸다.
+
+scripts/fill_types.py 가 표를 다시 채우면 cache_stamp 의 "type_chart" stamp 를 갱신하고,
+다음 조회 때 다시 읽는다.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from . import cache_stamp, models
+
+STAMP = "type_chart"
+NUM_TYPES = 18
+NO_TYPE = NUM_TYPES  # dual 의 세 번째 축에서 "두 번째 타입 없음"
+
+
+class TypeChart:
+    __slots__ = ("names", "index", "single", "dual", "version")
+
+    def __init__(self, names: List[str], single: np.ndarray, version: int = 0):
+        self.names = names
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(names)}
+        self.single = single
+        dual = np.ones((len(names), len(names), len(names) + 1), dtype=np.float32)
+        dual[:, :, : len(names)] = single[:, :, None] * single[:, None, :]
+        dual[:, :, len(names)] = single
+        self.dual = dual
+        self.version = version
+
+    def multiplier(self, move_type: Optional[str], def_type1: Optional[str], def_type2: Optional[str]) -> float:
+        atk = self.index.get(move_type) if move_type else None
+        if atk is None:
+            return 1.0
+        d1 = self.index.get(def_type1) if def_type1 else None
+        d2 = self.index.get(def_type2) if def_type2 else None
+        # 모르는 타입은 배율 1.0 (예전 동작과 동일)
+        if d1 is None:
+            if d2 is None:
+                return 1.0
+            d1, d2 = d2, None
+        return float(self.dual[atk, d1, NO_TYPE if d2 is None else d2])
+
+
+def load(db: Session, version: int = 0) -> TypeChart:
+    """type / type_effectiveness 를 각각 한 번씩 읽어 상성표를 만든다."""
+    types = db.query(models.Type.id, models.Type.name).order_by(models.Type.id.asc()).all()
+    names = [name for _, name in types]
+    position = {type_id: i for i, (type_id, _) in enumerate(types)}
+
+    single = np.ones((len(names), len(names)), dtype=np.float32)
+    rows = db.query(
+        models.TypeEffectiveness.attacker_type_id,
+        models.TypeEffectiveness.defender_type_id,
+        models.TypeEffectiveness.multiplier,
+    ).all()
+    for atk_id, def_id, mul in rows:
+        atk = position.get(atk_id)
+        de = position.get(def_id)
+        if atk is not None and de is not None:
+            single[atk, de] = mul
+    return TypeChart(names, single, version)
+
+
+_lock = threading.Lock()
+_chart: Optional[TypeChart] = None
+
+
+def get(db: Session) -> TypeChart:
+    """캐시된 상성표. stamp 가 바뀌었거나 아직 없으면 db 로 한 번 다시 읽는다."""
+    global _chart
+    version = cache_stamp.version(STAMP)
+    chart = _chart
+    if chart is not None and chart.version == version:
+        return chart
+    with _lock:
+        if _chart is None or _chart.version != version:
+            _chart = load(db, version)
+        return _chart
+
+
+def invalidate() -> None:
+    """현재 프로세스 캐시를 버리고, 다른 프로세스도 다시 읽도록 stamp 를 갱신한다."""
+    global _chart
+    with _lock:
+        _chart = None
+    cache_stamp.touch(STAMP)
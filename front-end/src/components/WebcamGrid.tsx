@@ -66,41 +66,64 @@ function WebcamBox({ username, isMuted = false, pokemonEmoji = "🔴", isMe = fa
   useEffect(() => {
     if (!isMe || !onDrowsinessDetected) return;
 
-    const interval = setInterval(async () => {
-      if (!videoRef.current) return;
+    // 서버가 제안하는 다음 샘플 간격(next_interval_ms)을 따라 setTimeout 으로 반복
+    let timer: ReturnType<typeof setTimeout>;
+    let cancelled = false;
+    let nextDelay = 2000; // 기본 2초
+
+    const scheduleNext = () => {
+      if (!cancelled) timer = setTimeout(capture, nextDelay);
+    };
+
+    const capture = () => {
+      if (!videoRef.current) return scheduleNext();
 
       const canvas = document.createElement("canvas");
       // 🔧 해상도 증가: 64x64 → 640x480 (품질 개선)
       canvas.width = 640;
       canvas.height = 480;
       const ctx = canvas.getContext("2d");
-      if (!ctx) return;
+      if (!ctx) return scheduleNext();
 
       ctx.drawImage(videoRef.current, 0, 0, 640, 480);
 
       canvas.toBlob(async (blob) => {
-        if (!blob) return;
+        if (!blob) return scheduleNext();
 
         const formData = new FormData();
         formData.append("file", blob, "capture.jpg");
+        // 서버가 사용자별로 판정을 안정화할 수 있도록 세션 키 전달
+        const currentUser = sessionStorage.getItem("user");
+        if (currentUser) formData.append("user_id", currentUser);
 
         try {
           const res = await fetch("http://localhost:8000/api/drowsiness", {
             method: "POST",
             body: formData,
           });
+          const retryAfter = res.headers.get("Retry-After");
           const data = await res.json();
           if (data.status === "ok") {
             onDrowsinessDetected(data.result);
           }
+          if (typeof data.next_interval_ms === "number") {
+            nextDelay = data.next_interval_ms;
+          } else if (retryAfter) {
+            nextDelay = Number(retryAfter) * 1000;
+          }
         } catch (err) {
           console.error("졸음 감지 실패:", err);
         }
+        scheduleNext();
       }, "image/jpeg", 0.95); // 🔧 JPEG 품질도 95%로 증가
+    };
 
-    }, 2000); // 2초마다 체크
+    scheduleNext();
 
-    return () => clearInterval(interval);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
   }, [isMe, onDrowsinessDetected]);
 
   return (
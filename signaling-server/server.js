@@ -1,4 +1,5 @@
 // signaling-server/server.js
+// 백엔드의 /ws/signaling (backend/signaling.py) 으로 옮겼다. 클라이언트가 모두 옮겨가면 삭제.
 const WebSocket = require('ws');
 
 const wss = new WebSocket.Server({ port: 8080 });